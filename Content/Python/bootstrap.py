@@ -1,25 +1,24 @@
 import unreal
 
-# Importar y ejecutar el servidor WebSocket
-# try:
-#     import websocket_server
-#     print("Servidor WebSocket iniciado exitosamente")
-#     unreal.log("WebSocket server initialized successfully")
-# except ImportError as e:
-#     print(f"Error importando websocket_server: {e}")
-#     unreal.log_error(f"Error importing websocket_server: {e}")
-# except Exception as e:
-#     print(f"Error iniciando WebSocket server: {e}")
-#     unreal.log_error(f"Error starting WebSocket server: {e}")
+import startup_manifest
 
+# Los modulos se registran aqui y se importan segun su fase (ver startup_manifest.py).
+# Se pueden desactivar con UE_PY_BOOTSTRAP_SKIP o bootstrap_config.json sin tocar este archivo.
+manifest = startup_manifest.manifest
+manifest.load_config()
 
-try:
-    import json_blueprint
-    print("json_blueprint iniciado exitosamente")
-    unreal.log("json_blueprint initialized successfully")
-except ImportError as e:
-    print(f"Error importando json_blueprint: {e}")
-    unreal.log_error(f"Error importing json_blueprint: {e}")
-except Exception as e:
-    print(f"Error iniciando json_blueprint: {e}")
-    unreal.log_error(f"Error starting json_blueprint: {e}")
\ No newline at end of file
+# Declaran Blueprint Function Libraries: tienen que registrarse al arrancar el editor
+manifest.register("metrics", startup_manifest.PHASE_STARTUP, description="MetricsBFL")
+manifest.register("json_blueprint", startup_manifest.PHASE_STARTUP, description="JsonReaderBFL")
+manifest.register("json_async", startup_manifest.PHASE_STARTUP, description="JsonAsyncLoaderBFL")
+manifest.register("capture_scheduler", startup_manifest.PHASE_STARTUP, description="CaptureSchedulerBFL")
+manifest.register("json_watch", startup_manifest.PHASE_STARTUP, description="JsonWatchBFL")
+
+# Servidor WebSocket: ya no arranca al importarse; se inicia con
+# startup_manifest.require("websocket_server") o moviendolo a la fase "idle" en la configuracion
+manifest.register("websocket_server", startup_manifest.PHASE_ON_DEMAND, init="start_websocket_server")
+
+# Menus del editor (tool_menus.json): se registran cuando el editor queda inactivo
+manifest.register("menu_manifest", startup_manifest.PHASE_IDLE, init="register_menus")
+
+manifest.run()
@@ -0,0 +1,68 @@
+"""
+
+    Image conversion for the capture scheduler
+
+    Runs in worker processes, so it must not import unreal. Format
+    conversion needs Pillow (optional); gzip compression only needs the
+    standard library.
+
+"""
+
+import gzip
+import os
+import shutil
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Formatos que se pueden pedir en convert_to
+IMAGE_FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG", "webp": "WEBP", "bmp": "BMP"}
+COMPRESS_FORMATS = ("gz",)
+
+
+def is_supported(target_format: str) -> bool:
+    target_format = target_format.lower()
+    return target_format in COMPRESS_FORMATS or (target_format in IMAGE_FORMATS and Image is not None)
+
+
+def convert_capture(source_path: str, target_format: str, quality: int = 90, keep_source: bool = False) -> str:
+    """
+    Convert or compress a captured image
+
+    Args:
+        source_path: Image written by the screenshot request
+        target_format: "png", "jpg", "webp", "bmp" (Pillow) or "gz"
+        quality: Quality for lossy formats (1-100)
+        keep_source: Keep the original file next to the converted one
+
+    Returns:
+        str: Path of the converted file
+    """
+    target_format = target_format.lower()
+    base_path, extension = os.path.splitext(source_path)
+
+    if target_format in COMPRESS_FORMATS:
+        target_path = f"{source_path}.gz"
+        with open(source_path, "rb") as source, gzip.open(target_path, "wb", compresslevel=6) as target:
+            shutil.copyfileobj(source, target)
+    elif target_format in IMAGE_FORMATS:
+        if Image is None:
+            raise ImportError("Pillow is required to convert captures (pip install Pillow)")
+        target_path = f"{base_path}.{target_format}"
+        if target_path == source_path:
+            keep_source = True
+        with Image.open(source_path) as image:
+            image.load()  # leer entero antes de escribir (puede ser el mismo archivo)
+            pil_format = IMAGE_FORMATS[target_format]
+            if pil_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            options = {"optimize": True} if pil_format == "PNG" else {"quality": quality}
+            image.save(target_path, pil_format, **options)
+    else:
+        raise ValueError(f"Unsupported capture format: {target_format}")
+
+    if not keep_source:
+        os.remove(source_path)
+    return target_path
@@ -0,0 +1,468 @@
+"""
+
+    Queued frame captures around SnapshotCaptureBlueprintLibrary
+
+    CaptureCurrentFrameToFile is fire-and-forget and a second request in the
+    same frame overwrites the first. The scheduler queues captures and issues
+    at most one per frame from a Slate post-tick callback, detects completion
+    by watching for the output file and hands optional format conversion or
+    compression to a process pool (capture_convert.py).
+
+"""
+
+import unreal
+import collections
+import concurrent.futures
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+
+import capture_convert
+import json_async
+import metrics
+
+# Limites del planificador
+CAPTURE_MAX_QUEUED = 1000
+CAPTURE_FRAMES_BETWEEN = 1       # frames entre dos peticiones de captura
+CAPTURE_TIMEOUT_SECONDS = 10.0   # espera maxima a que aparezca el archivo
+CAPTURE_CONVERT_PROCESSES = 2
+CAPTURE_DEFAULT_DIR = "Saved/Captures"  # relativo al proyecto
+CAPTURE_STATS_WINDOW_SECONDS = 10.0
+CAPTURE_MAX_HISTORY = 1000       # capturas terminadas cuyo estado se puede consultar todavia
+CAPTURE_FINISHED_TOPIC = "capture.finished"  # tema del servidor WebSocket con cada captura terminada
+
+# Estados de una captura
+QUEUED = "queued"
+REQUESTED = "requested"
+CONVERTING = "converting"
+DONE = "done"
+FAILED = "failed"
+DROPPED = "dropped"
+CANCELLED = "cancelled"
+UNKNOWN = "unknown"
+
+
+class CaptureRequest:
+    """One queued capture, only mutated on the game thread"""
+    __slots__ = ("handle", "file_path", "show_ui", "convert_to", "quality", "status", "error",
+                 "output_path", "submitted_at", "requested_at", "last_size", "future")
+
+    def __init__(self, handle: int, file_path: str, show_ui: bool, convert_to: str, quality: int):
+        self.handle = handle
+        self.file_path = file_path
+        self.show_ui = show_ui
+        self.convert_to = convert_to
+        self.quality = quality
+        self.status = QUEUED
+        self.error = ""
+        self.output_path = ""
+        self.submitted_at = time.perf_counter()
+        self.requested_at = 0.0
+        self.last_size = -1
+        self.future = None
+
+
+def resolve_capture_path(file_path: str, project_dir: str = None) -> str:
+    """Absolute path for a capture; relative paths go under <project>/Saved/Captures"""
+    if os.path.isabs(file_path):
+        return file_path
+    return os.path.join(project_dir or unreal.Paths.project_dir(), CAPTURE_DEFAULT_DIR, file_path)
+
+
+class CaptureScheduler:
+    """
+    Issues queued screenshot requests one per frame and tracks them to completion
+
+    Everything except the conversion workers runs on the game thread.
+    """
+
+    def __init__(self, max_queued: int = CAPTURE_MAX_QUEUED):
+        self.max_queued = max_queued
+        self.frames_between = CAPTURE_FRAMES_BETWEEN
+        self.timeout_seconds = CAPTURE_TIMEOUT_SECONDS
+        self.max_history = CAPTURE_MAX_HISTORY
+        self._queue = collections.deque()
+        self._requests = {}
+        # Handles terminados, fallidos o cancelados en orden: los mas antiguos se olvidan
+        self._finished = collections.deque()
+        self._in_flight = []
+        self._converting = 0
+        self._converted = collections.deque()
+        self._converted_lock = threading.Lock()
+        self._handles = itertools.count(1)
+        self._frames_since_request = CAPTURE_FRAMES_BETWEEN
+        self._process_pool = None
+        self._process_pool_available = None
+        self._tick_handle = None
+        # Llamados en el hilo del juego con result(handle) de cada captura terminada o fallida
+        self.listeners = []
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._total_latency = 0.0
+        self._completions = collections.deque()  # instantes de las capturas terminadas
+
+    def submit(self, file_path: str, show_ui: bool = False, convert_to: str = "", quality: int = 90) -> int:
+        """
+        Queue one capture
+
+        Args:
+            file_path: Output image (.png or .jpg); relative paths go under Saved/Captures
+            show_ui: Include UI elements
+            convert_to: Optional format for capture_convert ("jpg", "webp", "gz"...), empty for none
+            quality: Quality for lossy conversions
+
+        Returns:
+            int: Capture handle, or -1 if the request was dropped (queue full) or rejected
+        """
+        if convert_to and not capture_convert.is_supported(convert_to):
+            unreal.log_error(f"Unsupported capture conversion: {convert_to}")
+            self.rejected += 1
+            return -1
+        if len(self._queue) >= self.max_queued:
+            self.dropped += 1
+            return -1
+
+        request = CaptureRequest(next(self._handles), resolve_capture_path(file_path), show_ui, convert_to, quality)
+        self._requests[request.handle] = request
+        self._queue.append(request)
+        self.submitted += 1
+        self._ensure_tick()
+        return request.handle
+
+    def submit_sequence(self, directory: str, base_name: str, count: int, extension: str = "png",
+                        show_ui: bool = False, convert_to: str = "", quality: int = 90) -> list:
+        """
+        Queue count captures named <base_name>_00000.<extension>, <base_name>_00001...
+
+        Returns:
+            list[int]: Handles (-1 for dropped captures)
+        """
+        directory = resolve_capture_path(directory)
+        return [
+            self.submit(os.path.join(directory, f"{base_name}_{index:05d}.{extension}"), show_ui, convert_to, quality)
+            for index in range(count)
+        ]
+
+    def status(self, handle: int) -> str:
+        request = self._requests.get(handle)
+        return request.status if request is not None else UNKNOWN
+
+    def result(self, handle: int) -> dict:
+        """Status, output path and error of a capture"""
+        request = self._requests.get(handle)
+        if request is None:
+            return {"handle": handle, "status": UNKNOWN}
+        return {"handle": handle, "status": request.status, "output_path": request.output_path, "error": request.error}
+
+    def cancel_all(self) -> int:
+        """
+        Drop every capture that hasn't been requested yet
+
+        Returns:
+            int: Number of captures cancelled
+        """
+        cancelled = 0
+        while self._queue:
+            request = self._queue.popleft()
+            request.status = CANCELLED
+            self._retire(request)
+            cancelled += 1
+        return cancelled
+
+    # -- Hilo del juego --------------------------------------------------
+
+    def _on_tick(self, delta_time: float) -> None:
+        self._check_in_flight()
+        self._collect_conversions()
+        self._frames_since_request += 1
+        if self._queue and self._frames_since_request >= self.frames_between:
+            self._request_next()
+        if not self._queue and not self._in_flight and not self._converting:
+            self._remove_tick()
+
+    def _request_next(self) -> None:
+        request = self._queue.popleft()
+        try:
+            os.makedirs(os.path.dirname(request.file_path), exist_ok=True)
+            # Un archivo anterior con el mismo nombre se tomaria por la captura nueva
+            if os.path.exists(request.file_path):
+                os.remove(request.file_path)
+            accepted = unreal.SnapshotCaptureBlueprintLibrary.capture_current_frame_to_file(
+                request.file_path, request.show_ui
+            )
+        except Exception as e:
+            accepted = False
+            request.error = str(e)
+
+        if not accepted:
+            self._fail(request, request.error or "Capture request was rejected (no game viewport?)")
+            return
+        request.status = REQUESTED
+        request.requested_at = time.perf_counter()
+        self._in_flight.append(request)
+        self._frames_since_request = 0
+
+    def _check_in_flight(self) -> None:
+        """A capture is written once its file exists and its size stopped changing"""
+        now = time.perf_counter()
+        still_waiting = []
+        for request in self._in_flight:
+            try:
+                size = os.stat(request.file_path).st_size
+            except OSError:
+                size = -1
+            if size > 0 and size == request.last_size:
+                self._on_written(request)
+            elif now - request.requested_at > self.timeout_seconds:
+                self.timed_out += 1
+                self._fail(request, f"Capture not written after {self.timeout_seconds} s")
+            else:
+                request.last_size = size
+                still_waiting.append(request)
+        self._in_flight = still_waiting
+
+    def _on_written(self, request: CaptureRequest) -> None:
+        if not request.convert_to:
+            request.output_path = request.file_path
+            self._complete(request)
+            return
+        pool = self._get_process_pool()
+        if pool is None:
+            self._fail(request, "No Python interpreter available for conversion workers")
+            return
+        request.status = CONVERTING
+        self._converting += 1
+        request.future = pool.submit(
+            capture_convert.convert_capture, request.file_path, request.convert_to, request.quality
+        )
+        request.future.add_done_callback(lambda future, handle=request.handle: self._on_converted(handle))
+
+    def _on_converted(self, handle: int) -> None:
+        # Hilo del pool: solo encolar
+        with self._converted_lock:
+            self._converted.append(handle)
+
+    def _collect_conversions(self) -> None:
+        while True:
+            with self._converted_lock:
+                if not self._converted:
+                    break
+                handle = self._converted.popleft()
+            request = self._requests.get(handle)
+            if request is None or request.status != CONVERTING:
+                continue
+            self._converting -= 1
+            try:
+                request.output_path = request.future.result()
+                self._complete(request)
+            except Exception as e:
+                self._fail(request, f"Conversion failed: {str(e)}")
+            request.future = None
+
+    def _complete(self, request: CaptureRequest) -> None:
+        request.status = DONE
+        now = time.perf_counter()
+        self.completed += 1
+        self._total_latency += now - request.submitted_at
+        self._completions.append(now)
+        while self._completions and now - self._completions[0] > CAPTURE_STATS_WINDOW_SECONDS:
+            self._completions.popleft()
+        self._notify(request)
+        self._retire(request)
+
+    def _fail(self, request: CaptureRequest, error: str) -> None:
+        request.status = FAILED
+        request.error = error
+        self.failed += 1
+        unreal.log_error(f"Capture {request.file_path} failed: {error}")
+        self._notify(request)
+        self._retire(request)
+
+    def _notify(self, request: CaptureRequest) -> None:
+        if not self.listeners:
+            return
+        result = self.result(request.handle)
+        for listener in list(self.listeners):
+            try:
+                listener(result)
+            except Exception as e:
+                unreal.log_error(f"Capture listener failed: {str(e)}")
+
+    def _retire(self, request: CaptureRequest) -> None:
+        """Keep a finished capture queryable, forgetting the oldest beyond max_history"""
+        self._finished.append(request.handle)
+        while len(self._finished) > self.max_history:
+            self._requests.pop(self._finished.popleft(), None)
+
+    def _get_process_pool(self):
+        if self._process_pool is None:
+            if self._process_pool_available is None:
+                self._process_pool_available = json_async._configure_process_executable()
+            if not self._process_pool_available:
+                return None
+            self._process_pool = json_async._new_process_pool(CAPTURE_CONVERT_PROCESSES)
+        return self._process_pool
+
+    def _ensure_tick(self) -> None:
+        if self._tick_handle is None and hasattr(unreal, "register_slate_post_tick_callback"):
+            self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+
+    def _remove_tick(self) -> None:
+        if self._tick_handle is not None:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+
+    def forget_finished(self) -> None:
+        """Release the state of every finished capture now"""
+        while self._finished:
+            self._requests.pop(self._finished.popleft(), None)
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+        self._remove_tick()
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+
+    def get_stats(self) -> dict:
+        """
+        Capture throughput and counters
+
+        Returns:
+            dict: submitted, completed, failed, dropped (queue full), rejected (unsupported
+                  conversion), timed_out, queued, in_flight, converting, tracked (requests
+                  still queryable), captures_per_sec (last CAPTURE_STATS_WINDOW_SECONDS)
+                  and avg_latency_ms
+        """
+        completions = list(self._completions)
+        captures_per_sec = 0.0
+        if len(completions) > 1 and completions[-1] > completions[0]:
+            captures_per_sec = (len(completions) - 1) / (completions[-1] - completions[0])
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "queued": len(self._queue),
+            "in_flight": len(self._in_flight),
+            "converting": self._converting,
+            "tracked": len(self._requests),
+            "captures_per_sec": captures_per_sec,
+            "avg_latency_ms": self._total_latency / self.completed * 1000.0 if self.completed else 0.0,
+        }
+
+
+# Planificador compartido por el BFL y el servidor WebSocket
+capture_scheduler = CaptureScheduler()
+metrics.registry.register_gauge("capture_scheduler", capture_scheduler.get_stats)
+
+# Servidores WebSocket que publican CAPTURE_FINISHED_TOPIC (debiles: un servidor detenido desaparece solo)
+_publishing_servers = weakref.WeakSet()
+
+
+def _publish_finished(result: dict) -> None:
+    for server in list(_publishing_servers):
+        server.publish(CAPTURE_FINISHED_TOPIC, result)
+
+
+capture_scheduler.listeners.append(_publish_finished)
+
+
+def register_rpc_methods(server) -> None:
+    """
+    Expose the scheduler on a WebSocketServer (run on the game thread)
+
+    Clients that subscribe to CAPTURE_FINISHED_TOPIC receive the result of every finished or failed capture
+    """
+    _publishing_servers.add(server)
+
+    def queue_capture(file_path, show_ui=False, convert_to="", quality=90):
+        return capture_scheduler.submit(file_path, show_ui, convert_to, quality)
+
+    def queue_sequence(directory, base_name, count, extension="png", show_ui=False, convert_to="", quality=90):
+        return capture_scheduler.submit_sequence(directory, base_name, count, extension, show_ui, convert_to, quality)
+
+    server.register_rpc_method("capture.queue", queue_capture, game_thread_only=True)
+    server.register_rpc_method("capture.sequence", queue_sequence, game_thread_only=True)
+    server.register_rpc_method("capture.status", capture_scheduler.result, game_thread_only=True)
+    server.register_rpc_method("capture.stats", capture_scheduler.get_stats, game_thread_only=True, coalesce=True)
+    server.register_rpc_method("capture.cancel", capture_scheduler.cancel_all, game_thread_only=True)
+
+
+@unreal.uclass()
+class CaptureSchedulerBFL(unreal.BlueprintFunctionLibrary):
+    """
+    Blueprint Function Library for queued frame captures
+    """
+
+    @unreal.ufunction(static=True, params=[str, bool, str], ret=int, meta=dict(category="FrameCapture"))
+    def queue_frame_capture(file_path: str, show_ui: bool, convert_to: str) -> int:
+        """
+        Queue a capture of the viewport; captures are taken one per frame
+
+        Args:
+            file_path: Output .png/.jpg (relative paths go under Saved/Captures)
+            show_ui: Include UI elements
+            convert_to: Optional conversion ("jpg", "webp", "gz"...), empty for none
+
+        Returns:
+            int: Handle for get_frame_capture_status, or -1 if dropped
+        """
+        return capture_scheduler.submit(file_path, show_ui, convert_to)
+
+    @unreal.ufunction(static=True, params=[str, str, int, str, bool, str], ret=int, meta=dict(category="FrameCapture"))
+    def queue_frame_capture_sequence(directory: str, base_name: str, count: int, extension: str,
+                                     show_ui: bool, convert_to: str) -> int:
+        """
+        Queue a numbered sequence of captures, one per frame
+
+        Args:
+            directory: Output directory (relative paths go under Saved/Captures)
+            base_name: File name prefix, files are <base_name>_00000.<extension>...
+            count: Number of captures
+            extension: "png" or "jpg"
+            show_ui: Include UI elements
+            convert_to: Optional conversion, empty for none
+
+        Returns:
+            int: Number of captures queued (the rest were dropped)
+        """
+        handles = capture_scheduler.submit_sequence(directory, base_name, count, extension, show_ui, convert_to)
+        return sum(1 for handle in handles if handle != -1)
+
+    @unreal.ufunction(static=True, params=[int], ret=str, meta=dict(category="FrameCapture"))
+    def get_frame_capture_status(handle: int) -> str:
+        """
+        Returns:
+            str: "queued", "requested", "converting", "done", "failed", "cancelled" or "unknown"
+                 (also once the capture has left the last CAPTURE_MAX_HISTORY finished ones)
+        """
+        return capture_scheduler.status(handle)
+
+    @unreal.ufunction(static=True, ret=str, meta=dict(category="FrameCapture"))
+    def get_frame_capture_stats() -> str:
+        """
+        Returns:
+            str: JSON with throughput (captures_per_sec), dropped, rejected and failed counts
+        """
+        return json.dumps(capture_scheduler.get_stats(), indent=2)
+
+    @unreal.ufunction(static=True, ret=int, meta=dict(category="FrameCapture"))
+    def cancel_frame_captures() -> int:
+        """
+        Returns:
+            int: Number of queued captures cancelled
+        """
+        return capture_scheduler.cancel_all()
@@ -0,0 +1,253 @@
+"""
+
+    Game-thread command queue with a per-tick time budget
+
+    Background threads (the WebSocket server, worker pools...) submit
+    callables here instead of calling unreal directly. The queue is drained
+    from a Slate post-tick callback, highest priority first, until the
+    per-tick millisecond budget is spent; whatever is left waits for the next
+    tick. Results come back as concurrent.futures.Future objects, awaitable
+    from asyncio with run().
+
+"""
+
+import unreal
+import asyncio
+import collections
+import concurrent.futures
+import threading
+import time
+
+# Clases de prioridad (menor = antes)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+_PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+# Presupuesto por defecto por tick y limite de la cola
+DEFAULT_BUDGET_MS = 2.0
+DEFAULT_MAX_DEPTH = 10000
+
+
+class QueueFullError(RuntimeError):
+    """Raised in the future of a command dropped because the queue was full"""
+
+
+class _Command:
+    __slots__ = ("function", "args", "kwargs", "future", "coalesce_key", "submitted_at")
+
+    def __init__(self, function, args, kwargs, coalesce_key):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.future = concurrent.futures.Future()
+        self.coalesce_key = coalesce_key
+        self.submitted_at = time.perf_counter()
+
+
+class GameThreadDispatcher:
+    """
+    Thread-safe queue of callables executed on the game thread
+
+    Commands submitted with the same coalesce_key while one is still queued
+    are merged: the queued command takes the newest arguments and every
+    caller gets the same future.
+    """
+
+    def __init__(self, budget_ms: float = DEFAULT_BUDGET_MS, max_depth: int = DEFAULT_MAX_DEPTH):
+        self.budget_ms = budget_ms
+        self.max_depth = max_depth
+        self._queues = {priority: collections.deque() for priority in _PRIORITIES}
+        self._pending_by_key = {}
+        self._lock = threading.Lock()
+        self._tick_handle = None
+        self._game_thread = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.submitted = 0
+        self.executed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.ticks = 0
+        self.deferred_ticks = 0
+        self.deferred_commands = 0
+        self.last_tick_ms = 0.0
+        self.max_tick_ms = 0.0
+        self.total_tick_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def depth(self) -> int:
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def submit(self, function, *args, priority: int = PRIORITY_NORMAL, coalesce_key=None, **kwargs):
+        """
+        Queue function(*args, **kwargs) for the game thread. Callable from any thread
+
+        Args:
+            function: Callable to run on the game thread
+            priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW
+            coalesce_key: Hashable key; a queued command with the same key is replaced
+
+        Returns:
+            concurrent.futures.Future: Resolves with the return value of function
+        """
+        with self._lock:
+            if coalesce_key is not None:
+                queued = self._pending_by_key.get(coalesce_key)
+                if queued is not None:
+                    queued.function = function
+                    queued.args = args
+                    queued.kwargs = kwargs
+                    self.coalesced += 1
+                    return queued.future
+
+            command = _Command(function, args, kwargs, coalesce_key)
+            if sum(len(queue) for queue in self._queues.values()) >= self.max_depth:
+                self.dropped += 1
+                command.future.set_exception(QueueFullError(f"Game thread queue is full ({self.max_depth})"))
+                return command.future
+
+            self._queues[priority if priority in self._queues else PRIORITY_NORMAL].append(command)
+            if coalesce_key is not None:
+                self._pending_by_key[coalesce_key] = command
+            self.submitted += 1
+        return command.future
+
+    async def run(self, function, *args, priority: int = PRIORITY_NORMAL, coalesce_key=None, **kwargs):
+        """
+        Await submit() from an asyncio loop running on another thread
+
+        Cancelling a coalesced caller only stops its own wait; the shared command still runs for the others
+        """
+        future = self.submit(function, *args, priority=priority, coalesce_key=coalesce_key, **kwargs)
+        if coalesce_key is not None:
+            # El Future es compartido: cancelar a un llamador no debe cancelarlo para el resto
+            return await asyncio.shield(asyncio.wrap_future(future))
+        return await asyncio.wrap_future(future)
+
+    def call(self, function, *args, **kwargs):
+        """
+        Run function on the game thread: immediately if already on it, queued otherwise
+
+        Returns:
+            The return value, or a Future when called from another thread
+        """
+        if self.is_game_thread():
+            return function(*args, **kwargs)
+        return self.submit(function, *args, **kwargs)
+
+    def is_game_thread(self) -> bool:
+        return threading.current_thread() is (self._game_thread or threading.main_thread())
+
+    def _pop(self):
+        with self._lock:
+            for priority in _PRIORITIES:
+                queue = self._queues[priority]
+                if queue:
+                    command = queue.popleft()
+                    if command.coalesce_key is not None:
+                        self._pending_by_key.pop(command.coalesce_key, None)
+                    return command
+        return None
+
+    def drain(self, delta_time: float = 0.0, budget_ms: float = None) -> int:
+        """
+        Run queued commands until the budget is spent. Must be called on the game thread
+
+        At least one command runs per call so the queue always makes progress.
+
+        Args:
+            delta_time: Frame time (unused, matches the tick callback signature)
+            budget_ms: Override of self.budget_ms for this call
+
+        Returns:
+            int: Number of commands executed
+        """
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        started = time.perf_counter()
+        executed = 0
+        while True:
+            command = self._pop()
+            if command is None:
+                break
+            if command.future.set_running_or_notify_cancel():
+                self.max_wait_ms = max(self.max_wait_ms, (time.perf_counter() - command.submitted_at) * 1000.0)
+                try:
+                    command.future.set_result(command.function(*command.args, **command.kwargs))
+                except Exception as e:
+                    self.failed += 1
+                    command.future.set_exception(e)
+                executed += 1
+            if time.perf_counter() - started >= budget:
+                remaining = self.depth()
+                if remaining:
+                    self.deferred_ticks += 1
+                    self.deferred_commands += remaining
+                break
+
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.executed += executed
+        self.ticks += 1
+        self.last_tick_ms = elapsed_ms
+        self.max_tick_ms = max(self.max_tick_ms, elapsed_ms)
+        self.total_tick_ms += elapsed_ms
+        return executed
+
+    def start(self) -> None:
+        """Drain the queue after every Slate tick. Call from the game thread"""
+        self._game_thread = threading.current_thread()
+        if self._tick_handle is None and hasattr(unreal, "register_slate_post_tick_callback"):
+            self._tick_handle = unreal.register_slate_post_tick_callback(self.drain)
+
+    def stop(self) -> None:
+        if self._tick_handle is not None:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+
+    def get_stats(self) -> dict:
+        """
+        Queue and per-tick timing counters
+
+        Returns:
+            dict: depth, submitted/executed/failed/coalesced/dropped counts,
+                  per-tick ms (last, max, avg) and deferred tick/command counts
+        """
+        return {
+            "depth": self.depth(),
+            "budget_ms": self.budget_ms,
+            "submitted": self.submitted,
+            "executed": self.executed,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "ticks": self.ticks,
+            "deferred_ticks": self.deferred_ticks,
+            "deferred_commands": self.deferred_commands,
+            "last_tick_ms": self.last_tick_ms,
+            "max_tick_ms": self.max_tick_ms,
+            "avg_tick_ms": self.total_tick_ms / self.ticks if self.ticks else 0.0,
+            "max_wait_ms": self.max_wait_ms,
+        }
+
+
+# Cola compartida; se engancha al tick de Slate al importar el modulo (hilo del juego)
+dispatcher = GameThreadDispatcher()
+dispatcher.start()
+
+
+def log(message: str) -> None:
+    """unreal.log que se puede llamar desde cualquier hilo"""
+    dispatcher.call(unreal.log, message)
+
+
+def log_warning(message: str) -> None:
+    """unreal.log_warning que se puede llamar desde cualquier hilo"""
+    dispatcher.call(unreal.log_warning, message)
+
+
+def log_error(message: str) -> None:
+    """unreal.log_error que se puede llamar desde cualquier hilo"""
+    dispatcher.call(unreal.log_error, message)
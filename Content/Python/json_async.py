@@ -0,0 +1,371 @@
+"""
+
+    Non-blocking JSON loading for Blueprints
+
+    Files are read and parsed on a thread pool (or a process pool for big,
+    parse-heavy files) and the results are handed back to the game thread
+    from a Slate post-tick callback, so no unreal API is touched off-thread.
+
+"""
+
+import unreal
+import collections
+import concurrent.futures
+import itertools
+import os
+import sys
+import threading
+import multiprocessing
+
+import json_blueprint
+import json_scanner
+
+# Limites del cargador asincrono
+JSON_ASYNC_MAX_PENDING = 64
+# Cargas terminadas cuyo resultado nadie recoge: por encima de este numero se olvidan las mas antiguas
+JSON_ASYNC_MAX_FINISHED = 64
+JSON_ASYNC_THREADS = 4
+JSON_ASYNC_PROCESSES = 2
+# A partir de este tamaño el parseo se hace en otro proceso para no competir por el GIL
+JSON_ASYNC_PROCESS_MIN_BYTES = 32 * 1024 * 1024
+
+# Estados devueltos por poll_json_load
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+UNKNOWN = "unknown"
+
+
+class JsonLoadRequest:
+    """State of one asynchronous load, only mutated on the game thread"""
+    __slots__ = ("handle", "full_path", "future", "status", "result", "error", "callback")
+
+    def __init__(self, handle: int, full_path: str, callback=None):
+        self.handle = handle
+        self.full_path = full_path
+        self.future = None
+        self.status = PENDING
+        self.result = ""
+        self.error = ""
+        self.callback = callback
+
+
+def _configure_process_executable() -> bool:
+    """
+    Point multiprocessing at a real Python interpreter
+
+    Inside the editor sys.executable is UnrealEditor, which can't run worker
+    processes. Returns False if no interpreter was found.
+    """
+    if os.path.basename(sys.executable).lower().startswith("python"):
+        return True
+    for name in ("python.exe", os.path.join("bin", "python3"), "python3"):
+        candidate = os.path.join(sys.exec_prefix, name)
+        if os.path.isfile(candidate):
+            multiprocessing.set_executable(candidate)
+            return True
+    return False
+
+
+def _new_process_pool(max_workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Create a process pool whose workers are spawned, never forked
+
+    Forking the editor would copy its threads and locks into a child that
+    can't use them, so every pool starts a fresh interpreter instead.
+    """
+    return concurrent.futures.ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+class JsonLoadScheduler:
+    """
+    Runs JSON loads in the background and dispatches results on the game thread
+
+    Workers only append finished requests to a queue; dispatch_completed(),
+    driven by the Slate post-tick callback, updates request state, logs errors
+    and runs completion callbacks. Cancelled requests are forgotten at once and
+    only the newest max_finished uncollected results are kept.
+    """
+
+    def __init__(self, max_pending: int = JSON_ASYNC_MAX_PENDING, max_finished: int = JSON_ASYNC_MAX_FINISHED):
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._requests = {}
+        # Handles terminados sin callback, en orden de llegada, esperando a take_result
+        self._finished = collections.OrderedDict()
+        self.expired = 0
+        self._completed = collections.deque()
+        self._handles = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread_pool = None
+        self._process_pool = None
+        self._process_pool_available = None
+        self._tick_handle = None
+
+    def _executor_for(self, full_path: str):
+        """Return (executor, worker) for a file"""
+        if os.path.getsize(full_path) >= JSON_ASYNC_PROCESS_MIN_BYTES and JSON_ASYNC_PROCESSES > 0:
+            if self._process_pool_available is None:
+                self._process_pool_available = _configure_process_executable()
+            if self._process_pool_available:
+                if self._process_pool is None:
+                    self._process_pool = _new_process_pool(JSON_ASYNC_PROCESSES)
+                return self._process_pool, json_scanner.load_and_dump
+
+        if self._thread_pool is None:
+            self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+                JSON_ASYNC_THREADS, thread_name_prefix="JsonLoad"
+            )
+        return self._thread_pool, json_blueprint.format_json_file
+
+    def pending_count(self) -> int:
+        return sum(1 for request in self._requests.values() if request.status == PENDING)
+
+    def submit(self, full_path: str, callback=None) -> int:
+        """
+        Queue a load of full_path
+
+        Args:
+            full_path: Absolute path to the JSON file
+            callback: Optional callable(handle, status, result) run on the game thread
+
+        Returns:
+            int: Request handle, or -1 if the queue is full
+        """
+        if self.pending_count() >= self.max_pending:
+            unreal.log_error(f"JSON load queue is full ({self.max_pending} pending requests)")
+            return -1
+
+        request = JsonLoadRequest(next(self._handles), full_path, callback)
+        executor, worker = self._executor_for(full_path)
+        request.future = executor.submit(worker, full_path)
+        self._requests[request.handle] = request
+        request.future.add_done_callback(lambda future, handle=request.handle: self._on_worker_done(handle))
+        self._ensure_tick()
+        return request.handle
+
+    def _on_worker_done(self, handle: int) -> None:
+        # Hilo del worker: solo encolar, nada de unreal aqui
+        with self._lock:
+            self._completed.append(handle)
+
+    def poll(self, handle: int) -> str:
+        request = self._requests.get(handle)
+        return request.status if request is not None else UNKNOWN
+
+    def take_result(self, handle: int):
+        """
+        Return (status, result) and forget the request once it has finished
+
+        Returns:
+            tuple: (status, result string)
+        """
+        request = self._requests.get(handle)
+        if request is None:
+            return UNKNOWN, ""
+        if request.status != PENDING:
+            del self._requests[handle]
+            del self._finished[handle]
+        return request.status, request.result
+
+    def cancel(self, handle: int) -> bool:
+        """
+        Cancel a pending request and forget its handle
+
+        A load already running finishes but its result is dropped.
+
+        Returns:
+            bool: True if the request was pending
+        """
+        request = self._requests.get(handle)
+        if request is None or request.status != PENDING:
+            return False
+        request.future.cancel()
+        del self._requests[handle]
+        return True
+
+    def dispatch_completed(self, max_items: int = 0) -> int:
+        """
+        Deliver finished loads. Must be called on the game thread
+
+        Args:
+            max_items: Maximum requests to deliver in this call, 0 for all
+
+        Returns:
+            int: Number of requests delivered
+        """
+        delivered = 0
+        while not max_items or delivered < max_items:
+            with self._lock:
+                if not self._completed:
+                    break
+                handle = self._completed.popleft()
+
+            request = self._requests.get(handle)
+            if request is None or request.status != PENDING:
+                continue
+
+            future = request.future
+            try:
+                request.result = future.result()
+                request.status = DONE
+            except Exception as e:
+                request.error = str(e)
+                request.status = FAILED
+                unreal.log_error(f"Error loading JSON file {request.full_path}: {request.error}")
+
+            if request.callback is not None:
+                callback = request.callback
+                request.callback = None
+                del self._requests[handle]
+                try:
+                    callback(handle, request.status, request.result)
+                except Exception as e:
+                    unreal.log_error(f"Error in JSON load callback: {str(e)}")
+            else:
+                self._finished[handle] = None
+                self._expire_finished()
+            delivered += 1
+
+        if not self.pending_count():
+            self._remove_tick()
+        return delivered
+
+    def _expire_finished(self) -> None:
+        """Forget the oldest uncollected results above max_finished"""
+        while len(self._finished) > self.max_finished:
+            handle, _ = self._finished.popitem(last=False)
+            request = self._requests.pop(handle)
+            self.expired += 1
+            unreal.log_warning(
+                f"JSON load {handle} of {request.full_path} was never collected, dropping its result"
+            )
+
+    def _on_tick(self, delta_time: float) -> None:
+        self.dispatch_completed()
+
+    def _ensure_tick(self) -> None:
+        if self._tick_handle is None and hasattr(unreal, "register_slate_post_tick_callback"):
+            self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+
+    def _remove_tick(self) -> None:
+        if self._tick_handle is not None:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+
+    def shutdown(self) -> None:
+        """Cancel everything and stop the worker pools"""
+        for handle in list(self._requests):
+            self.cancel(handle)
+        self._requests.clear()
+        self._finished.clear()
+        self._remove_tick()
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
+
+
+# Planificador compartido por las funciones de JsonAsyncLoaderBFL
+load_scheduler = JsonLoadScheduler()
+
+
+@unreal.uclass()
+class JsonAsyncLoaderBFL(unreal.BlueprintFunctionLibrary):
+    """
+    Blueprint Function Library for loading JSON files without blocking the frame
+    """
+
+    @unreal.ufunction(static=True, params=[str], ret=int, meta=dict(category="JSON Utilities|Async"))
+    def request_json_load(file_path: str) -> int:
+        """
+        Start loading a JSON file in the background
+
+        Args:
+            file_path: Path to the JSON file (relative to project or absolute)
+
+        Returns:
+            int: Handle to pass to poll_json_load, or -1 if failed
+        """
+        try:
+            full_path = json_blueprint._resolve_json_path(file_path)
+
+            if not os.path.exists(full_path):
+                unreal.log_error(f"JSON file not found: {full_path}")
+                return -1
+
+            return load_scheduler.submit(full_path)
+
+        except Exception as e:
+            unreal.log_error(f"Error requesting JSON load for {file_path}: {str(e)}")
+            return -1
+
+    @unreal.ufunction(static=True, params=[str, unreal.Object, str], ret=int, meta=dict(category="JSON Utilities|Async"))
+    def request_json_load_with_callback(file_path: str, target: unreal.Object, function_name: str) -> int:
+        """
+        Start loading a JSON file and call target.function_name(handle, status, result) when done
+
+        Args:
+            file_path: Path to the JSON file (relative to project or absolute)
+            target: Object (e.g. a Blueprint actor or widget) that receives the result
+            function_name: Name of a function on target taking (int, string, string)
+
+        Returns:
+            int: Request handle, or -1 if failed
+        """
+        try:
+            full_path = json_blueprint._resolve_json_path(file_path)
+
+            if not os.path.exists(full_path):
+                unreal.log_error(f"JSON file not found: {full_path}")
+                return -1
+
+            def callback(handle, status, result):
+                target.call_method(function_name, (handle, status, result))
+
+            return load_scheduler.submit(full_path, callback)
+
+        except Exception as e:
+            unreal.log_error(f"Error requesting JSON load for {file_path}: {str(e)}")
+            return -1
+
+    @unreal.ufunction(static=True, params=[int], ret=str, meta=dict(category="JSON Utilities|Async"))
+    def poll_json_load(handle: int) -> str:
+        """
+        Get the status of a background load
+
+        Args:
+            handle: Handle returned by request_json_load
+
+        Returns:
+            str: "pending", "done", "failed" or "unknown" (also for cancelled or expired handles)
+        """
+        return load_scheduler.poll(handle)
+
+    @unreal.ufunction(static=True, params=[int], ret=str, meta=dict(category="JSON Utilities|Async"))
+    def take_json_load_result(handle: int) -> str:
+        """
+        Get the formatted JSON of a finished load and release its handle
+
+        Args:
+            handle: Handle returned by request_json_load
+
+        Returns:
+            str: JSON contents as formatted string, or empty string if not done
+        """
+        status, result = load_scheduler.take_result(handle)
+        return result if status == DONE else ""
+
+    @unreal.ufunction(static=True, params=[int], ret=bool, meta=dict(category="JSON Utilities|Async"))
+    def cancel_json_load(handle: int) -> bool:
+        """
+        Cancel a background load
+
+        Args:
+            handle: Handle returned by request_json_load
+
+        Returns:
+            bool: True if the load was still pending
+        """
+        return load_scheduler.cancel(handle)
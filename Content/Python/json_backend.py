@@ -0,0 +1,296 @@
+"""
+
+    Pluggable JSON parse/serialize backend
+
+    Picks the fastest parser available at import time (orjson, simdjson,
+    ujson, then the standard library) while keeping the exact semantics of
+    json.load / json.dumps(indent=2, ensure_ascii=False). Whenever a fast
+    backend can't guarantee identical results (NaN, huge integers, floats
+    that orjson would print differently...) the standard library is used.
+
+    Override the choice with the UE_JSON_BACKEND environment variable or
+    set_backend(). Does not import unreal, so it works in worker processes.
+
+"""
+
+import importlib
+import json
+import marshal
+import math
+import os
+import time
+
+# Variable de entorno para forzar un backend ("orjson", "simdjson", "ujson" o "stdlib")
+BACKEND_ENV_VAR = "UE_JSON_BACKEND"
+
+# Orden de preferencia
+BACKEND_ORDER = ("orjson", "simdjson", "ujson", "stdlib")
+
+_INT64_MIN = -2 ** 63
+_UINT64_MAX = 2 ** 64 - 1
+
+# orjson/simdjson convierten en silencio los enteros enormes a float: esos documentos van a json.
+# Se buscan 19 digitos seguidos sobre una copia donde todo lo que no es digito es un espacio
+# (bytes.translate + find es mucho mas rapido que una regex)
+_DIGIT_MASK = bytes(0x30 if 0x30 <= code <= 0x39 else 0x20 for code in range(256))
+_LONG_DIGITS = b'0' * 19
+
+
+def _may_have_big_ints(data) -> bool:
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    return _LONG_DIGITS in data.translate(_DIGIT_MASK)
+
+
+def _stdlib_loads(data):
+    """json.loads treating bytes as strict UTF-8, like json.load(open(..., encoding='utf-8'))"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode('utf-8')
+    return json.loads(data)
+
+
+class JsonBackend:
+    """Standard library backend, also the reference for every other backend"""
+    name = "stdlib"
+
+    def loads(self, data):
+        return _stdlib_loads(data)
+
+    def dumps(self, json_data, indent=2) -> str:
+        return json.dumps(json_data, indent=indent, ensure_ascii=False)
+
+
+class OrjsonBackend(JsonBackend):
+    name = "orjson"
+
+    def __init__(self, module):
+        self._orjson = module
+
+    def loads(self, data):
+        if _may_have_big_ints(data):
+            return _stdlib_loads(data)
+        try:
+            return self._orjson.loads(data)
+        except self._orjson.JSONDecodeError:
+            # NaN/Infinity o enteros de mas de 64 bits: json.loads los acepta
+            return _stdlib_loads(data)
+
+    def dumps(self, json_data, indent=2) -> str:
+        # orjson solo indenta a 2 espacios y sin indent usa otros separadores
+        if indent != 2 or not _orjson_dumps_exact(json_data):
+            return json.dumps(json_data, indent=indent, ensure_ascii=False)
+        try:
+            return self._orjson.dumps(json_data, option=self._orjson.OPT_INDENT_2).decode('utf-8')
+        except (TypeError, self._orjson.JSONEncodeError):
+            # Surrogates sueltos o mas de 255 niveles de anidamiento: json.dumps los acepta
+            return json.dumps(json_data, indent=indent, ensure_ascii=False)
+
+
+class SimdjsonBackend(JsonBackend):
+    name = "simdjson"
+
+    def __init__(self, module):
+        self._simdjson = module
+
+    def loads(self, data):
+        if _may_have_big_ints(data):
+            return _stdlib_loads(data)
+        try:
+            return self._simdjson.loads(data)
+        except ValueError:
+            return _stdlib_loads(data)
+
+
+class UjsonBackend(JsonBackend):
+    name = "ujson"
+
+    def __init__(self, module):
+        self._ujson = module
+
+    def loads(self, data):
+        try:
+            return self._ujson.loads(data)
+        except (ValueError, OverflowError):
+            return _stdlib_loads(data)
+
+
+_BACKEND_CLASSES = {
+    "orjson": OrjsonBackend,
+    "simdjson": SimdjsonBackend,
+    "ujson": UjsonBackend,
+}
+
+
+def _orjson_dumps_exact(json_data) -> bool:
+    """
+    True if orjson would serialize json_data exactly like json.dumps
+
+    orjson prints floats such as 1e16 or 1.5e-05 with a different exponent
+    format, writes NaN as null and rejects non-string keys and big integers.
+    """
+    stack = [json_data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    return False
+                stack.append(item)
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif isinstance(value, float):
+            if not math.isfinite(value):
+                return False
+            magnitude = abs(value)
+            if magnitude and (magnitude < 1e-4 or magnitude >= 1e16):
+                return False
+        elif isinstance(value, int) and not isinstance(value, bool):
+            if value < _INT64_MIN or value > _UINT64_MAX:
+                return False
+        elif not (value is None or isinstance(value, (str, bool))):
+            return False
+    return True
+
+
+def create_backend(name: str):
+    """
+    Instantiate a backend by name
+
+    Returns:
+        JsonBackend or None if the module isn't installed
+    """
+    if name == "stdlib":
+        return JsonBackend()
+    backend_class = _BACKEND_CLASSES.get(name)
+    if backend_class is None:
+        return None
+    try:
+        return backend_class(importlib.import_module(name))
+    except ImportError:
+        return None
+
+
+def available_backends() -> list:
+    """Names of the backends that can be used in this interpreter"""
+    return [name for name in BACKEND_ORDER if create_backend(name) is not None]
+
+
+def _select_backend():
+    requested = os.environ.get(BACKEND_ENV_VAR, "").strip().lower()
+    if requested:
+        backend = create_backend(requested)
+        if backend is not None:
+            return backend
+    for name in BACKEND_ORDER:
+        backend = create_backend(name)
+        if backend is not None:
+            return backend
+    return JsonBackend()
+
+
+# Backend activo
+backend = _select_backend()
+
+
+def set_backend(name: str) -> bool:
+    """
+    Switch the active backend
+
+    Args:
+        name: One of BACKEND_ORDER
+
+    Returns:
+        bool: False if that backend isn't available
+    """
+    global backend
+    selected = create_backend(name)
+    if selected is None:
+        return False
+    backend = selected
+    return True
+
+
+def loads(data):
+    """Parse JSON text (str or UTF-8 bytes) with the active backend"""
+    return backend.loads(data)
+
+
+def load_file(file_path: str):
+    """Parse a UTF-8 JSON file with the active backend"""
+    with open(file_path, 'rb') as file:
+        return backend.loads(file.read())
+
+
+def load_files(file_paths, packed: bool = False):
+    """
+    Parse several JSON files, keeping going when one fails
+
+    Top-level so a chunk of files can be one process pool task.
+
+    Args:
+        file_paths: Absolute paths to the JSON files
+        packed: Return the list serialized with marshal, which the parent
+                process rebuilds faster than a pickled one
+
+    Returns:
+        list[tuple]: (file_path, signature, data, error) per file, where signature is
+                     (mtime_ns, size, inode) taken before reading and error is None on success
+    """
+    results = []
+    for file_path in file_paths:
+        try:
+            stat_result = os.stat(file_path)
+            signature = (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+            results.append((file_path, signature, load_file(file_path), None))
+        except ValueError as e:
+            results.append((file_path, None, None, f"Invalid JSON: {e}"))
+        except OSError as e:
+            results.append((file_path, None, None, f"Can't read file: {e}"))
+    return marshal.dumps(results) if packed else results
+
+
+def dumps(json_data, indent=2) -> str:
+    """Serialize like json.dumps(indent=indent, ensure_ascii=False) with the active backend"""
+    return backend.dumps(json_data, indent)
+
+
+def benchmark(file_path: str, repeat: int = 3) -> dict:
+    """
+    Measure parse and dump throughput of every available backend on a file
+
+    Args:
+        file_path: JSON file to benchmark with
+        repeat: Runs per backend, the best one is reported
+
+    Returns:
+        dict: {backend name: {"parse_mb_s", "dump_mb_s", "identical"}}
+    """
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    megabytes = len(data) / (1024 * 1024)
+
+    reference = _stdlib_loads(data)
+    reference_text = json.dumps(reference, indent=2, ensure_ascii=False)
+
+    results = {}
+    for name in available_backends():
+        candidate = create_backend(name)
+
+        parse_time = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parsed = candidate.loads(data)
+            parse_time = min(parse_time, time.perf_counter() - started)
+
+        dump_time = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            text = candidate.dumps(reference, 2)
+            dump_time = min(dump_time, time.perf_counter() - started)
+
+        results[name] = {
+            "parse_mb_s": megabytes / parse_time if parse_time else 0.0,
+            "dump_mb_s": megabytes / dump_time if dump_time else 0.0,
+            "identical": parsed == reference and text == reference_text,
+        }
+    return results
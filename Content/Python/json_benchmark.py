@@ -0,0 +1,254 @@
+"""
+
+    Headless benchmark and regression check for json_blueprint
+
+    Runs outside the editor with the unreal stub (unreal_stub.py): generates
+    synthetic documents that scale by size, depth and fan-out, times every
+    JsonReaderBFL entry point plus _log_json_values and writes a JSON report
+    with ops/sec, allocations per call and peak RSS. The report can be
+    compared against a stored baseline and fails on regressions.
+
+    Usage:
+        python json_benchmark.py --output report.json
+        python json_benchmark.py --baseline baseline.json --threshold 0.25
+
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import unreal_stub
+
+try:
+    import resource
+except ImportError:
+    # Windows: sin ru_maxrss
+    resource = None
+
+# Escenarios: profundidad/abanico del arbol anidado y numero de registros del array
+SCENARIOS = (
+    {"name": "small", "depth": 3, "fanout": 4, "records": 100},
+    {"name": "deep", "depth": 12, "fanout": 2, "records": 10},
+    {"name": "wide", "depth": 2, "fanout": 200, "records": 1000},
+    {"name": "large", "depth": 4, "fanout": 8, "records": 50000},
+)
+QUICK_SCENARIOS = ("small", "deep")
+
+# Tiempo minimo de medida por operacion
+MIN_SECONDS = 0.5
+MAX_ITERATIONS = 10000
+
+REPORT_VERSION = 1
+
+
+def make_document(depth: int, fanout: int, records: int) -> dict:
+    """
+    Build a synthetic document
+
+    Args:
+        depth: Nesting depth of the "tree" section
+        fanout: Children per node of the "tree" section
+        records: Length of the "records" array of same-shaped objects
+
+    Returns:
+        dict: JSON-serializable document
+    """
+    def node(level):
+        if level == depth:
+            return {"value": level, "label": f"leaf{level}", "ratio": level / 3, "enabled": level % 2 == 0}
+        return {f"n{i}": node(level + 1) for i in range(fanout)}
+
+    return {
+        "tree": node(0),
+        "records": [
+            {"id": i, "item": f"Item {i}", "quantity": i % 7, "durability": (i * 37) % 101,
+             "position": {"x": i * 0.5, "y": -i * 0.25, "z": 0.0}, "tags": ["a", "b"]}
+            for i in range(records)
+        ],
+    }
+
+
+def sample_paths(depth: int, fanout: int, records: int) -> list:
+    """Key paths spread over the generated document"""
+    tree_path = ".".join(["tree"] + [f"n{fanout - 1}"] * depth + ["label"])
+    paths = [tree_path, "tree.n0"]
+    if records:
+        for index in (0, records // 2, records - 1):
+            paths += [f"records.{index}.item", f"records.{index}.position.x"]
+    return paths
+
+
+def _time_operation(operation, min_seconds: float) -> dict:
+    """Run operation repeatedly and return ops/sec and mean seconds per call"""
+    operation()  # calentamiento (y llenado de caches)
+    iterations = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds and iterations < MAX_ITERATIONS:
+        operation()
+        iterations += 1
+        elapsed = time.perf_counter() - started
+    return {
+        "iterations": iterations,
+        "seconds_per_op": elapsed / iterations,
+        "ops_per_sec": iterations / elapsed if elapsed else 0.0,
+    }
+
+
+def _measure_allocations(operation) -> dict:
+    """Peak traced memory and number of allocated blocks for one call"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        operation()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return {"peak_alloc_bytes": peak, "alloc_blocks": blocks}
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB, macOS en bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _operations(json_blueprint, file_name: str, json_text: str, json_data, paths: list) -> dict:
+    reader = json_blueprint.JsonReaderBFL
+
+    def cold(function):
+        # Fuerza la relectura del archivo en cada llamada
+        def run():
+            json_blueprint.document_cache.clear()
+            function()
+        return run
+
+    return {
+        "read_and_log_json_file": lambda: reader.read_and_log_json_file(file_name),
+        "read_json_file_as_string": lambda: reader.read_json_file_as_string(file_name),
+        "read_json_file_as_string_cold": cold(lambda: reader.read_json_file_as_string(file_name)),
+        "get_json_value_by_path": lambda: reader.get_json_value_by_path(file_name, paths[0]),
+        "get_json_value_by_path_cold": cold(lambda: reader.get_json_value_by_path(file_name, paths[0])),
+        "get_json_values_by_paths": lambda: reader.get_json_values_by_paths(file_name, paths),
+        "log_json_string": lambda: reader.log_json_string(json_text),
+        "_log_json_values": lambda: reader._log_json_values(json_data, ""),
+    }
+
+
+def run_benchmarks(scenario_names=None, min_seconds: float = MIN_SECONDS, work_dir: str = None) -> dict:
+    """
+    Run every scenario and return the report
+
+    Args:
+        scenario_names: Names from SCENARIOS to run, None for all
+        min_seconds: Minimum measuring time per operation
+        work_dir: Directory for the generated files (temporary if None)
+
+    Returns:
+        dict: Report with one entry per "scenario/operation"
+    """
+    work_dir = work_dir or tempfile.mkdtemp(prefix="json_benchmark_")
+    unreal_stub.install(work_dir, echo=False)
+    import json_backend
+    import json_blueprint
+
+    results = {}
+    for scenario in SCENARIOS:
+        if scenario_names and scenario["name"] not in scenario_names:
+            continue
+        json_data = make_document(scenario["depth"], scenario["fanout"], scenario["records"])
+        json_text = json.dumps(json_data, indent=2)
+        file_name = f"bench_{scenario['name']}.json"
+        with open(os.path.join(work_dir, file_name), "w", encoding="utf-8") as file:
+            file.write(json_text)
+        paths = sample_paths(scenario["depth"], scenario["fanout"], scenario["records"])
+
+        for name, operation in _operations(json_blueprint, file_name, json_text, json_data, paths).items():
+            entry = _time_operation(operation, min_seconds)
+            entry.update(_measure_allocations(operation))
+            entry["file_bytes"] = len(json_text.encode("utf-8"))
+            results[f"{scenario['name']}/{name}"] = entry
+            print(f"{scenario['name']:>6}/{name:<32} {entry['ops_per_sec']:>12.1f} ops/s"
+                  f" {entry['peak_alloc_bytes'] / 1024:>10.0f} KiB peak")
+
+        json_blueprint.document_cache.clear()
+
+    return {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": json_backend.backend.name,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "results": results,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, threshold: float) -> list:
+    """
+    List the operations whose throughput dropped more than threshold
+
+    Args:
+        report: Current report
+        baseline: Stored report to compare with
+        threshold: Allowed relative drop in ops/sec (0.25 = 25%)
+
+    Returns:
+        list[str]: One message per regression
+    """
+    regressions = []
+    for key, previous in baseline.get("results", {}).items():
+        current = report["results"].get(key)
+        if current is None or not previous.get("ops_per_sec"):
+            continue
+        ratio = current["ops_per_sec"] / previous["ops_per_sec"]
+        if ratio < 1.0 - threshold:
+            regressions.append(
+                f"{key}: {current['ops_per_sec']:.1f} ops/s vs baseline {previous['ops_per_sec']:.1f} ({ratio:.0%})"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark json_blueprint headless")
+    parser.add_argument("--output", default="json_benchmark_report.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed ops/sec drop before failing")
+    parser.add_argument("--scenario", action="append", help="Scenario to run (repeatable)")
+    parser.add_argument("--quick", action="store_true", help=f"Only run {', '.join(QUICK_SCENARIOS)}")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS, help="Measuring time per operation")
+    args = parser.parse_args(argv)
+
+    scenarios = args.scenario or (QUICK_SCENARIOS if args.quick else None)
+    report = run_benchmarks(scenarios, args.min_seconds)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare_reports(report, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,1780 @@
 import unreal
 import json
+import marshal
 import os
+import re
+import sys
+import threading
+import time
+import collections
+import concurrent.futures
+import glob
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+
+import json_backend
+import json_scanner
+import metrics
+
+# NumPy, json_columnar y sqlite3 se importan al usarlos por primera vez para no alargar el arranque del editor
+
+# Presupuesto por defecto de la cache de documentos (bytes en disco de los JSON cacheados)
+JSON_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Indice de rutas en disco (<archivo>.idx) para archivos grandes
+JSON_INDEX_ENABLED = True
+JSON_INDEX_MIN_BYTES = 16 * 1024 * 1024
+JSON_INDEX_SUFFIX = ".idx"
+# Solo se indexan los hijos de contenedores de al menos este tamaño: cada consulta lee como mucho un subarbol asi
+JSON_INDEX_SPAN_BYTES = 64 * 1024
+# Construir el indice en un proceso aparte (si no hay interprete disponible se usa un hilo)
+JSON_INDEX_PROCESS = True
+
+# A partir de este tamaño los archivos se leen en modo streaming (mmap) sin cargarlos enteros
+JSON_STREAM_MIN_BYTES = 128 * 1024 * 1024
+
+# Arrays de objetos con la misma forma guardados por columnas (necesita NumPy) con sidecar <archivo>.cols.npz
+JSON_COLUMNAR_ENABLED = True
+JSON_COLUMNAR_MIN_BYTES = 4 * 1024 * 1024
+# Igual que json_columnar.COLUMNAR_SUFFIX: se repite para saber si hay sidecar sin importar NumPy
+JSON_COLUMNAR_SUFFIX = ".cols.npz"
+
+# Consultas: a partir de este numero de valores float las agregaciones usan NumPy
+JSON_QUERY_NUMPY_MIN_VALUES = 1024
+
+# Carga de directorios enteros (bulk_load_json)
+JSON_BULK_PROCESSES = 0               # 0 = un proceso por nucleo
+JSON_BULK_MIN_FILES = 64              # con menos archivos no compensa arrancar procesos
+JSON_BULK_CHUNK_MIN_BYTES = 256 * 1024
+JSON_BULK_CHUNKS_PER_PROCESS = 4      # trozos por proceso para repartir bien archivos de tamaños distintos
+JSON_BULK_PROGRESS_SECONDS = 1.0
+
+# Volcado de valores al log: se agrupan lineas para no llamar a unreal.log por cada hoja
+JSON_LOG_FLUSH_LINES = 1000
+JSON_LOG_FLUSH_BYTES = 64 * 1024
+JSON_LOG_MAX_LINES = 0   # 0 = sin limite
+JSON_LOG_MAX_DEPTH = 0   # 0 = sin limite
+JSON_LOG_OUTPUT_FILE = ""  # vacio = Output Log de Unreal
+
+
+class JsonDocumentCache:
+    """
+    Shared cache of parsed JSON documents keyed by resolved file path
+
+    Entries are invalidated when the file's (mtime_ns, size, inode) signature
+    changes and evicted in LRU order once the byte budget is exceeded. The
+    budget is measured in on-disk bytes of the cached files.
+    Cached documents are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_bytes: int = JSON_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # full_path -> (signature, size, data)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.realpath(file_path)
+
+    @staticmethod
+    def _signature(stat_result) -> tuple:
+        return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+    def load(self, file_path: str):
+        """
+        Return the parsed document for file_path, reading it only if needed
+
+        Args:
+            file_path: Absolute path to the JSON file
+
+        Returns:
+            The parsed JSON data (shared, do not mutate)
+        """
+        key = self._key(file_path)
+        stat_result = os.stat(key)
+        signature = self._signature(stat_result)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        started_at = time.perf_counter()
+        json_data = json_backend.load_file(key)
+        if metrics.registry.enabled:
+            metrics.registry.observe("json.parse", time.perf_counter() - started_at, stat_result.st_size)
+
+        self._store(key, signature, stat_result.st_size, json_data)
+        return json_data
+
+    def put(self, file_path: str, signature: tuple, json_data) -> None:
+        """
+        Cache a document parsed elsewhere (e.g. in a worker process)
+
+        Args:
+            file_path: Absolute path to the JSON file
+            signature: (mtime_ns, size, inode) of the file taken before it was read
+            json_data: The parsed document
+        """
+        self._store(self._key(file_path), signature, signature[1], json_data)
+
+    def _store(self, key: str, signature: tuple, size: int, json_data) -> None:
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                # Documento mas grande que todo el presupuesto: no se cachea
+                return
+            self._entries[key] = (signature, size, json_data)
+            self._total_bytes += size
+            self._evict()
+
+    def _discard(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._total_bytes -= entry[1]
+        return True
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        """Change the byte budget, evicting entries if it shrank"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def invalidate(self, file_path: str) -> bool:
+        """Drop the cached document for file_path. Returns True if it was cached"""
+        with self._lock:
+            return self._discard(self._key(file_path))
+
+    def clear(self) -> None:
+        """Drop every cached document (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and current occupancy"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Cache compartida por todas las funciones de JsonReaderBFL
+document_cache = JsonDocumentCache()
+
+
+def _document_cache_metrics() -> dict:
+    stats = document_cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+
+metrics.registry.register_gauge("json.document_cache", _document_cache_metrics)
+
+
+def _resolve_json_path(file_path: str) -> str:
+    """Convert a project-relative path to an absolute one"""
+    if not os.path.isabs(file_path):
+        project_dir = unreal.Paths.project_dir()
+        return os.path.join(project_dir, file_path)
+    return file_path
+
+
+class CompiledKeyPath:
+    """
+    Dot-notation key path parsed once into (key, index) segments
+
+    Array indices are pre-converted so resolving a path does no string work.
+    Use compile_key_path() to get memoized instances.
+    """
+    __slots__ = ("key_path", "segments")
+
+    def __init__(self, key_path: str):
+        self.key_path = key_path
+        # Solo digitos ASCII: "²".isdigit() es True pero int("²") falla
+        self.segments = tuple(
+            (key, int(key) if key.isdecimal() and key.isascii() else None) for key in key_path.split('.')
+        )
+
+    def resolve(self, json_data):
+        """
+        Walk json_data following this path
+
+        Args:
+            json_data: Parsed JSON document
+
+        Returns:
+            tuple: (value, error) where error is None on success or a message
+        """
+        current_data = json_data
+        for segment in self.segments:
+            current_data, error = _step_into(current_data, segment)
+            if error is not None:
+                return None, error
+        return current_data, None
+
+
+@lru_cache(maxsize=4096)
+def compile_key_path(key_path: str) -> CompiledKeyPath:
+    """Return the memoized CompiledKeyPath for key_path"""
+    return CompiledKeyPath(key_path)
+
+
+def _step_into(current_data, segment):
+    """Resolve one (key, index) segment. Returns (child, error)"""
+    key, index = segment
+    if isinstance(current_data, dict) and key in current_data:
+        return current_data[key], None
+    if isinstance(current_data, list) and index is not None:
+        if 0 <= index < len(current_data):
+            return current_data[index], None
+        return None, f"Index {index} out of range for array"
+    # Solo hay documentos por columnas si json_columnar ya se importo
+    json_columnar = sys.modules.get("json_columnar")
+    if json_columnar is not None and current_data.__class__ is json_columnar.ColumnarArray and index is not None:
+        if index < len(current_data):
+            return current_data.record(index), None
+        return None, f"Index {index} out of range for array"
+    return None, f"Key '{key}' not found in JSON data"
+
+
+def _is_columnar(value) -> bool:
+    """True for the nodes of a columnar document (which only exist once json_columnar is imported)"""
+    json_columnar = sys.modules.get("json_columnar")
+    return json_columnar is not None and json_columnar.is_columnar(value)
+
+
+def _format_json_value(value) -> str:
+    """Convert a resolved JSON value to the string returned to Blueprints"""
+    if _is_columnar(value):
+        value = sys.modules["json_columnar"].materialize(value)
+    if isinstance(value, (dict, list)):
+        return json_backend.dumps(value, indent=2)
+    return str(value)
+
+
+def _resolve_key_paths(json_data, key_paths) -> list:
+    """
+    Resolve many key paths against one document sharing common prefixes
+
+    The paths are merged into a trie so every shared parent node is walked
+    only once. Paths that can't be resolved produce an empty string.
+
+    Args:
+        json_data: Parsed JSON document
+        key_paths: Iterable of dot-separated key paths
+
+    Returns:
+        tuple: (one string per key path in the same order, list of error messages)
+    """
+    results = [""] * len(key_paths)
+    errors = []
+    # nodo del trie: [hijos por segmento, indices de resultado que terminan aqui]
+    root = [{}, []]
+    for position, key_path in enumerate(key_paths):
+        node = root
+        for segment in compile_key_path(key_path).segments:
+            node = node[0].setdefault(segment, [{}, []])
+        node[1].append(position)
+
+    stack = [(child, segment, json_data) for segment, child in root[0].items()]
+    while stack:
+        node, segment, parent_data = stack.pop()
+        current_data, error = _step_into(parent_data, segment)
+        if error is not None:
+            errors.append(error)
+            continue
+        if node[1]:
+            formatted = _format_json_value(current_data)
+            for position in node[1]:
+                results[position] = formatted
+        for child_segment, child in node[0].items():
+            stack.append((child, child_segment, current_data))
+    return results, errors
+
+
+# Operaciones de las consultas
+_QUERY_KEY = 0
+_QUERY_WILDCARD = 1
+_QUERY_INDEX = 2
+_QUERY_SLICE = 3
+_QUERY_FILTER = 4
+
+_QUERY_AGGREGATES = ("count", "sum", "min", "max", "avg")
+_QUERY_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+_QUERY_AGGREGATE_RE = re.compile(r"^\s*(count|sum|min|max|avg)\s*\((.*)\)\s*$")
+_QUERY_FILTER_RE = re.compile(r"^\s*([^<>=!]+?)\s*(==|!=|<=|>=|<|>|=)\s*(.+?)\s*$")
+
+
+class JsonQueryError(ValueError):
+    """Raised for queries that can't be parsed"""
+
+
+def _parse_query_literal(text: str):
+    """Literal on the right side of a predicate: JSON value, 'string' or bare word"""
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        return text[1:-1]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+class CompiledQuery:
+    """
+    Query over a JSON document, parsed once
+
+    Syntax: a dot-separated key path whose segments can also be
+        *                 every value of an object or item of an array
+        name[3]           array index (negative counts from the end)
+        name[1:10:2]      array slice
+        name[*]           every item
+        name[?key<50]     items whose key (a relative key path) satisfies
+                          ==, !=, <, <=, > or >= against a JSON literal,
+                          'string' or bare word; [?key] keeps items having key
+    optionally wrapped in an aggregate: count(...), sum(...), min(...),
+    max(...) or avg(...). Use compile_query() to get memoized instances.
+    """
+    __slots__ = ("query", "steps", "aggregate")
+
+    def __init__(self, query: str):
+        self.query = query
+        self.aggregate = None
+        match = _QUERY_AGGREGATE_RE.match(query)
+        if match:
+            self.aggregate, query = match.group(1), match.group(2)
+        self.steps = tuple(self._parse_path(query.strip()))
+
+    @staticmethod
+    def _parse_path(path: str):
+        position = 0
+        while position < len(path):
+            end = position
+            while end < len(path) and path[end] not in ".[":
+                end += 1
+            name = path[position:end]
+            if name == "*":
+                yield (_QUERY_WILDCARD,)
+            elif name:
+                yield (_QUERY_KEY, name, int(name) if name.isdecimal() and name.isascii() else None)
+            position = end
+            while position < len(path) and path[position] == "[":
+                close = CompiledQuery._find_bracket_end(path, position)
+                yield CompiledQuery._parse_bracket(path[position + 1:close].strip())
+                position = close + 1
+            if position < len(path):
+                if path[position] != ".":
+                    raise JsonQueryError(f"Unexpected '{path[position]}' at position {position}")
+                position += 1
+
+    @staticmethod
+    def _find_bracket_end(path: str, start: int) -> int:
+        quote = None
+        for position in range(start + 1, len(path)):
+            char = path[position]
+            if quote:
+                if char == quote:
+                    quote = None
+            elif char in "'\"":
+                quote = char
+            elif char == "]":
+                return position
+        raise JsonQueryError(f"Unclosed '[' at position {start}")
+
+    @staticmethod
+    def _parse_bracket(content: str):
+        if content == "*":
+            return (_QUERY_WILDCARD,)
+        if content.startswith("?"):
+            condition = content[1:].strip()
+            match = _QUERY_FILTER_RE.match(condition)
+            if match is None:
+                if not condition:
+                    raise JsonQueryError("Empty filter")
+                return (_QUERY_FILTER, compile_key_path(condition), None, None)
+            field, operator, literal = match.groups()
+            operator = "==" if operator == "=" else operator
+            return (_QUERY_FILTER, compile_key_path(field), _QUERY_OPERATORS[operator], _parse_query_literal(literal))
+        try:
+            if ":" in content:
+                parts = [int(part) if part.strip() else None for part in content.split(":")]
+                if len(parts) > 3:
+                    raise ValueError(content)
+                return (_QUERY_SLICE, slice(*parts))
+            return (_QUERY_INDEX, int(content))
+        except ValueError:
+            raise JsonQueryError(f"Invalid array selector [{content}]")
+
+    def select(self, json_data) -> list:
+        """
+        Evaluate the path part of the query
+
+        Returns:
+            list: Every matched value, in document order
+        """
+        columnar = _is_columnar(json_data)
+        current = [json_data]
+        for step in self.steps:
+            if columnar:
+                current = _select_columnar_step(current, step)
+            else:
+                current = _select_step(current, step)
+        return current
+
+    def evaluate(self, json_data):
+        """
+        Run the query
+
+        Returns:
+            list of matched values, or the aggregate (None for min/max/avg/sum of no numbers)
+        """
+        values = self.select(json_data)
+        if _is_columnar(json_data):
+            return _finish_columnar_query(values, self.aggregate)
+        if self.aggregate is None:
+            return values
+        return aggregate_values(self.aggregate, values)
+
+
+def _select_step(current: list, step) -> list:
+    """Apply one query step to every node of a plain document"""
+    kind = step[0]
+    matched = []
+    if kind == _QUERY_KEY:
+        segment = step[1:]
+        for node in current:
+            child, error = _step_into(node, segment)
+            if error is None:
+                matched.append(child)
+    elif kind == _QUERY_WILDCARD:
+        for node in current:
+            if node.__class__ is dict:
+                matched.extend(node.values())
+            elif node.__class__ is list:
+                matched.extend(node)
+    elif kind == _QUERY_INDEX:
+        index = step[1]
+        for node in current:
+            if node.__class__ is list and -len(node) <= index < len(node):
+                matched.append(node[index])
+    elif kind == _QUERY_SLICE:
+        for node in current:
+            if node.__class__ is list:
+                matched.extend(node[step[1]])
+    else:
+        _, field, operator, literal = step
+        for node in current:
+            children = node.values() if node.__class__ is dict else node if node.__class__ is list else ()
+            matched.extend(child for child in children if _query_predicate(child, field, operator, literal))
+    return matched
+
+
+def _select_columnar_step(current: list, step) -> list:
+    """
+    Apply one query step to the nodes of a columnar document
+
+    Record arrays stay columnar through wildcards, slices, field selection and
+    filters on one field; anything else rebuilds the records and continues
+    on the plain path, so the result is the same as for the parsed document.
+    """
+    import json_columnar
+
+    # Nodos que solo aparecen al consultar documentos por columnas
+    columnar_nodes = (
+        json_columnar.SkeletonDict, json_columnar.SkeletonList, json_columnar.ColumnarArray,
+        json_columnar.ColumnarRecords, json_columnar.ColumnValues,
+    )
+    kind = step[0]
+    matched = []
+    plain = []
+    for node in current:
+        node_class = node.__class__
+        if node_class not in columnar_nodes:
+            plain.append(node)
+            continue
+        if plain:
+            matched.extend(_select_step(plain, step))
+            plain = []
+
+        if node_class is json_columnar.ColumnarArray:
+            if kind == _QUERY_KEY:
+                child, error = _step_into(node, step[1:])
+                if error is None:
+                    matched.append(child)
+            elif kind == _QUERY_WILDCARD:
+                matched.append(json_columnar.ColumnarRecords(node))
+            elif kind == _QUERY_INDEX:
+                if -len(node) <= step[1] < len(node):
+                    matched.append(node.record(step[1] % len(node)))
+            elif kind == _QUERY_SLICE:
+                matched.append(json_columnar.ColumnarRecords(node.take(step[1])))
+            else:
+                _, field, operator, literal = step
+                view = None
+                if len(field.segments) == 1:
+                    view = node.filter(field.key_path, operator, literal)
+                if view is not None:
+                    matched.append(json_columnar.ColumnarRecords(view))
+                else:
+                    matched.extend(_select_step([node.to_list()], step))
+        elif node_class is json_columnar.ColumnarRecords and kind == _QUERY_KEY:
+            if step[1] in node.array.fields:
+                matched.append(json_columnar.ColumnValues(node.array, step[1]))
+        elif node_class is json_columnar.ColumnarRecords or node_class is json_columnar.ColumnValues:
+            matched.extend(_select_step(node.to_list(), step))
+        elif kind == _QUERY_KEY:
+            child, error = _step_into(node, step[1:])
+            if error is None:
+                matched.append(child)
+        else:
+            # Contenedor del esqueleto: mismas reglas que un dict/list, sus hijos pueden ser columnares
+            children = list(node.values()) if node_class is json_columnar.SkeletonDict else node
+            if kind == _QUERY_WILDCARD:
+                matched.extend(children)
+            elif kind == _QUERY_INDEX:
+                if node_class is json_columnar.SkeletonList and -len(node) <= step[1] < len(node):
+                    matched.append(node[step[1]])
+            elif kind == _QUERY_SLICE:
+                if node_class is json_columnar.SkeletonList:
+                    matched.extend(node[step[1]])
+            else:
+                _, field, operator, literal = step
+                matched.extend(child for child in children if _columnar_predicate(child, field, operator, literal))
+    if plain:
+        matched.extend(_select_step(plain, step))
+    return matched
+
+
+def _columnar_predicate(item, field: CompiledKeyPath, operator, literal) -> bool:
+    import json_columnar
+
+    value, error = field.resolve(item)
+    if error is not None:
+        return False
+    if operator is None:
+        return value is not None
+    try:
+        return operator(json_columnar.materialize(value), literal)
+    except TypeError:
+        return False
+
+
+def _finish_columnar_query(values: list, aggregate: str):
+    """Turn the nodes selected in a columnar document into the plain result"""
+    import json_columnar
+
+    lazy = (json_columnar.ColumnarRecords, json_columnar.ColumnValues)
+    if aggregate == "count":
+        return sum(len(value) if value.__class__ in lazy else 1 for value in values)
+    if aggregate is not None and len(values) == 1 and values[0].__class__ is json_columnar.ColumnValues:
+        numbers = values[0].numbers()
+        if numbers is not None:
+            # Columna int64/float64 sin nulls: se reduce sin reconstruir los valores
+            return aggregate_values(aggregate, numbers)
+
+    result = []
+    for value in values:
+        if value.__class__ in lazy:
+            result.extend(value.to_list())
+        else:
+            result.append(json_columnar.materialize(value))
+    if aggregate is None:
+        return result
+    return aggregate_values(aggregate, result)
+
+
+def _query_predicate(item, field: CompiledKeyPath, operator, literal) -> bool:
+    value, error = field.resolve(item)
+    if error is not None:
+        return False
+    if operator is None:
+        return value is not None
+    try:
+        return operator(value, literal)
+    except TypeError:
+        # Tipos no comparables (p. ej. texto < numero): no cumple
+        return False
+
+
+@lru_cache(maxsize=1)
+def _import_numpy():
+    """NumPy, imported on first use, or None if it isn't installed"""
+    try:
+        # Incluido en PythonFoundationPackages; sin el las agregaciones usan Python puro
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def aggregate_values(function: str, values):
+    """
+    Apply count/sum/min/max/avg to a list of values (or a NumPy array)
+
+    count counts every value; the others ignore anything that isn't a number
+    (strings, booleans, null). Integer results are exact; large float
+    columns are reduced with NumPy when it is available.
+    """
+    if function == "count":
+        return len(values)
+    array = None
+    # Un array de NumPy solo puede llegar si NumPy ya esta importado
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        if values.dtype.kind == "i":
+            return _aggregate_integers(function, values)
+        # Mismo criterio que con listas: pocos valores se reducen en Python
+        if len(values) >= JSON_QUERY_NUMPY_MIN_VALUES:
+            array = values
+        else:
+            values = values.tolist()
+    if array is None:
+        numbers = [value for value in values if value.__class__ is int or value.__class__ is float]
+        if not numbers:
+            return None
+        numpy = None
+        if len(numbers) >= JSON_QUERY_NUMPY_MIN_VALUES and any(
+                value.__class__ is float for value in numbers):
+            numpy = _import_numpy()
+        if numpy is not None:
+            array = numpy.fromiter(numbers, dtype=numpy.float64, count=len(numbers))
+        else:
+            if function == "sum":
+                return sum(numbers)
+            if function == "min":
+                return min(numbers)
+            if function == "max":
+                return max(numbers)
+            return sum(numbers) / len(numbers)
+
+    if not len(array):
+        return None
+    result = {"sum": array.sum, "min": array.min, "max": array.max, "avg": array.mean}[function]()
+    return result.item()
+
+
+def _aggregate_integers(function: str, array):
+    """Reduce an int64 array with the same exact results as Python ints"""
+    if not len(array):
+        return None
+    low = array.min().item()
+    high = array.max().item()
+    if function == "min":
+        return low
+    if function == "max":
+        return high
+    # La suma en int64 solo se usa si no puede desbordar
+    if len(array) * max(-low, high) < 2 ** 63:
+        total = array.sum().item()
+    else:
+        total = sum(array.tolist())
+    return total if function == "sum" else total / len(array)
+
+
+@lru_cache(maxsize=1024)
+def compile_query(query: str) -> CompiledQuery:
+    """Return the memoized CompiledQuery for query (raises JsonQueryError)"""
+    return CompiledQuery(query)
+
+
+def query_json_value(full_path: str, query: str):
+    """
+    Run a query against a JSON file without logging
+
+    Args:
+        full_path: Absolute path to an existing JSON file
+        query: Query in CompiledQuery syntax
+
+    Returns:
+        tuple: (result formatted like get_json_value_by_path, error message or None)
+    """
+    try:
+        compiled = compile_query(query)
+    except JsonQueryError as e:
+        return None, f"Invalid query '{query}': {e}"
+    document = get_columnar_document(full_path)
+    result = compiled.evaluate(document_cache.load(full_path) if document is None else document)
+    if compiled.aggregate is None:
+        return json_backend.dumps(result, indent=2), None
+    return ("" if result is None else str(result)), None
+
+
+_CONTAINERS = (dict, list)
+
+
+def _join_key_path(prefix: str, key) -> str:
+    """Child key path in get_json_value_by_path syntax ("" is the root)"""
+    return f"{prefix}.{key}" if prefix else str(key)
+
+
+def hash_json(json_data) -> dict:
+    """
+    Hash every dict and list of a document bottom-up
+
+    Hashes are BLAKE2b digests of the canonical repr of each container (keys,
+    child digests or scalar values and their types), so 1, 1.0 and true
+    differ and equal digests mean equal subtrees. The result is keyed by id()
+    of each container, so it is only valid while json_data is alive and
+    unmodified.
+
+    Args:
+        json_data: Parsed JSON document
+
+    Returns:
+        dict: id(container) -> 16-byte subtree digest
+    """
+    hashes = {}
+    if json_data.__class__ not in _CONTAINERS:
+        return hashes
+
+    stack = [(json_data, False)]
+    while stack:
+        node, children_done = stack.pop()
+        values = node.values() if node.__class__ is dict else node
+        if children_done:
+            children = tuple([hashes[id(value)] if value.__class__ in _CONTAINERS else value for value in values])
+            kinds = tuple([value.__class__.__name__ for value in values])
+            # hash() no sirve: hash(-1) == hash(-2) y los cambios se perderian
+            canonical = (1, tuple(node), children, kinds) if node.__class__ is dict else (2, children, kinds)
+            hashes[id(node)] = hashlib.blake2b(
+                repr(canonical).encode("utf-8", "surrogatepass"), digest_size=16
+            ).digest()
+            continue
+        stack.append((node, True))
+        for value in values:
+            if value.__class__ in _CONTAINERS:
+                stack.append((value, False))
+    return hashes
+
+
+def _fingerprints(values, hashes: dict) -> list:
+    """Comparable stand-ins for values: (type, subtree hash) for containers, (type, value) otherwise"""
+    return [(value.__class__, hashes[id(value)] if value.__class__ in _CONTAINERS else value) for value in values]
+
+
+class JsonChangeSet:
+    """
+    Differences between two versions of a document
+
+    Paths use the get_json_value_by_path syntax; "" is the whole document.
+    moved holds (old_path, new_path) pairs when move detection was requested.
+    """
+    __slots__ = ("added", "removed", "modified", "moved", "new_data")
+
+    def __init__(self, new_data=None):
+        self.added = []
+        self.removed = []
+        self.modified = []
+        self.moved = []
+        self.new_data = new_data
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified or self.moved)
+
+    def paths(self) -> list:
+        """Every path touched by the change, in the new document's terms where possible"""
+        return self.added + self.removed + self.modified + [new_path for _, new_path in self.moved]
+
+    def value(self, key_path: str):
+        """Value of key_path in the new document (None if it isn't there)"""
+        if key_path == "":
+            return self.new_data
+        value, error = compile_key_path(key_path).resolve(self.new_data)
+        return value if error is None else None
+
+    def as_dict(self, include_values: bool = False) -> dict:
+        """
+        JSON-serializable form of the change set
+
+        Args:
+            include_values: Add a "values" object with the new value of every added,
+                            modified or moved path
+        """
+        result = {
+            "added": self.added,
+            "removed": self.removed,
+            "modified": self.modified,
+            "moved": [{"from": old_path, "to": new_path} for old_path, new_path in self.moved],
+        }
+        if include_values:
+            result["values"] = {
+                path: self.value(path)
+                for path in self.added + self.modified + [new_path for _, new_path in self.moved]
+            }
+        return result
+
+
+def diff_json(old_data, new_data, detect_moves: bool = False, old_hashes: dict = None,
+              new_hashes: dict = None) -> JsonChangeSet:
+    """
+    Compare two versions of a document
+
+    Children are compared by subtree hash and only the ones that differ are
+    walked, so once both versions are hashed the comparison touches just the
+    changed branches (and the siblings along them). Pass the hashes of a
+    version kept from a previous diff to avoid rehashing it.
+
+    Args:
+        old_data: Previous document
+        new_data: New document
+        detect_moves: Report array elements that changed position as moves
+                      instead of as modified/added/removed entries
+        old_hashes: hash_json(old_data), computed if None
+        new_hashes: hash_json(new_data), computed if None
+
+    Returns:
+        JsonChangeSet: Added, removed, modified and moved key paths
+    """
+    changes = JsonChangeSet(new_data)
+    if old_hashes is None:
+        old_hashes = hash_json(old_data)
+    if new_hashes is None:
+        new_hashes = hash_json(new_data)
+    if _fingerprints((old_data,), old_hashes) == _fingerprints((new_data,), new_hashes):
+        return changes
+
+    stack = [(old_data, new_data, "")]
+    while stack:
+        old_value, new_value, path = stack.pop()
+        if old_value.__class__ is not new_value.__class__ or new_value.__class__ not in _CONTAINERS:
+            changes.modified.append(path)
+            continue
+
+        pending = []
+        if new_value.__class__ is dict:
+            old_fingerprints = dict(zip(old_value, _fingerprints(old_value.values(), old_hashes)))
+            new_fingerprints = _fingerprints(new_value.values(), new_hashes)
+            for (key, value), fingerprint in zip(new_value.items(), new_fingerprints):
+                if key not in old_fingerprints:
+                    changes.added.append(_join_key_path(path, key))
+                elif old_fingerprints[key] != fingerprint:
+                    pending.append((old_value[key], value, _join_key_path(path, key)))
+            changes.removed.extend(_join_key_path(path, key) for key in old_value if key not in new_value)
+        else:
+            old_fingerprints = _fingerprints(old_value, old_hashes)
+            new_fingerprints = _fingerprints(new_value, new_hashes)
+            if detect_moves:
+                pending = _diff_array_moves(old_value, new_value, path, old_fingerprints, new_fingerprints, changes)
+            else:
+                common = min(len(old_value), len(new_value))
+                for index in range(common):
+                    if old_fingerprints[index] != new_fingerprints[index]:
+                        pending.append((old_value[index], new_value[index], _join_key_path(path, index)))
+                changes.added.extend(_join_key_path(path, index) for index in range(common, len(new_value)))
+                changes.removed.extend(_join_key_path(path, index) for index in range(common, len(old_value)))
+        # En orden inverso para que los cambios salgan en orden de documento
+        stack.extend(reversed(pending))
+    return changes
+
+
+def _diff_array_moves(old_list, new_list, path, old_fingerprints, new_fingerprints, changes) -> list:
+    """Match array elements by fingerprint. Returns the (old, new, path) pairs still to compare"""
+    matched_old = set()
+    matched_new = set()
+    for index in range(min(len(old_list), len(new_list))):
+        if old_fingerprints[index] == new_fingerprints[index]:
+            matched_old.add(index)
+            matched_new.add(index)
+
+    unmatched = {}
+    for index, fingerprint in enumerate(old_fingerprints):
+        if index not in matched_old:
+            unmatched.setdefault(fingerprint, collections.deque()).append(index)
+    for index, fingerprint in enumerate(new_fingerprints):
+        candidates = unmatched.get(fingerprint)
+        if index in matched_new or not candidates:
+            continue
+        old_index = candidates.popleft()
+        matched_old.add(old_index)
+        matched_new.add(index)
+        changes.moved.append((_join_key_path(path, old_index), _join_key_path(path, index)))
+
+    pending = []
+    for index in range(len(new_list)):
+        if index in matched_new:
+            continue
+        if index < len(old_list) and index not in matched_old:
+            # Misma posicion en ambas versiones: se compara su contenido
+            matched_old.add(index)
+            pending.append((old_list[index], new_list[index], _join_key_path(path, index)))
+        else:
+            changes.added.append(_join_key_path(path, index))
+    changes.removed.extend(_join_key_path(path, index) for index in range(len(old_list)) if index not in matched_old)
+    return pending
+
+
+class JsonVersionTracker:
+    """
+    Remembers the last version of each file read so the next one can be diffed
+
+    Keeps the previous document and its subtree hashes, so only the new
+    version has to be hashed on each diff.
+    """
+
+    def __init__(self):
+        self._versions = {}  # full_path -> (json_data, hashes)
+        self._lock = threading.Lock()
+
+    def diff_file(self, full_path: str, detect_moves: bool = False) -> JsonChangeSet:
+        """
+        Load full_path through the document cache and diff it against the last version seen
+
+        The first call for a file reports the whole document as added ("").
+
+        Returns:
+            JsonChangeSet: Changes since the previous call (new_data is the current document)
+        """
+        json_data = document_cache.load(full_path)
+        key = JsonDocumentCache._key(full_path)
+        with self._lock:
+            previous = self._versions.get(key)
+
+        if previous is not None and previous[0] is json_data:
+            # Sin cambios: la cache devolvio el mismo documento
+            return JsonChangeSet(json_data)
+
+        hashes = hash_json(json_data)
+        if previous is None:
+            changes = JsonChangeSet(json_data)
+            changes.added.append("")
+        else:
+            changes = diff_json(previous[0], json_data, detect_moves, previous[1], hashes)
+
+        with self._lock:
+            self._versions[key] = (json_data, hashes)
+        return changes
+
+    def forget(self, full_path: str) -> bool:
+        """Drop the stored version (e.g. after the file was deleted)"""
+        with self._lock:
+            return self._versions.pop(JsonDocumentCache._key(full_path), None) is not None
+
+
+# Versiones vistas por read_and_log_json_file_changes y diff_json_file
+version_tracker = JsonVersionTracker()
+
+
+def _iter_change_log_lines(changes: JsonChangeSet):
+    """Yield the log lines of a change set: the new value of every added/modified path"""
+    for marker, paths in (("+", changes.added), ("~", changes.modified)):
+        for path in paths:
+            value = changes.value(path)
+            if isinstance(value, (dict, list)):
+                yield f"{marker} {path or '<root>'}:"
+                yield from _iter_log_lines(value, path)
+            else:
+                yield f"{marker} {path or '<root>'}: {value} ({type(value).__name__})"
+    for path in changes.removed:
+        yield f"- {path or '<root>'}"
+    for old_path, new_path in changes.moved:
+        yield f"> {old_path} -> {new_path}"
+
+
+# Tipos de fila del indice
+_INDEX_SCALAR = json_scanner.INDEX_SCALAR
+_INDEX_OBJECT = json_scanner.INDEX_OBJECT
+_INDEX_ARRAY = json_scanner.INDEX_ARRAY
+_INDEX_VERSION = json_scanner.INDEX_VERSION
+
+
+class JsonPathIndex:
+    """
+    On-disk sidecar index with the byte span of the subtrees of a JSON file
+
+    Stored as a SQLite database next to the source (<file>.idx). Only the
+    children of the root and of containers of at least JSON_INDEX_SPAN_BYTES
+    are stored, so a lookup is one probe for the deepest indexed prefix of
+    the path plus one small slice read; a path missing under an indexed
+    container fails without reading the source. The index is rebuilt when
+    the source's (mtime_ns, size) changes.
+    """
+
+    def __init__(self, source_path: str):
+        self.source_path = source_path
+        self.index_path = source_path + JSON_INDEX_SUFFIX
+        self._connection = None
+        self._signature = None
+        self._root_kind = None
+        self._span_bytes = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """
+        Open the sidecar if it matches the source
+
+        Returns:
+            bool: True if the index is current and can be used
+        """
+        stat_result = os.stat(self.source_path)
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        with self._lock:
+            if self._connection is not None and self._signature == signature:
+                return True
+            self._close()
+            return self._open_existing(signature)
+
+    def ensure_current(self) -> None:
+        """Open the sidecar, building or rebuilding it on this thread if it is stale"""
+        if not self.refresh():
+            self.build()
+            if not self.refresh():
+                raise OSError(f"Index {self.index_path} is out of date after building it")
+
+    def build(self) -> str:
+        """Write the sidecar on this thread. Returns the index path"""
+        return json_scanner.build_path_index(self.source_path, self.index_path, JSON_INDEX_SPAN_BYTES)
+
+    def _open_existing(self, signature: tuple) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        import sqlite3
+
+        connection = sqlite3.connect(self.index_path, check_same_thread=False)
+        try:
+            meta = dict(connection.execute("SELECT key, value FROM meta"))
+        except sqlite3.Error:
+            meta = {}
+        if (meta.get("version") != _INDEX_VERSION
+                or (meta.get("mtime_ns"), meta.get("size")) != signature):
+            connection.close()
+            return False
+        self._connection = connection
+        self._signature = signature
+        self._root_kind = meta.get("root_kind")
+        self._span_bytes = meta.get("span_bytes")
+        return True
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def lookup(self, key_path: str):
+        """
+        Look up a dot-notation key path
+
+        Args:
+            key_path: Same syntax as get_json_value_by_path
+
+        Returns:
+            tuple: (value string, error) where error is None on success
+        """
+        segments = compile_key_path(key_path).segments
+        # Claves canonicas de los segmentos ya recorridos ("01" pasa a "1" bajo un array indexado)
+        keys = [key for key, index in segments]
+        matched = 0
+        kind, start, end = self._root_kind, None, None
+        with self._lock:
+            # Mientras el nodo actual tenga sus hijos en el indice, un hijo ausente no existe
+            while (matched < len(keys) and kind != _INDEX_SCALAR
+                   and (start is None or end - start >= self._span_bytes)):
+                prefixes = ['.'.join(keys[:length]) for length in range(len(keys), matched, -1)]
+                row = self._connection.execute(
+                    "SELECT path, kind, start, end FROM paths WHERE path IN (%s) "
+                    "ORDER BY length(path) DESC LIMIT 1" % ", ".join("?" * len(prefixes)),
+                    prefixes,
+                ).fetchone()
+                if row is not None:
+                    path, kind, start, end = row
+                    matched = path.count('.') + 1
+                    continue
+                key, index = segments[matched]
+                if kind == _INDEX_ARRAY and index is not None:
+                    if str(index) == keys[matched]:
+                        return None, f"Index {index} out of range for array"
+                    keys[matched] = str(index)
+                    continue
+                return None, f"Key '{key}' not found in JSON data"
+
+        if start is None:
+            current_data = document_cache.load(self.source_path)
+        else:
+            with open(self.source_path, 'rb') as file:
+                file.seek(start)
+                current_data = json_backend.loads(file.read(end - start))
+        for segment in segments[matched:]:
+            current_data, error = _step_into(current_data, segment)
+            if error is not None:
+                return None, error
+        return _format_json_value(current_data), None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_path_indexes = {}
+_path_indexes_lock = threading.Lock()
+# ruta -> Future de la construccion en segundo plano de su indice
+_index_builds = {}
+_index_executor = None
+
+
+def _index_build_executor():
+    """Return the executor for background index builds, a worker process if possible"""
+    global _index_executor
+    if _index_executor is None:
+        # Importado aqui: json_async importa este modulo
+        import json_async
+        if JSON_INDEX_PROCESS and json_async._configure_process_executable():
+            _index_executor = json_async._new_process_pool(1)
+        else:
+            _index_executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="JsonIndex")
+    return _index_executor
+
+
+def _schedule_index_build(index) -> None:
+    """Start building index in the background unless a build is already running. Call with the lock held"""
+    future = _index_builds.get(index.source_path)
+    if future is not None:
+        if not future.done():
+            return
+        del _index_builds[index.source_path]
+        if future.exception() is not None:
+            unreal.log_warning(f"Could not build JSON index for {index.source_path}: {str(future.exception())}")
+            return
+
+    _index_builds[index.source_path] = _index_build_executor().submit(
+        json_scanner.build_path_index, index.source_path, index.index_path, JSON_INDEX_SPAN_BYTES
+    )
+
+
+def get_path_index(full_path: str, force: bool = False):
+    """
+    Return an up-to-date JsonPathIndex for full_path, or None if not usable yet
+
+    Files smaller than JSON_INDEX_MIN_BYTES are not indexed unless force is
+    set. A missing or stale sidecar is built in a worker process and None is
+    returned meanwhile, so the caller answers from the document cache; with
+    force it is built on the calling thread instead.
+
+    Args:
+        full_path: Absolute path to the JSON file
+        force: Index the file regardless of its size, building it now if needed
+
+    Returns:
+        JsonPathIndex or None
+    """
+    if not force and (not JSON_INDEX_ENABLED or os.path.getsize(full_path) < JSON_INDEX_MIN_BYTES):
+        return None
+    import sqlite3
+
+    key = os.path.realpath(full_path)
+    with _path_indexes_lock:
+        index = _path_indexes.get(key)
+        if index is None:
+            index = _path_indexes[key] = JsonPathIndex(key)
+
+    try:
+        if force:
+            index.ensure_current()
+        elif not index.refresh():
+            with _path_indexes_lock:
+                _schedule_index_build(index)
+            return None
+    except (OSError, sqlite3.Error) as e:
+        unreal.log_warning(f"Could not build JSON index for {full_path}: {str(e)}")
+        return None
+    return index
+
+
+# ruta -> (firma, documento por columnas o None si no tiene arrays de registros)
+_columnar_documents = {}
+_columnar_documents_lock = threading.Lock()
+
+
+def get_columnar_document(full_path: str, force: bool = False):
+    """
+    Return the columnar form of full_path, or None if it isn't used for this file
+
+    Arrays of same-shaped objects are kept by columns (see json_columnar) and
+    saved to a <file>.cols.npz sidecar, so later sessions load them without
+    parsing the file. An up-to-date sidecar is always used; otherwise files
+    smaller than JSON_COLUMNAR_MIN_BYTES are skipped unless force is set, and
+    huge streaming-mode files are only converted on force. Needs NumPy.
+
+    Args:
+        full_path: Absolute path to the JSON file
+        force: Convert the file regardless of its size
+
+    Returns:
+        The document with ColumnarArray nodes, or None
+    """
+    if not (force or JSON_COLUMNAR_ENABLED):
+        return None
+    stat_result = os.stat(full_path)
+    signature = (stat_result.st_mtime_ns, stat_result.st_size)
+    entry = _columnar_documents.get(full_path)
+    if entry is not None and entry[0] == signature and (entry[1] is not None or not force):
+        return entry[1]
+
+    key = os.path.realpath(full_path)
+    sidecar_path = key + JSON_COLUMNAR_SUFFIX
+    skipped = not force and not JSON_COLUMNAR_MIN_BYTES <= stat_result.st_size < JSON_STREAM_MIN_BYTES
+    if skipped and not os.path.exists(sidecar_path):
+        # Sin sidecar ni tamaño para convertirlo: no hace falta cargar NumPy
+        _columnar_documents[full_path] = (signature, None)
+        return None
+    # Importado aqui: trae NumPy, que solo hace falta con documentos por columnas
+    import json_columnar
+
+    if not json_columnar.is_available():
+        return None
+    with _columnar_documents_lock:
+        document = json_columnar.load_sidecar(sidecar_path, signature)
+        if document is None:
+            if skipped:
+                _columnar_documents[full_path] = (signature, None)
+                return None
+            document, arrays = json_columnar.columnarize(
+                document_cache.load(key), 1 if force else json_columnar.COLUMNAR_MIN_RECORDS
+            )
+            if arrays:
+                try:
+                    json_columnar.save_sidecar(sidecar_path, signature, document, arrays)
+                except OSError as e:
+                    unreal.log_warning(f"Could not write JSON columnar sidecar for {full_path}: {str(e)}")
+                # Los registros ya estan por columnas: el documento completo sale de la cache
+                document_cache.invalidate(key)
+                unreal.log(
+                    f"Columnar cache for {full_path}: {len(arrays)} arrays, "
+                    f"{sum(len(array) for _, array in arrays)} records, "
+                    f"{sum(array.nbytes for _, array in arrays)} bytes"
+                )
+            else:
+                document = None
+        _columnar_documents[full_path] = (signature, document)
+    return document
+
+
+def _use_streaming(full_path: str) -> bool:
+    """True if full_path is large enough to be read in streaming mode"""
+    return os.path.getsize(full_path) >= JSON_STREAM_MIN_BYTES
+
+
+def _stream_value_by_path(full_path: str, key_path: str):
+    """
+    Find one value in a memory-mapped file, stopping as soon as it is found
+
+    Returns:
+        tuple: (value string, error) where error is None on success
+    """
+    with json_scanner.open_buffer(full_path) as buffer:
+        start, end, error = json_scanner.find_path(buffer, compile_key_path(key_path).segments)
+        if error is not None:
+            return None, error
+        return _format_json_value(json_backend.loads(buffer[start:end])), None
+
+
+class JsonLogSink:
+    """
+    Buffered destination for the lines produced when logging JSON values
+
+    Lines are joined and sent to unreal.log (or appended to a file) in chunks
+    of flush_lines lines or flush_bytes bytes, so a large document costs a
+    handful of engine calls instead of one per leaf. Once max_lines is
+    reached a truncation note is written and further lines are dropped.
+    """
+
+    def __init__(self, flush_lines: int = 1000, flush_bytes: int = 64 * 1024,
+                 max_lines: int = 0, output_file: str = ""):
+        self.flush_lines = max(1, flush_lines)
+        self.flush_bytes = max(1, flush_bytes)
+        self.max_lines = max_lines
+        self.output_file = output_file
+        self.lines = 0
+        self.truncated = False
+        self.flushes = 0
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._file = open(output_file, 'a', encoding='utf-8') if output_file else None
+        self._started = time.perf_counter()
+
+    @classmethod
+    def from_settings(cls):
+        """Create a sink from the JSON_LOG_* module settings"""
+        output_file = _resolve_json_path(JSON_LOG_OUTPUT_FILE) if JSON_LOG_OUTPUT_FILE else ""
+        return cls(JSON_LOG_FLUSH_LINES, JSON_LOG_FLUSH_BYTES, JSON_LOG_MAX_LINES, output_file)
+
+    @property
+    def full(self) -> bool:
+        return bool(self.max_lines) and self.lines >= self.max_lines
+
+    def write(self, line: str, counted: bool = True) -> bool:
+        """
+        Queue one line
+
+        Args:
+            line: Text to log
+            counted: False for headers/footers that ignore max_lines
+
+        Returns:
+            bool: False once max_lines has been reached
+        """
+        if counted:
+            if self.full:
+                if not self.truncated:
+                    self.truncated = True
+                    self._append(f"... output truncated (max_lines={self.max_lines})")
+                return False
+            self.lines += 1
+        self._append(line)
+        return True
+
+    def _append(self, line: str) -> None:
+        self._buffer.append(line)
+        self._buffer_bytes += len(line) + 1
+        if len(self._buffer) >= self.flush_lines or self._buffer_bytes >= self.flush_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        chunk = "\n".join(self._buffer)
+        if self._file is not None:
+            self._file.write(chunk + "\n")
+        else:
+            unreal.log(chunk)
+        self._buffer = []
+        self._buffer_bytes = 0
+        self.flushes += 1
+
+    def close(self) -> dict:
+        """
+        Flush pending lines and return the throughput of this sink
+
+        Returns:
+            dict: lines, truncated, flushes, seconds and lines_per_sec
+        """
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        elapsed = time.perf_counter() - self._started
+        stats = {
+            "lines": self.lines,
+            "truncated": self.truncated,
+            "flushes": self.flushes,
+            "seconds": elapsed,
+            "lines_per_sec": self.lines / elapsed if elapsed > 0 else 0.0,
+            "output_file": self.output_file,
+        }
+        global last_log_stats
+        last_log_stats = stats
+        return stats
+
+
+# Estadisticas del ultimo volcado (ver get_json_log_stats)
+last_log_stats = {}
+
+
+def _iter_children(data, prefix: str):
+    """Yield (path, value) for the direct children of a dict or list"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield (f"{prefix}.{key}" if prefix else key), value
+    else:
+        for i, item in enumerate(data):
+            yield (f"{prefix}[{i}]" if prefix else f"[{i}]"), item
+
+
+def _iter_log_lines(data, prefix: str = "", max_depth: int = 0):
+    """
+    Yield the lines used to log a JSON value, walking it with an explicit stack
+
+    Args:
+        data: JSON data to log (dict, list, or primitive)
+        prefix: Key path prefix of data
+        max_depth: Containers nested deeper than this are summarized (0 = no limit)
+    """
+    if not isinstance(data, (dict, list)):
+        # For primitive values at root level
+        yield f"{prefix}: {data} ({type(data).__name__})"
+        return
+
+    stack = [(_iter_children(data, prefix), 1)]
+    while stack:
+        children, depth = stack[-1]
+        for current_path, value in children:
+            if isinstance(value, (dict, list)):
+                if max_depth and depth >= max_depth:
+                    yield f"{current_path}: <{len(value)} entries truncated>"
+                    continue
+                yield f"{current_path}:"
+                stack.append((_iter_children(value, current_path), depth + 1))
+                break
+            yield f"{current_path}: {value} ({type(value).__name__})"
+        else:
+            stack.pop()
+
+
+def _format_log_path(path) -> str:
+    """Build the prefix _log_json_values uses for a scanner path tuple"""
+    prefix = ""
+    for key in path:
+        if isinstance(key, int):
+            prefix = f"{prefix}[{key}]"
+        else:
+            prefix = f"{prefix}.{key}" if prefix else key
+    return prefix
+
+
+def _iter_stream_log_lines(buffer, max_depth: int = 0):
+    """Yield the same lines _log_json_values would log, straight from the scanner"""
+    for kind, path, start, end, value in json_scanner.iter_events(buffer):
+        if kind == json_scanner.END or (max_depth and len(path) > max_depth):
+            continue
+        if kind == json_scanner.START:
+            if max_depth and len(path) == max_depth:
+                yield f"{_format_log_path(path)}: <entries truncated>"
+            elif path:
+                yield f"{_format_log_path(path)}:"
+        else:
+            yield f"{_format_log_path(path)}: {value} ({type(value).__name__})"
+
+
+def lookup_json_value(full_path: str, key_path: str):
+    """
+    Get one value from a JSON file without logging
+
+    Uses the columnar form or the sidecar index for large files, streaming
+    mode for huge ones and the document cache otherwise. Safe to call off
+    the game thread.
+
+    Args:
+        full_path: Absolute path to an existing JSON file
+        key_path: Dot-separated path to the value
+
+    Returns:
+        tuple: (value string, error) where error is None on success
+    """
+    # Arrays de registros guardados por columnas: se reconstruye solo lo pedido
+    document = get_columnar_document(full_path)
+    if document is not None:
+        current_data, error = compile_key_path(key_path).resolve(document)
+        if error is not None:
+            return None, error
+        return _format_json_value(current_data), None
+    
+    # Large files are answered from the sidecar index
+    index = get_path_index(full_path)
+    if index is not None:
+        return index.lookup(key_path)
+    
+    # Huge files without an index are searched in place, stopping early
+    if _use_streaming(full_path):
+        return _stream_value_by_path(full_path, key_path)
+    
+    current_data, error = compile_key_path(key_path).resolve(document_cache.load(full_path))
+    if error is not None:
+        return None, error
+    return _format_json_value(current_data), None
+
+
+def lookup_json_values(full_path: str, key_paths: list):
+    """
+    Get many values from a JSON file without logging
+
+    Args:
+        full_path: Absolute path to an existing JSON file
+        key_paths: Dot-separated paths to the values
+
+    Returns:
+        tuple: (one string per path, empty if not found; list of error messages)
+    """
+    document = get_columnar_document(full_path)
+    if document is not None:
+        return _resolve_key_paths(document, key_paths)
+    if get_path_index(full_path) is None and not _use_streaming(full_path):
+        return _resolve_key_paths(document_cache.load(full_path), key_paths)
+    
+    values = []
+    errors = []
+    for key_path in key_paths:
+        value, error = lookup_json_value(full_path, key_path)
+        if error is not None:
+            errors.append(error)
+        values.append(value or "")
+    return values, errors
+
+
+def format_json_file(full_path: str) -> str:
+    """
+    Return a JSON file formatted with indent=2, streaming it if it is huge
+
+    Args:
+        full_path: Absolute path to an existing JSON file
+
+    Returns:
+        str: The formatted document
+    """
+    if _use_streaming(full_path):
+        with json_scanner.open_buffer(full_path) as buffer:
+            return "".join(json_scanner.iter_dump_chunks(buffer, indent=2))
+    return json_backend.dumps(document_cache.load(full_path), indent=2)
+
+
+def iter_formatted_json_file(full_path: str, chunk_size: int = 256 * 1024):
+    """
+    Yield a JSON file formatted like format_json_file in pieces of about chunk_size characters
+
+    Large containers are serialized child by child, so the formatted text is
+    never held whole; huge files are re-serialized from the scanner without
+    being parsed. Safe to call off the game thread.
+
+    Args:
+        full_path: Absolute path to an existing JSON file
+        chunk_size: Target length of each piece
+
+    Yields:
+        str: Consecutive pieces of the formatted document
+    """
+    if _use_streaming(full_path):
+        with json_scanner.open_buffer(full_path) as buffer:
+            yield from _join_pieces(json_scanner.iter_dump_chunks(buffer, indent=2), chunk_size)
+    else:
+        yield from _join_pieces(_iter_formatted_value(document_cache.load(full_path), 0), chunk_size)
+
+
+def _join_pieces(pieces, chunk_size: int):
+    pending = []
+    size = 0
+    for piece in pieces:
+        pending.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield "".join(pending)
+
+
+# Contenedores con mas hijos que esto (o en los dos primeros niveles) se serializan hijo a hijo
+JSON_FORMAT_SPLIT_CHILDREN = 32
+
+
+def _iter_formatted_value(value, depth: int):
+    """Pieces of json_backend.dumps(value, indent=2) for a value nested depth levels deep"""
+    if not isinstance(value, (dict, list)) or not value or (depth >= 2 and len(value) <= JSON_FORMAT_SPLIT_CHILDREN):
+        text = json_backend.dumps(value, indent=2)
+        # Las cadenas JSON nunca llevan saltos de linea literales: basta con reindentar
+        yield text.replace("\n", "\n" + "  " * depth) if depth else text
+        return
+
+    is_dict = isinstance(value, dict)
+    yield "{" if is_dict else "["
+    separator = "\n" + "  " * (depth + 1)
+    for position, child in enumerate(value.items() if is_dict else value):
+        if is_dict:
+            key, child = child
+            yield ("," if position else "") + separator + json_backend.dumps(key, indent=2) + ": "
+        else:
+            yield ("," if position else "") + separator
+        yield from _iter_formatted_value(child, depth + 1)
+    yield "\n" + "  " * depth + ("}" if is_dict else "]")
+
+
+class JsonDirectoryLoad:
+    """
+    Result of bulk_load_json: the merged namespace plus per-file errors and timings
+
+    namespace nests every file under its relative path split on the path
+    separators and without the extension, so "levels/forest/level_01.json"
+    is reached with key paths like "levels.forest.level_01.player.name".
+    Names containing dots can't be addressed with dot notation.
+    """
+
+    def __init__(self, directory: str, pattern: str):
+        self.directory = directory
+        self.pattern = pattern
+        self.namespace = {}
+        self.files = 0
+        self.loaded = 0
+        self.errors = {}  # ruta relativa -> mensaje
+        self.bytes = 0
+        self.seconds = 0.0
+        self.processes = 0
+        self.chunks = 0
+        # id() de los dicts que son directorios (los documentos tambien pueden ser dicts)
+        self._directory_ids = {id(self.namespace)}
+
+    def add(self, relative_path: str, json_data) -> bool:
+        """Place a parsed file in the namespace. Returns False (and records an error) on a name clash"""
+        parts = os.path.splitext(relative_path)[0].split("/")
+        node = self.namespace
+        for part in parts[:-1]:
+            if part not in node:
+                node[part] = {}
+                self._directory_ids.add(id(node[part]))
+            elif id(node[part]) not in self._directory_ids:
+                self.errors[relative_path] = f"Namespace key '{part}' is already used by a file"
+                return False
+            node = node[part]
+        if parts[-1] in node:
+            self.errors[relative_path] = f"Namespace key '{parts[-1]}' is already used"
+            return False
+        node[parts[-1]] = json_data
+        self.loaded += 1
+        return True
+
+    def summary(self) -> dict:
+        """Counts, wall-clock seconds and throughput of the load"""
+        return {
+            "directory": self.directory,
+            "pattern": self.pattern,
+            "files": self.files,
+            "loaded": self.loaded,
+            "failed": len(self.errors),
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "files_per_sec": self.files / self.seconds if self.seconds else 0.0,
+            "mb_per_sec": self.bytes / self.seconds / (1024 * 1024) if self.seconds else 0.0,
+            "processes": self.processes,
+            "chunks": self.chunks,
+        }
+
+
+# Directorios cargados: ruta absoluta -> JsonDirectoryLoad
+_json_directories = {}
+
+
+def _chunk_files(file_paths: list, chunk_bytes: int) -> list:
+    """Split files into consecutive chunks of about chunk_bytes on disk"""
+    chunks = []
+    current = []
+    size = 0
+    for file_path in file_paths:
+        try:
+            file_size = os.path.getsize(file_path)
+        except OSError:
+            file_size = 0
+        current.append(file_path)
+        size += file_size
+        if size >= chunk_bytes:
+            chunks.append(current)
+            current = []
+            size = 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def bulk_load_json(directory: str, pattern: str = "**/*.json", processes: int = None, progress=None):
+    """
+    Parse every JSON file under a directory in parallel and merge them into one namespace
+
+    Files are grouped in chunks of similar on-disk size and parsed on a
+    process pool (in this process for few files, one process or no Python
+    interpreter). A file that fails is recorded in errors; the rest still load.
+    Parsed documents also fill document_cache, so later per-file calls
+    don't read them again.
+
+    Args:
+        directory: Absolute path to the directory
+        pattern: Glob relative to the directory ("**" matches subdirectories)
+        processes: Worker processes, None for JSON_BULK_PROCESSES (0 = one per core)
+        progress: Optional callable(done_files, total_files), called as chunks finish
+
+    Returns:
+        JsonDirectoryLoad: Also kept for get_json_directory
+    """
+    started_at = time.perf_counter()
+    result = JsonDirectoryLoad(directory, pattern)
+    file_paths = sorted(
+        path for path in glob.glob(os.path.join(glob.escape(directory), pattern), recursive=True)
+        if os.path.isfile(path)
+    )
+    result.files = len(file_paths)
+    result.bytes = sum(os.path.getsize(path) for path in file_paths)
+
+    if processes is None:
+        processes = JSON_BULK_PROCESSES
+    processes = min(processes or os.cpu_count() or 1, max(1, len(file_paths)))
+    if len(file_paths) < JSON_BULK_MIN_FILES or processes < 2:
+        processes = 1
+    else:
+        # Importado aqui: json_async importa este modulo
+        import json_async
+        if not json_async._configure_process_executable():
+            processes = 1
+    chunk_bytes = max(JSON_BULK_CHUNK_MIN_BYTES, result.bytes // (processes * JSON_BULK_CHUNKS_PER_PROCESS))
+    chunks = _chunk_files(file_paths, chunk_bytes)
+    result.processes = processes
+    result.chunks = len(chunks)
+
+    parsed = {}
+    done = 0
+    last_report = started_at
+
+    def collect(chunk_results):
+        nonlocal done, last_report
+        for file_path, signature, json_data, error in chunk_results:
+            relative_path = os.path.relpath(file_path, directory).replace(os.sep, "/")
+            if error is not None:
+                result.errors[relative_path] = error
+                continue
+            parsed[relative_path] = json_data
+            document_cache.put(file_path, signature, json_data)
+        done += len(chunk_results)
+        if progress is not None:
+            progress(done, result.files)
+        now = time.perf_counter()
+        if now - last_report >= JSON_BULK_PROGRESS_SECONDS:
+            last_report = now
+            unreal.log(f"Loading {directory}: {done}/{result.files} files")
+
+    if processes == 1:
+        for chunk in chunks:
+            collect(json_backend.load_files(chunk))
+    else:
+        with json_async._new_process_pool(processes) as pool:
+            # Los trozos vuelven con marshal: reconstruir los objetos aqui es el coste que no se reparte
+            futures = [pool.submit(json_backend.load_files, chunk, True) for chunk in chunks]
+            for future in concurrent.futures.as_completed(futures):
+                collect(marshal.loads(future.result()))
+
+    # Primero los archivos mas profundos: si "items.json" choca con el directorio items/, falla solo el archivo.
+    # Mismo orden siempre para que los choques sean deterministas
+    for relative_path in sorted(parsed, key=lambda path: (-path.count("/"), path)):
+        result.add(relative_path, parsed[relative_path])
+    result.seconds = time.perf_counter() - started_at
+    _json_directories[directory] = result
+    return result
+
+
+def get_json_directory(directory: str):
+    """Return the JsonDirectoryLoad of a loaded directory, or None"""
+    return _json_directories.get(directory)
+
 
 @unreal.uclass()
 class JsonReaderBFL(unreal.BlueprintFunctionLibrary):
@@ -19,39 +1793,52 @@ class JsonReaderBFL(unreal.BlueprintFunctionLibrary):
         Returns:
             bool: True if successful, False if failed
         """
-        try:
-            # Convert relative path to absolute if needed
-            if not os.path.isabs(file_path):
-                # Get the project directory
-                project_dir = unreal.Paths.project_dir()
-                full_path = os.path.join(project_dir, file_path)
-            else:
-                full_path = file_path
-            
-            # Check if file exists
-            if not os.path.exists(full_path):
-                unreal.log_error(f"JSON file not found: {full_path}")
-                return False
+        with metrics.timed("json.read_and_log_json_file"):
+            try:
+                # Convert relative path to absolute if needed
+                full_path = _resolve_json_path(file_path)
             
-            # Read and parse JSON file
-            with open(full_path, 'r', encoding='utf-8') as file:
-                json_data = json.load(file)
+                # Check if file exists
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return False
             
-            # Log the file path
-            unreal.log(f"=== JSON File Contents: {file_path} ===")
+                # Huge files are logged straight from the mapped file
+                if _use_streaming(full_path):
+                    sink = JsonLogSink.from_settings()
+                    try:
+                        with json_scanner.open_buffer(full_path) as buffer:
+                            sink.write(f"=== JSON File Contents: {file_path} ===", counted=False)
+                            for line in _iter_stream_log_lines(buffer, JSON_LOG_MAX_DEPTH):
+                                if not sink.write(line):
+                                    break
+                            sink.write("=== End JSON File Contents ===", counted=False)
+                    finally:
+                        sink.close()
+                    return True
             
-            # Log all values recursively
-            JsonReaderBFL._log_json_values(json_data, "")
+                # Read and parse JSON file (reused from the cache if unchanged)
+                json_data = document_cache.load(full_path)
             
-            unreal.log("=== End JSON File Contents ===")
-            return True
+                sink = JsonLogSink.from_settings()
+                try:
+                    # Log the file path
+                    sink.write(f"=== JSON File Contents: {file_path} ===", counted=False)
+                
+                    # Log all values
+                    JsonReaderBFL._log_json_values(json_data, "", sink)
+                
+                    sink.write("=== End JSON File Contents ===", counted=False)
+                finally:
+                    sink.close()
+                return True
             
-        except json.JSONDecodeError as e:
-            unreal.log_error(f"Invalid JSON format in file {file_path}: {str(e)}")
-            return False
-        except Exception as e:
-            unreal.log_error(f"Error reading JSON file {file_path}: {str(e)}")
-            return False
+            except (json.JSONDecodeError, json_scanner.JsonScanError) as e:
+                unreal.log_error(f"Invalid JSON format in file {file_path}: {str(e)}")
+                return False
+            except Exception as e:
+                unreal.log_error(f"Error reading JSON file {file_path}: {str(e)}")
+                return False
     
     @unreal.ufunction(static=True, params=[str], ret=str, meta=dict(category="JSON Utilities"))
     def read_json_file_as_string(file_path: str) -> str:
@@ -64,26 +1851,20 @@ class JsonReaderBFL(unreal.BlueprintFunctionLibrary):
         Returns:
             str: JSON contents as formatted string, or empty string if failed
         """
-        try:
-            # Convert relative path to absolute if needed
-            if not os.path.isabs(file_path):
-                project_dir = unreal.Paths.project_dir()
-                full_path = os.path.join(project_dir, file_path)
-            else:
-                full_path = file_path
-            
-            if not os.path.exists(full_path):
-                unreal.log_error(f"JSON file not found: {full_path}")
-                return ""
+        with metrics.timed("json.read_json_file_as_string"):
+            try:
+                # Convert relative path to absolute if needed
+                full_path = _resolve_json_path(file_path)
             
-            with open(full_path, 'r', encoding='utf-8') as file:
-                json_data = json.load(file)
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return ""
             
-            return json.dumps(json_data, indent=2, ensure_ascii=False)
+                return format_json_file(full_path)
             
-        except Exception as e:
-            unreal.log_error(f"Error reading JSON file {file_path}: {str(e)}")
-            return ""
+            except Exception as e:
+                unreal.log_error(f"Error reading JSON file {file_path}: {str(e)}")
+                return ""
     
     @unreal.ufunction(static=True, params=[str, str], ret=str, meta=dict(category="JSON Utilities"))
     def get_json_value_by_path(file_path: str, key_path: str) -> str:
@@ -97,48 +1878,92 @@ class JsonReaderBFL(unreal.BlueprintFunctionLibrary):
         Returns:
             str: Value as string, or empty string if not found
         """
-        try:
-            # Convert relative path to absolute if needed
-            if not os.path.isabs(file_path):
-                project_dir = unreal.Paths.project_dir()
-                full_path = os.path.join(project_dir, file_path)
-            else:
-                full_path = file_path
+        with metrics.timed("json.get_json_value_by_path"):
+            try:
+                # Convert relative path to absolute if needed
+                full_path = _resolve_json_path(file_path)
+            
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return ""
+            
+                value, error = lookup_json_value(full_path, key_path)
+                if error is not None:
+                    unreal.log_error(error)
+                    return ""
             
-            if not os.path.exists(full_path):
-                unreal.log_error(f"JSON file not found: {full_path}")
+                return value
+                
+            except Exception as e:
+                unreal.log_error(f"Error getting value from JSON file: {str(e)}")
                 return ""
+    
+    @unreal.ufunction(static=True, params=[str, unreal.Array(str)], ret=unreal.Array(str), meta=dict(category="JSON Utilities"))
+    def get_json_values_by_paths(file_path: str, key_paths: list) -> list:
+        """
+        Get many values from a JSON file in one call
+        
+        The file is loaded once and paths sharing a prefix walk the shared
+        parent nodes only once.
+        
+        Args:
+            file_path: Path to the JSON file
+            key_paths: Dot-separated paths to the values
+            
+        Returns:
+            list[str]: One value per path, empty string for paths not found
+        """
+        with metrics.timed("json.get_json_values_by_paths"):
+            key_paths = list(key_paths)
+            try:
+                full_path = _resolve_json_path(file_path)
             
-            with open(full_path, 'r', encoding='utf-8') as file:
-                json_data = json.load(file)
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return [""] * len(key_paths)
             
-            # Navigate through the key path
-            current_data = json_data
-            keys = key_path.split('.')
+                values, errors = lookup_json_values(full_path, key_paths)
+                for error in errors:
+                    unreal.log_error(error)
+                return values
             
-            for key in keys:
-                if isinstance(current_data, dict) and key in current_data:
-                    current_data = current_data[key]
-                elif isinstance(current_data, list) and key.isdigit():
-                    index = int(key)
-                    if 0 <= index < len(current_data):
-                        current_data = current_data[index]
-                    else:
-                        unreal.log_error(f"Index {index} out of range for array")
-                        return ""
-                else:
-                    unreal.log_error(f"Key '{key}' not found in JSON data")
+            except Exception as e:
+                unreal.log_error(f"Error getting values from JSON file: {str(e)}")
+                return [""] * len(key_paths)
+    
+    @unreal.ufunction(static=True, params=[str, str], ret=str, meta=dict(category="JSON Utilities"))
+    def query_json(file_path: str, query: str) -> str:
+        """
+        Run a query with wildcards, slices, filters and aggregates on a JSON file
+        
+        Examples: "player_data.inventory.*.item", "player_data.inventory[?durability<50].item",
+        "sum(player_data.inventory.*.quantity)", "count(achievements[0:2])"
+        
+        Args:
+            file_path: Path to the JSON file (relative to project or absolute)
+            query: Query (see CompiledQuery for the syntax)
+            
+        Returns:
+            str: JSON array of the matched values, the aggregate as a string,
+                 or empty string if failed
+        """
+        with metrics.timed("json.query_json"):
+            try:
+                full_path = _resolve_json_path(file_path)
+            
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
                     return ""
             
-            # Convert result to string
-            if isinstance(current_data, (dict, list)):
-                return json.dumps(current_data, indent=2, ensure_ascii=False)
-            else:
-                return str(current_data)
-                
-        except Exception as e:
-            unreal.log_error(f"Error getting value from JSON file: {str(e)}")
-            return ""
+                result, error = query_json_value(full_path, query)
+                if error is not None:
+                    unreal.log_error(error)
+                    return ""
+                return result
+            
+            except Exception as e:
+                unreal.log_error(f"Error querying JSON file {file_path}: {str(e)}")
+                return ""
     
     @unreal.ufunction(static=True, params=[str], ret=bool, meta=dict(category="JSON Utilities"))
     def log_json_string(json_string: str) -> bool:
@@ -151,53 +1976,431 @@ class JsonReaderBFL(unreal.BlueprintFunctionLibrary):
         Returns:
             bool: True if successful, False if failed
         """
-        try:
-            json_data = json.loads(json_string)
+        with metrics.timed("json.log_json_string"):
+            try:
+                json_data = json_backend.loads(json_string)
             
-            unreal.log("=== JSON String Contents ===")
-            JsonReaderBFL._log_json_values(json_data, "")
-            unreal.log("=== End JSON String Contents ===")
+                sink = JsonLogSink.from_settings()
+                try:
+                    sink.write("=== JSON String Contents ===", counted=False)
+                    JsonReaderBFL._log_json_values(json_data, "", sink)
+                    sink.write("=== End JSON String Contents ===", counted=False)
+                finally:
+                    sink.close()
             
-            return True
+                return True
             
-        except json.JSONDecodeError as e:
-            unreal.log_error(f"Invalid JSON format: {str(e)}")
-            return False
-        except Exception as e:
-            unreal.log_error(f"Error parsing JSON string: {str(e)}")
+            except json.JSONDecodeError as e:
+                unreal.log_error(f"Invalid JSON format: {str(e)}")
+                return False
+            except Exception as e:
+                unreal.log_error(f"Error parsing JSON string: {str(e)}")
+                return False
+    
+    @unreal.ufunction(static=True, params=[str], ret=bool, meta=dict(category="JSON Utilities"))
+    def read_and_log_json_file_changes(file_path: str) -> bool:
+        """
+        Log only what changed in a JSON file since the last call for that file
+        
+        The first call logs the whole document. Later calls log the new value of
+        every added or modified path (+ / ~) and the removed paths (-).
+        
+        Args:
+            file_path: Path to the JSON file (relative to project or absolute)
+            
+        Returns:
+            bool: True if successful, False if failed
+        """
+        with metrics.timed("json.read_and_log_json_file_changes"):
+            try:
+                full_path = _resolve_json_path(file_path)
+            
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return False
+            
+                changes = version_tracker.diff_file(full_path)
+            
+                sink = JsonLogSink.from_settings()
+                try:
+                    sink.write(f"=== JSON File Changes: {file_path} ===", counted=False)
+                    if changes.added == [""]:
+                        JsonReaderBFL._log_json_values(changes.new_data, "", sink)
+                    else:
+                        for line in _iter_change_log_lines(changes):
+                            if not sink.write(line):
+                                break
+                    sink.write("=== End JSON File Changes ===", counted=False)
+                finally:
+                    sink.close()
+                return True
+            
+            except json.JSONDecodeError as e:
+                unreal.log_error(f"Invalid JSON format in file {file_path}: {str(e)}")
+                return False
+            except Exception as e:
+                unreal.log_error(f"Error reading JSON file {file_path}: {str(e)}")
+                return False
+    
+    @unreal.ufunction(static=True, params=[str, bool], ret=str, meta=dict(category="JSON Utilities"))
+    def diff_json_file(file_path: str, detect_moves: bool) -> str:
+        """
+        Get the changes in a JSON file since the last call for that file
+        
+        Args:
+            file_path: Path to the JSON file (relative to project or absolute)
+            detect_moves: Report array elements that changed position as moves
+            
+        Returns:
+            str: JSON object with "added", "removed", "modified" and "moved" key paths
+                 (the first call reports "" as added), or empty string if failed
+        """
+        with metrics.timed("json.diff_json_file"):
+            try:
+                full_path = _resolve_json_path(file_path)
+            
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return ""
+            
+                changes = version_tracker.diff_file(full_path, detect_moves)
+                return json.dumps(changes.as_dict(), indent=2)
+            
+            except Exception as e:
+                unreal.log_error(f"Error diffing JSON file {file_path}: {str(e)}")
+                return ""
+    
+    @unreal.ufunction(static=True, ret=str, meta=dict(category="JSON Utilities"))
+    def get_json_cache_stats() -> str:
+        """
+        Get the shared JSON document cache counters
+        
+        Returns:
+            str: JSON object with hits, misses, evictions, entries, bytes and max_bytes
+        """
+        return json.dumps(document_cache.stats())
+    
+    @unreal.ufunction(static=True, params=[str], ret=bool, meta=dict(category="JSON Utilities"))
+    def invalidate_json_cache(file_path: str) -> bool:
+        """
+        Drop a JSON file from the shared document cache
+        
+        Args:
+            file_path: Path to the JSON file
+            
+        Returns:
+            bool: True if the file was cached
+        """
+        return document_cache.invalidate(_resolve_json_path(file_path))
+    
+    @unreal.ufunction(static=True, meta=dict(category="JSON Utilities"))
+    def clear_json_cache() -> None:
+        """Drop every document from the shared JSON cache"""
+        document_cache.clear()
+    
+    @unreal.ufunction(static=True, params=[int], meta=dict(category="JSON Utilities"))
+    def set_json_cache_max_bytes(max_bytes: int) -> None:
+        """
+        Set the byte budget of the shared JSON cache
+        
+        Args:
+            max_bytes: Maximum on-disk size of the cached documents
+        """
+        document_cache.set_max_bytes(max_bytes)
+    
+    @unreal.ufunction(static=True, params=[str], ret=bool, meta=dict(category="JSON Utilities"))
+    def build_json_index(file_path: str) -> bool:
+        """
+        Build (or refresh) the sidecar path index of a JSON file now, regardless of its size
+        
+        Args:
+            file_path: Path to the JSON file
+            
+        Returns:
+            bool: True if the index is ready
+        """
+        with metrics.timed("json.build_json_index"):
+            try:
+                full_path = _resolve_json_path(file_path)
+            
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return False
+            
+                return get_path_index(full_path, force=True) is not None
+            
+            except Exception as e:
+                unreal.log_error(f"Error building JSON index for {file_path}: {str(e)}")
+                return False
+    
+    @unreal.ufunction(static=True, params=[str], ret=bool, meta=dict(category="JSON Utilities"))
+    def build_json_columnar_cache(file_path: str) -> bool:
+        """
+        Store the arrays of same-shaped objects of a JSON file by columns regardless of its size
+        
+        Writes the <file>.cols.npz sidecar used by later editor sessions. Needs NumPy.
+        
+        Args:
+            file_path: Path to the JSON file
+            
+        Returns:
+            bool: True if the file has record arrays and the columnar form is ready
+        """
+        with metrics.timed("json.build_json_columnar_cache"):
+            try:
+                full_path = _resolve_json_path(file_path)
+            
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return False
+            
+                if _import_numpy() is None:
+                    unreal.log_error("NumPy is required for the JSON columnar cache")
+                    return False
+            
+                return get_columnar_document(full_path, force=True) is not None
+            
+            except Exception as e:
+                unreal.log_error(f"Error building JSON columnar cache for {file_path}: {str(e)}")
+                return False
+    
+    @unreal.ufunction(static=True, params=[str, str], ret=int, meta=dict(category="JSON Utilities"))
+    def load_json_directory(directory: str, pattern: str) -> int:
+        """
+        Load every JSON file of a directory in parallel into one queryable namespace
+        
+        Files are reached with get_json_directory_value / query_json_directory using their
+        relative path without extension as prefix, e.g. "levels.forest.level_01.player.name"
+        for levels/forest/level_01.json. Files that fail to parse are logged and skipped.
+        
+        Args:
+            directory: Directory to load (relative to project or absolute)
+            pattern: Glob relative to the directory, empty for "**/*.json"
+            
+        Returns:
+            int: Number of files loaded, or -1 if the directory doesn't exist
+        """
+        with metrics.timed("json.load_json_directory"):
+            try:
+                full_path = os.path.normpath(_resolve_json_path(directory))
+            
+                if not os.path.isdir(full_path):
+                    unreal.log_error(f"Directory not found: {full_path}")
+                    return -1
+            
+                result = bulk_load_json(full_path, pattern or "**/*.json")
+                for relative_path, error in sorted(result.errors.items()):
+                    unreal.log_error(f"{relative_path}: {error}")
+                summary = result.summary()
+                unreal.log(
+                    f"Loaded {result.loaded}/{result.files} JSON files from {full_path} in {result.seconds:.2f} s "
+                    f"({summary['files_per_sec']:.0f} files/s, {summary['mb_per_sec']:.1f} MB/s, "
+                    f"{result.processes} processes, {result.chunks} chunks)"
+                )
+                return result.loaded
+            
+            except Exception as e:
+                unreal.log_error(f"Error loading JSON directory {directory}: {str(e)}")
+                return -1
+    
+    @unreal.ufunction(static=True, params=[str, str], ret=str, meta=dict(category="JSON Utilities"))
+    def get_json_directory_value(directory: str, key_path: str) -> str:
+        """
+        Get a value from a directory loaded with load_json_directory
+        
+        Args:
+            directory: Directory passed to load_json_directory
+            key_path: Dot-separated path prefixed by the file's relative path (e.g. "items.sword.damage")
+            
+        Returns:
+            str: Value as string, or empty string if not found
+        """
+        with metrics.timed("json.get_json_directory_value"):
+            try:
+                result = get_json_directory(os.path.normpath(_resolve_json_path(directory)))
+                if result is None:
+                    unreal.log_error(f"JSON directory not loaded: {directory}")
+                    return ""
+            
+                value, error = compile_key_path(key_path).resolve(result.namespace)
+                if error is not None:
+                    unreal.log_error(error)
+                    return ""
+                return _format_json_value(value)
+            
+            except Exception as e:
+                unreal.log_error(f"Error getting value from JSON directory: {str(e)}")
+                return ""
+    
+    @unreal.ufunction(static=True, params=[str, str], ret=str, meta=dict(category="JSON Utilities"))
+    def query_json_directory(directory: str, query: str) -> str:
+        """
+        Run a query on a directory loaded with load_json_directory
+        
+        Example: "items.*.damage" for the damage of every file under items/
+        
+        Args:
+            directory: Directory passed to load_json_directory
+            query: Query (see CompiledQuery for the syntax)
+            
+        Returns:
+            str: JSON array of the matched values, the aggregate as a string,
+                 or empty string if failed
+        """
+        with metrics.timed("json.query_json_directory"):
+            try:
+                result = get_json_directory(os.path.normpath(_resolve_json_path(directory)))
+                if result is None:
+                    unreal.log_error(f"JSON directory not loaded: {directory}")
+                    return ""
+            
+                try:
+                    compiled = compile_query(query)
+                except JsonQueryError as e:
+                    unreal.log_error(f"Invalid query '{query}': {e}")
+                    return ""
+                value = compiled.evaluate(result.namespace)
+                if compiled.aggregate is None:
+                    return json_backend.dumps(value, indent=2)
+                return "" if value is None else str(value)
+            
+            except Exception as e:
+                unreal.log_error(f"Error querying JSON directory {directory}: {str(e)}")
+                return ""
+    
+    @unreal.ufunction(static=True, params=[str], ret=str, meta=dict(category="JSON Utilities"))
+    def get_json_directory_summary(directory: str) -> str:
+        """
+        Get the counts, errors and throughput of the last load of a directory
+        
+        Args:
+            directory: Directory passed to load_json_directory
+            
+        Returns:
+            str: JSON object with files, loaded, failed, bytes, seconds, files_per_sec,
+                 mb_per_sec, processes, chunks and errors, or empty string if not loaded
+        """
+        result = get_json_directory(os.path.normpath(_resolve_json_path(directory)))
+        if result is None:
+            return ""
+        return json.dumps(dict(result.summary(), errors=result.errors), indent=2)
+    
+    @unreal.ufunction(static=True, params=[str], ret=bool, meta=dict(category="JSON Utilities"))
+    def release_json_directory(directory: str) -> bool:
+        """
+        Drop the namespace of a loaded directory
+        
+        Args:
+            directory: Directory passed to load_json_directory
+            
+        Returns:
+            bool: True if it was loaded
+        """
+        return _json_directories.pop(os.path.normpath(_resolve_json_path(directory)), None) is not None
+    
+    @unreal.ufunction(static=True, ret=str, meta=dict(category="JSON Utilities"))
+    def get_json_log_stats() -> str:
+        """
+        Get the throughput of the last JSON log dump
+        
+        Returns:
+            str: JSON object with lines, truncated, flushes, seconds and lines_per_sec
+        """
+        return json.dumps(last_log_stats)
+    
+    @unreal.ufunction(static=True, params=[int, int, int, int, str], meta=dict(category="JSON Utilities"))
+    def configure_json_logging(flush_lines: int, flush_bytes: int, max_lines: int, max_depth: int, output_file: str) -> None:
+        """
+        Configure how JSON values are logged
+        
+        Args:
+            flush_lines: Lines buffered before each flush
+            flush_bytes: Bytes buffered before each flush
+            max_lines: Maximum lines per dump, 0 for no limit
+            max_depth: Maximum nesting depth logged, 0 for no limit
+            output_file: File to append the dump to instead of the Output Log, empty for the Output Log
+        """
+        global JSON_LOG_FLUSH_LINES, JSON_LOG_FLUSH_BYTES, JSON_LOG_MAX_LINES, JSON_LOG_MAX_DEPTH, JSON_LOG_OUTPUT_FILE
+        JSON_LOG_FLUSH_LINES = flush_lines
+        JSON_LOG_FLUSH_BYTES = flush_bytes
+        JSON_LOG_MAX_LINES = max_lines
+        JSON_LOG_MAX_DEPTH = max_depth
+        JSON_LOG_OUTPUT_FILE = output_file
+    
+    @unreal.ufunction(static=True, ret=str, meta=dict(category="JSON Utilities"))
+    def get_json_backend() -> str:
+        """
+        Get the name of the active JSON parse/serialize backend
+        
+        Returns:
+            str: "orjson", "simdjson", "ujson" or "stdlib"
+        """
+        return json_backend.backend.name
+    
+    @unreal.ufunction(static=True, params=[str], ret=bool, meta=dict(category="JSON Utilities"))
+    def set_json_backend(backend_name: str) -> bool:
+        """
+        Switch the JSON parse/serialize backend
+        
+        Args:
+            backend_name: "orjson", "simdjson", "ujson" or "stdlib"
+            
+        Returns:
+            bool: True if the backend is available and now active
+        """
+        if not json_backend.set_backend(backend_name):
+            unreal.log_error(f"JSON backend not available: {backend_name}")
             return False
+        return True
+    
+    @unreal.ufunction(static=True, params=[str], ret=str, meta=dict(category="JSON Utilities"))
+    def benchmark_json_backends(file_path: str) -> str:
+        """
+        Measure parse and dump throughput of every available backend on a file
+        
+        Args:
+            file_path: Path to the JSON file to benchmark with
+            
+        Returns:
+            str: JSON object with parse_mb_s, dump_mb_s and identical per backend, or empty string if failed
+        """
+        with metrics.timed("json.benchmark_json_backends"):
+            try:
+                full_path = _resolve_json_path(file_path)
+            
+                if not os.path.exists(full_path):
+                    unreal.log_error(f"JSON file not found: {full_path}")
+                    return ""
+            
+                results = json_backend.benchmark(full_path)
+                for name, result in results.items():
+                    unreal.log(f"{name}: parse {result['parse_mb_s']:.1f} MB/s, dump {result['dump_mb_s']:.1f} MB/s, identical={result['identical']}")
+                return json.dumps(results, indent=2)
+            
+            except Exception as e:
+                unreal.log_error(f"Error benchmarking JSON backends: {str(e)}")
+                return ""
     
     @staticmethod
-    def _log_json_values(data, prefix):
+    def _log_json_values(data, prefix, sink=None):
         """
-        Recursively log JSON values with proper indentation
+        Log JSON values iteratively through a buffered sink
         
         Args:
             data: JSON data to log (dict, list, or primitive)
             prefix: Current key path prefix for nested objects
+            sink: JsonLogSink to write to; a temporary one from the module settings if None
         """
-        if isinstance(data, dict):
-            for key, value in data.items():
-                current_path = f"{prefix}.{key}" if prefix else key
-                
-                if isinstance(value, (dict, list)):
-                    unreal.log(f"{current_path}:")
-                    JsonReaderBFL._log_json_values(value, current_path)
-                else:
-                    unreal.log(f"{current_path}: {value} ({type(value).__name__})")
-                    
-        elif isinstance(data, list):
-            for i, item in enumerate(data):
-                current_path = f"{prefix}[{i}]" if prefix else f"[{i}]"
-                
-                if isinstance(item, (dict, list)):
-                    unreal.log(f"{current_path}:")
-                    JsonReaderBFL._log_json_values(item, current_path)
-                else:
-                    unreal.log(f"{current_path}: {item} ({type(item).__name__})")
-        else:
-            # For primitive values at root level
-            unreal.log(f"{prefix}: {data} ({type(data).__name__})")
+        own_sink = sink is None
+        if own_sink:
+            sink = JsonLogSink.from_settings()
+        try:
+            for line in _iter_log_lines(data, prefix, JSON_LOG_MAX_DEPTH):
+                if not sink.write(line):
+                    break
+        finally:
+            if own_sink:
+                sink.close()
 
 
 # Standalone utility functions that can be called directly from Python console
@@ -321,6 +2524,56 @@ def test_json_functions(file_name: str = "sample_data.json") -> None:
     else:
         unreal.log_error("✗ Failed to read file as string")
     
+    # Test 5: Get many values in one call
+    unreal.log("\nTest 5: Getting several values in one batch...")
+    values = JsonReaderBFL.get_json_values_by_paths(file_name, test_paths)
+    if len(values) == len(test_paths) and all(values):
+        unreal.log(f"✓ Batch returned {len(values)} values")
+    else:
+        unreal.log_error("✗ Batch lookup failed for some paths")
+    
+    # Test 6: Queries with wildcards, filters and aggregates
+    unreal.log("\nTest 6: Running queries...")
+    test_queries = [
+        "player_data.inventory.*.item",
+        "player_data.inventory[?durability<90].item",
+        "sum(player_data.inventory.*.quantity)",
+        "count(achievements.*)"
+    ]
+    
+    for query in test_queries:
+        result = JsonReaderBFL.query_json(file_name, query)
+        if result:
+            unreal.log(f"✓ {query}: {result}")
+        else:
+            unreal.log_error(f"✗ Query failed: {query}")
+
+    # Test 7: Columnar cache returns the same values
+    unreal.log("\nTest 7: Building the columnar cache...")
+    if _import_numpy() is None:
+        unreal.log("- NumPy not available, skipped")
+    elif JsonReaderBFL.build_json_columnar_cache(file_name):
+        columnar_values = JsonReaderBFL.get_json_values_by_paths(file_name, test_paths)
+        if columnar_values == values:
+            unreal.log("✓ Columnar lookups match the parsed document")
+        else:
+            unreal.log_error("✗ Columnar lookups differ from the parsed document")
+    else:
+        unreal.log_error("✗ Failed to build the columnar cache")
+
+    # Test 8: Directory load into one namespace
+    unreal.log("\nTest 8: Loading the project directory...")
+    if JsonReaderBFL.load_json_directory("", file_name) == 1:
+        name_path = os.path.splitext(file_name)[0] + ".player_data.name"
+        value = JsonReaderBFL.get_json_directory_value("", name_path)
+        if value:
+            unreal.log(f"✓ {name_path}: {value}")
+        else:
+            unreal.log_error(f"✗ Failed to get {name_path}")
+        JsonReaderBFL.release_json_directory("")
+    else:
+        unreal.log_error("✗ Failed to load the project directory")
+
     unreal.log("\n=== JSON Function Tests Completed ===")
 
 # Quick test function
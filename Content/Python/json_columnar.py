@@ -0,0 +1,488 @@
+"""
+
+    Columnar storage for arrays of same-shaped JSON objects
+
+    Arrays like [{"item": "Sword", "quantity": 1}, ...] are detected in a
+    parsed document and replaced by a ColumnarArray: one NumPy array per
+    field (int64, float64 or bool), dictionary-encoded strings (int32 codes
+    into a list of distinct values) and a null bitmap. Fields whose values
+    don't share one scalar type are dictionary-encoded as JSON text, so every
+    record can be rebuilt exactly as it was parsed.
+
+    The containers leading to columnar arrays are SkeletonDict/SkeletonList so
+    callers can tell a document that must be materialized before dumping it.
+    Documents are saved to an uncompressed .npz sidecar that is loaded back
+    without parsing the source file.
+
+    Does not import unreal, so it can be used from worker threads/processes.
+    Needs NumPy (optional): without it is_available() is False.
+
+"""
+
+import json
+import os
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Minimo de registros para guardar un array por columnas
+COLUMNAR_MIN_RECORDS = 256
+COLUMNAR_SUFFIX = ".cols.npz"
+COLUMNAR_VERSION = 1
+
+# Tipos de columna
+KIND_NULL = "null"
+KIND_BOOL = "bool"
+KIND_INT = "int"
+KIND_FLOAT = "float"
+KIND_STR = "str"
+KIND_JSON = "json"
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+# Enteros que se convierten a float64 sin perder precision
+_FLOAT_EXACT_INT = 2 ** 53
+
+
+def is_available() -> bool:
+    return numpy is not None
+
+
+class SkeletonDict(dict):
+    """Object of a columnar document that contains ColumnarArrays somewhere below"""
+
+
+class SkeletonList(list):
+    """Array of a columnar document that contains ColumnarArrays somewhere below"""
+
+
+class Column:
+    """
+    Values of one field for every record of a ColumnarArray
+
+    values holds int64/float64/bool values, or int32 codes into dictionary
+    for "str" and "json" columns. nulls is a bool array (None if the column
+    has no nulls).
+    """
+    __slots__ = ("kind", "values", "nulls", "dictionary", "_decoded")
+
+    def __init__(self, kind: str, values=None, nulls=None, dictionary=None):
+        self.kind = kind
+        self.values = values
+        self.nulls = nulls
+        self.dictionary = dictionary
+        self._decoded = None
+
+    @classmethod
+    def build(cls, values: list):
+        """Pick the narrowest kind that keeps every value exact"""
+        classes = {value.__class__ for value in values}
+        nulls = None
+        if type(None) in classes:
+            classes.discard(type(None))
+            nulls = numpy.fromiter((value is None for value in values), dtype=bool, count=len(values))
+
+        if not classes:
+            return cls(KIND_NULL, nulls=numpy.ones(len(values), dtype=bool))
+        kind = KIND_JSON
+        if len(classes) == 1:
+            kind = {bool: KIND_BOOL, int: KIND_INT, float: KIND_FLOAT, str: KIND_STR}.get(classes.pop(), KIND_JSON)
+        if kind == KIND_INT:
+            present = values if nulls is None else [value for value in values if value is not None]
+            if min(present) < _INT64_MIN or max(present) > _INT64_MAX:
+                kind = KIND_JSON
+
+        if kind in (KIND_BOOL, KIND_INT, KIND_FLOAT):
+            dtype = {KIND_BOOL: bool, KIND_INT: numpy.int64, KIND_FLOAT: numpy.float64}[kind]
+            if nulls is not None:
+                values = [0 if value is None else value for value in values]
+            return cls(kind, numpy.array(values, dtype=dtype), nulls)
+
+        # Cadenas (o JSON) codificadas por diccionario: cada valor distinto se guarda una vez
+        codes = {}
+        if kind == KIND_JSON:
+            values = [None if value is None else json.dumps(value, ensure_ascii=False) for value in values]
+        encoded = numpy.fromiter(
+            (0 if value is None else codes.setdefault(value, len(codes)) for value in values),
+            dtype=numpy.int32, count=len(values)
+        )
+        return cls(kind, encoded, nulls, list(codes))
+
+    def _lookup_table(self) -> list:
+        """Distinct values in code order (JSON columns decoded once)"""
+        if self.kind == KIND_STR:
+            return self.dictionary
+        if self._decoded is None:
+            self._decoded = [json.loads(text) for text in self.dictionary]
+        return self._decoded
+
+    def get(self, row: int):
+        """Value of one physical row as the JSON parser returned it"""
+        if self.kind == KIND_NULL or (self.nulls is not None and self.nulls[row]):
+            return None
+        if self.kind in (KIND_STR, KIND_JSON):
+            return self._lookup_table()[self.values[row]]
+        return self.values[row].item()
+
+    def to_list(self, rows=None) -> list:
+        """Values of the given physical rows (every row if None)"""
+        length = len(self.nulls if self.values is None else self.values) if rows is None else len(rows)
+        if self.kind == KIND_NULL:
+            return [None] * length
+        values = self.values if rows is None else self.values[rows]
+        if self.kind in (KIND_STR, KIND_JSON):
+            table = self._lookup_table()
+            result = [table[code] for code in values.tolist()]
+        else:
+            result = values.tolist()
+        if self.nulls is not None:
+            nulls = self.nulls if rows is None else self.nulls[rows]
+            for position in numpy.flatnonzero(nulls).tolist():
+                result[position] = None
+        return result
+
+    def numbers(self, rows=None):
+        """Non-null int64/float64 values of the given rows, None for other kinds"""
+        if self.kind not in (KIND_INT, KIND_FLOAT):
+            return None
+        values = self.values if rows is None else self.values[rows]
+        if self.nulls is not None:
+            values = values[~(self.nulls if rows is None else self.nulls[rows])]
+        return values
+
+    def match(self, rows, operator, literal):
+        """
+        Evaluate operator(value, literal) for the given rows with Python semantics
+
+        Returns:
+            bool array, or None if it can't be vectorized exactly
+        """
+        length = len(rows) if rows is not None else len(self.nulls if self.values is None else self.values)
+        nulls = None if self.nulls is None else (self.nulls if rows is None else self.nulls[rows])
+
+        if self.kind == KIND_NULL:
+            mask = numpy.empty(length, dtype=bool)
+        elif self.kind in (KIND_INT, KIND_FLOAT):
+            if literal.__class__ not in (int, float):
+                return None
+            values = self.values if rows is None else self.values[rows]
+            if literal.__class__ is int and not -_FLOAT_EXACT_INT < literal < _FLOAT_EXACT_INT:
+                return None
+            if self.kind == KIND_INT and literal.__class__ is float and len(values) and (
+                    values.min() <= -_FLOAT_EXACT_INT or values.max() >= _FLOAT_EXACT_INT):
+                return None
+            mask = operator(values, literal)
+        else:
+            # Se evalua cada valor distinto una sola vez y se marcan los codigos que cumplen
+            table = [False, True] if self.kind == KIND_BOOL else self._lookup_table()
+            selected = numpy.fromiter(
+                (_python_match(operator, value, literal) for value in table), dtype=bool, count=len(table)
+            )
+            values = self.values if rows is None else self.values[rows]
+            mask = selected[values.astype(numpy.intp)] if len(table) else numpy.zeros(length, dtype=bool)
+
+        if nulls is not None or self.kind == KIND_NULL:
+            mask = numpy.array(mask, dtype=bool)
+            mask[nulls if nulls is not None else slice(None)] = _python_match(operator, None, literal)
+        return mask
+
+    @property
+    def nbytes(self) -> int:
+        total = 0 if self.values is None else self.values.nbytes
+        if self.nulls is not None:
+            total += self.nulls.nbytes
+        if self.dictionary:
+            total += sum(len(text) for text in self.dictionary)
+        return total
+
+
+def _python_match(operator, value, literal) -> bool:
+    try:
+        return bool(operator(value, literal))
+    except TypeError:
+        return False
+
+
+class ColumnarArray:
+    """
+    Array of objects that share the same keys in the same order, stored by columns
+
+    rows is None for the whole array or an int array of physical rows for
+    a view (take()). Records are rebuilt on access with the original key
+    order and value types.
+    """
+    __slots__ = ("fields", "columns", "length", "rows")
+
+    def __init__(self, fields: tuple, columns: tuple, length: int, rows=None):
+        self.fields = fields
+        self.columns = columns
+        self.length = length
+        self.rows = rows
+
+    @classmethod
+    def build(cls, records: list):
+        fields = tuple(records[0])
+        columns = tuple(Column.build([record[field] for record in records]) for field in fields)
+        return cls(fields, columns, len(records))
+
+    def __len__(self) -> int:
+        return self.length if self.rows is None else len(self.rows)
+
+    def _physical(self, index: int) -> int:
+        return index if self.rows is None else int(self.rows[index])
+
+    def record(self, index: int) -> dict:
+        """Rebuild the record at index (0 <= index < len)"""
+        row = self._physical(index)
+        return {field: column.get(row) for field, column in zip(self.fields, self.columns)}
+
+    def column(self, field: str):
+        """Column of field, or None"""
+        try:
+            return self.columns[self.fields.index(field)]
+        except ValueError:
+            return None
+
+    def column_values(self, field: str) -> list:
+        return self.column(field).to_list(self.rows)
+
+    def to_list(self) -> list:
+        """Every record as a list of dicts"""
+        lists = [column.to_list(self.rows) for column in self.columns]
+        fields = self.fields
+        return [dict(zip(fields, values)) for values in zip(*lists)]
+
+    def take(self, positions):
+        """View with the records at the given positions (int array or slice)"""
+        if isinstance(positions, slice):
+            positions = numpy.arange(len(self))[positions]
+        rows = positions if self.rows is None else self.rows[positions]
+        return ColumnarArray(self.fields, self.columns, self.length, numpy.asarray(rows, dtype=numpy.intp))
+
+    def filter(self, field: str, operator, literal):
+        """
+        View with the records whose field satisfies operator(value, literal)
+
+        Returns:
+            ColumnarArray, or None if the comparison can't be vectorized exactly
+        """
+        column = self.column(field)
+        if column is None:
+            return self.take(numpy.zeros(0, dtype=numpy.intp))
+        if operator is None:
+            # [?campo]: el campo existe y no es null
+            if column.kind == KIND_NULL:
+                return self.take(numpy.zeros(0, dtype=numpy.intp))
+            if column.nulls is None:
+                return self
+            mask = ~(column.nulls if self.rows is None else column.nulls[self.rows])
+        else:
+            mask = column.match(self.rows, operator, literal)
+            if mask is None:
+                return None
+        return self.take(numpy.flatnonzero(mask))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns)
+
+
+class ColumnarRecords:
+    """Every record of a ColumnarArray, selected by a query but not rebuilt yet"""
+    __slots__ = ("array",)
+
+    def __init__(self, array: ColumnarArray):
+        self.array = array
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def to_list(self) -> list:
+        return self.array.to_list()
+
+
+class ColumnValues:
+    """One field of every record of a ColumnarArray, selected by a query"""
+    __slots__ = ("array", "field")
+
+    def __init__(self, array: ColumnarArray, field: str):
+        self.array = array
+        self.field = field
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def numbers(self):
+        return self.array.column(self.field).numbers(self.array.rows)
+
+    def to_list(self) -> list:
+        return self.array.column_values(self.field)
+
+
+_COLUMNAR_TYPES = (SkeletonDict, SkeletonList, ColumnarArray)
+
+
+def is_columnar(value) -> bool:
+    """True if value is (or contains) columnar data and must be materialized"""
+    return value.__class__ in _COLUMNAR_TYPES
+
+
+def materialize(value):
+    """Return value with every columnar part rebuilt as plain dicts and lists"""
+    if value.__class__ is ColumnarArray:
+        return value.to_list()
+    if value.__class__ is SkeletonDict:
+        return {key: materialize(child) for key, child in value.items()}
+    if value.__class__ is SkeletonList:
+        return [materialize(child) for child in value]
+    return value
+
+
+def _is_record_array(node, min_records: int) -> bool:
+    if len(node) < min_records or node[0].__class__ is not dict or not node[0]:
+        return False
+    keys = list(node[0])
+    return all(item.__class__ is dict and list(item) == keys for item in node)
+
+
+def _columnarize(node, path: list, arrays: list, min_records: int):
+    if node.__class__ is list:
+        if _is_record_array(node, min_records):
+            array = ColumnarArray.build(node)
+            arrays.append((tuple(path), array))
+            return array
+        items = enumerate(node)
+    elif node.__class__ is dict:
+        items = node.items()
+    else:
+        return node
+
+    replaced = {}
+    for key, child in items:
+        if child.__class__ is dict or child.__class__ is list:
+            path.append(key)
+            new_child = _columnarize(child, path, arrays, min_records)
+            path.pop()
+            if new_child is not child:
+                replaced[key] = new_child
+    if not replaced:
+        return node
+    # Solo se copian los contenedores que llevan a un array por columnas; el resto se comparte
+    if node.__class__ is list:
+        skeleton = SkeletonList(node)
+    else:
+        skeleton = SkeletonDict(node)
+    for key, new_child in replaced.items():
+        skeleton[key] = new_child
+    return skeleton
+
+
+def columnarize(json_data, min_records: int = COLUMNAR_MIN_RECORDS):
+    """
+    Replace every large array of same-shaped objects with a ColumnarArray
+
+    The input is not modified; subtrees without record arrays are shared.
+
+    Args:
+        json_data: Parsed JSON document
+        min_records: Smallest array converted
+
+    Returns:
+        tuple: (document, list of (path tuple, ColumnarArray))
+    """
+    arrays = []
+    return _columnarize(json_data, [], arrays, min_records), arrays
+
+
+def save_sidecar(sidecar_path: str, signature: tuple, document, arrays: list) -> None:
+    """
+    Write a columnar document to an uncompressed .npz file
+
+    The skeleton and column descriptions go in a JSON "meta" entry; every
+    column is one array entry, with the null bitmap packed to bits.
+    """
+    entries = {}
+    descriptions = []
+    for array_number, (path, array) in enumerate(arrays):
+        columns = []
+        for column_number, column in enumerate(array.columns):
+            prefix = f"{array_number}.{column_number}"
+            if column.values is not None:
+                entries[f"{prefix}.values"] = column.values
+            if column.nulls is not None:
+                entries[f"{prefix}.nulls"] = numpy.packbits(column.nulls)
+            columns.append({"kind": column.kind, "nulls": column.nulls is not None, "dictionary": column.dictionary})
+        descriptions.append({"path": list(path), "length": array.length, "fields": list(array.fields), "columns": columns})
+
+    # En el esqueleto los arrays por columnas quedan como null y se colocan al cargar
+    meta = {
+        "version": COLUMNAR_VERSION,
+        "signature": list(signature),
+        "document": json.dumps(document, ensure_ascii=False, default=lambda value: None),
+        "arrays": descriptions,
+    }
+    entries["meta"] = numpy.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=numpy.uint8)
+
+    temp_path = sidecar_path + ".tmp"
+    with open(temp_path, "wb") as file:
+        numpy.savez(file, **entries)
+    os.replace(temp_path, sidecar_path)
+
+
+def load_sidecar(sidecar_path: str, signature: tuple):
+    """
+    Load a columnar document saved by save_sidecar
+
+    Returns:
+        The document, or None if the sidecar is missing, stale or unreadable
+    """
+    if not os.path.exists(sidecar_path):
+        return None
+    try:
+        with numpy.load(sidecar_path, allow_pickle=False) as entries:
+            meta = json.loads(entries["meta"].tobytes().decode("utf-8"))
+            if meta.get("version") != COLUMNAR_VERSION or tuple(meta.get("signature", ())) != tuple(signature):
+                return None
+            arrays = []
+            for array_number, description in enumerate(meta["arrays"]):
+                length = description["length"]
+                columns = []
+                for column_number, column in enumerate(description["columns"]):
+                    prefix = f"{array_number}.{column_number}"
+                    values = entries[f"{prefix}.values"] if f"{prefix}.values" in entries.files else None
+                    nulls = None
+                    if column["nulls"]:
+                        nulls = numpy.unpackbits(entries[f"{prefix}.nulls"], count=length).astype(bool)
+                    columns.append(Column(column["kind"], values, nulls, column["dictionary"]))
+                arrays.append((description["path"], ColumnarArray(tuple(description["fields"]), tuple(columns), length)))
+    except (OSError, ValueError, KeyError):
+        return None
+
+    document = json.loads(meta["document"])
+    return _place_arrays(document, arrays)
+
+
+def _place_arrays(document, arrays: list):
+    """Put the loaded arrays back in the skeleton, restoring the Skeleton container types"""
+    if len(arrays) == 1 and not arrays[0][0]:
+        return arrays[0][1]
+
+    def convert(node, depth_paths):
+        # depth_paths: rutas restantes que pasan por este nodo
+        children = {}
+        for path, array in depth_paths:
+            children.setdefault(path[0], []).append((path[1:], array))
+        if node.__class__ is list:
+            skeleton = SkeletonList(node)
+        else:
+            skeleton = SkeletonDict(node)
+        for key, paths in children.items():
+            if not paths[0][0]:
+                skeleton[key] = paths[0][1]
+            else:
+                skeleton[key] = convert(node[key], paths)
+        return skeleton
+
+    return convert(document, arrays)
@@ -0,0 +1,502 @@
+"""
+
+    Byte-level JSON scanner that reports the offsets of every value
+
+    Works on bytes, bytearray or mmap objects without building the object
+    graph, so large files can be indexed, searched or streamed value by value.
+    Does not import unreal, so it can be used from worker threads/processes.
+
+"""
+
+import json
+import mmap
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import json_backend
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_NUMBER = re.compile(rb'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?')
+# Cadenas completas o corchetes: lo unico que importa para saltar un subarbol
+_STRUCTURE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.DOTALL)
+
+# Mismos literales que acepta json.load (incluye NaN/Infinity)
+_LITERALS = (
+    (b'true', True),
+    (b'false', False),
+    (b'null', None),
+    (b'NaN', float('nan')),
+    (b'Infinity', float('inf')),
+    (b'-Infinity', float('-inf')),
+)
+
+# Tipos de evento devueltos por iter_events
+SCALAR = "scalar"
+START = "start"
+END = "end"
+
+# Indice de rutas (<archivo>.idx): tipos de nodo y version del formato
+INDEX_SCALAR = 0
+INDEX_OBJECT = 1
+INDEX_ARRAY = 2
+INDEX_VERSION = 4
+
+
+class JsonScanError(ValueError):
+    """Raised when the buffer is not valid JSON"""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at byte {position}")
+        self.position = position
+
+
+def _skip_whitespace(buffer, pos: int) -> int:
+    return _WHITESPACE.match(buffer, pos).end()
+
+
+def _scan_string(buffer, pos: int):
+    """Decode the string starting at pos. Returns (value, end)"""
+    match = _STRING.match(buffer, pos)
+    if match is None:
+        raise JsonScanError("Unterminated string", pos)
+    end = match.end()
+    raw = buffer[pos + 1:end - 1]
+    if b'\\' not in raw:
+        return raw.decode('utf-8'), end
+    return json.loads(buffer[pos:end]), end
+
+
+def _scan_scalar(buffer, pos: int):
+    """Decode the string, number or literal starting at pos. Returns (value, end)"""
+    char = buffer[pos:pos + 1]
+    if char == b'"':
+        return _scan_string(buffer, pos)
+
+    match = _NUMBER.match(buffer, pos)
+    if match is not None:
+        text = match.group()
+        if match.group(1) or match.group(2):
+            return float(text), match.end()
+        return int(text), match.end()
+
+    for literal, value in _LITERALS:
+        if buffer[pos:pos + len(literal)] == literal:
+            return value, pos + len(literal)
+
+    if not char:
+        raise JsonScanError("Expecting value, got end of data", pos)
+    raise JsonScanError("Expecting value", pos)
+
+
+def iter_events(buffer, pos: int = 0):
+    """
+    Walk a JSON document and yield one event per value
+
+    Events are (kind, path, start, end, value) tuples where path is a tuple of
+    object keys (str) and array indices (int):
+      - SCALAR: a string/number/literal, value is the decoded Python value
+      - START: an object or array begins, end is None, value is dict or list
+      - END: an object or array ends, end is the offset after the closing bracket
+
+    Args:
+        buffer: bytes, bytearray or mmap with UTF-8 JSON
+        pos: Offset where the document starts
+
+    Yields:
+        tuple: (kind, path, start, end, value)
+    """
+    # frame: [es_objeto, ruta, inicio, indice del hijo actual (-1 si vacio)]
+    stack = []
+    path = ()
+    pos = _skip_whitespace(buffer, pos)
+
+    while True:
+        # --- Valor en pos para la ruta actual ---
+        char = buffer[pos:pos + 1]
+        if char == b'{' or char == b'[':
+            is_object = char == b'{'
+            yield START, path, pos, None, dict if is_object else list
+            frame = [is_object, path, pos, -1]
+            stack.append(frame)
+            pos = _skip_whitespace(buffer, pos + 1)
+            if buffer[pos:pos + 1] != (b'}' if is_object else b']'):
+                frame[3] = 0
+                path, pos = _child_path(buffer, frame, pos)
+                continue
+        else:
+            value, end = _scan_scalar(buffer, pos)
+            yield SCALAR, path, pos, end, value
+            pos = _skip_whitespace(buffer, end)
+
+        # --- Cerrar contenedores o pasar al siguiente hermano ---
+        while True:
+            if not stack:
+                if pos < len(buffer):
+                    raise JsonScanError("Extra data", pos)
+                return
+            frame = stack[-1]
+            char = buffer[pos:pos + 1]
+            if char == (b'}' if frame[0] else b']'):
+                stack.pop()
+                yield END, frame[1], frame[2], pos + 1, dict if frame[0] else list
+                pos = _skip_whitespace(buffer, pos + 1)
+                continue
+            if char == b',' and frame[3] >= 0:
+                frame[3] += 1
+                path, pos = _child_path(buffer, frame, _skip_whitespace(buffer, pos + 1))
+                break
+            raise JsonScanError("Expecting ',' delimiter or closing bracket", pos)
+
+
+def _child_path(buffer, frame, pos: int):
+    """Build the path of the next child of frame. Returns (path, value_start)"""
+    if not frame[0]:
+        return frame[1] + (frame[3],), pos
+    if buffer[pos:pos + 1] != b'"':
+        raise JsonScanError("Expecting property name enclosed in double quotes", pos)
+    key, pos = _scan_string(buffer, pos)
+    pos = _skip_whitespace(buffer, pos)
+    if buffer[pos:pos + 1] != b':':
+        raise JsonScanError("Expecting ':' delimiter", pos)
+    return frame[1] + (key,), _skip_whitespace(buffer, pos + 1)
+
+
+@contextmanager
+def open_buffer(file_path: str):
+    """
+    Memory-map a file read-only for scanning
+
+    Args:
+        file_path: Path to a non-empty file
+
+    Yields:
+        mmap: Read-only buffer over the whole file
+    """
+    with open(file_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def iter_values(buffer):
+    """
+    Yield (path, value) lazily for every scalar and empty container
+
+    Args:
+        buffer: bytes, bytearray or mmap with UTF-8 JSON
+
+    Yields:
+        tuple: (path tuple, value)
+    """
+    pending = None
+    for kind, path, start, end, value in iter_events(buffer):
+        if kind == START:
+            pending = path
+            continue
+        if kind == END:
+            if pending == path:
+                yield path, value()
+            pending = None
+            continue
+        pending = None
+        yield path, value
+
+
+def skip_value(buffer, pos: int) -> int:
+    """
+    Return the offset just after the value starting at pos without decoding it
+
+    Args:
+        buffer: bytes, bytearray or mmap with UTF-8 JSON
+        pos: Offset of the first byte of the value
+
+    Returns:
+        int: Offset after the value
+    """
+    char = buffer[pos:pos + 1]
+    if char == b'"':
+        match = _STRING.match(buffer, pos)
+        if match is None:
+            raise JsonScanError("Unterminated string", pos)
+        return match.end()
+    if char != b'{' and char != b'[':
+        return _scan_scalar(buffer, pos)[1]
+
+    depth = 0
+    while True:
+        match = _STRUCTURE.search(buffer, pos)
+        if match is None:
+            raise JsonScanError("Unterminated object or array", pos)
+        token = match.group()
+        pos = match.end()
+        if token == b'{' or token == b'[':
+            depth += 1
+        elif token == b'}' or token == b']':
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def find_path(buffer, segments, pos: int = 0):
+    """
+    Locate a value by (key, index) segments, stopping as soon as it is found
+
+    Siblings are skipped without being decoded and nothing after the target's
+    object is read. With duplicate keys the last occurrence wins, as in json.load.
+
+    Args:
+        buffer: bytes, bytearray or mmap with UTF-8 JSON
+        segments: (key, index) pairs as built by CompiledKeyPath
+        pos: Offset where the document starts
+
+    Returns:
+        tuple: (start, end, error) where error is None on success
+    """
+    pos = _skip_whitespace(buffer, pos)
+    for key, index in segments:
+        char = buffer[pos:pos + 1]
+        if char == b'{':
+            pos = _find_key(buffer, pos, key)
+            if pos < 0:
+                return None, None, f"Key '{key}' not found in JSON data"
+        elif char == b'[' and index is not None:
+            pos = _find_index(buffer, pos, index)
+            if pos < 0:
+                return None, None, f"Index {index} out of range for array"
+        else:
+            return None, None, f"Key '{key}' not found in JSON data"
+    return pos, skip_value(buffer, pos), None
+
+
+def _find_key(buffer, pos: int, key: str) -> int:
+    """Return the value offset of the last occurrence of key in the object at pos, or -1"""
+    found = -1
+    pos = _skip_whitespace(buffer, pos + 1)
+    if buffer[pos:pos + 1] == b'}':
+        return found
+    while True:
+        if buffer[pos:pos + 1] != b'"':
+            raise JsonScanError("Expecting property name enclosed in double quotes", pos)
+        name, pos = _scan_string(buffer, pos)
+        pos = _skip_whitespace(buffer, pos)
+        if buffer[pos:pos + 1] != b':':
+            raise JsonScanError("Expecting ':' delimiter", pos)
+        pos = _skip_whitespace(buffer, pos + 1)
+        # Se sigue hasta el final del objeto: una clave repetida mas adelante sustituye a esta
+        if name == key:
+            found = pos
+        pos = _skip_whitespace(buffer, skip_value(buffer, pos))
+        char = buffer[pos:pos + 1]
+        if char == b'}':
+            return found
+        if char != b',':
+            raise JsonScanError("Expecting ',' delimiter", pos)
+        pos = _skip_whitespace(buffer, pos + 1)
+
+
+def _find_index(buffer, pos: int, index: int) -> int:
+    """Return the offset of element index in the array at pos, or -1"""
+    pos = _skip_whitespace(buffer, pos + 1)
+    if buffer[pos:pos + 1] == b']':
+        return -1
+    current = 0
+    while True:
+        if current == index:
+            return pos
+        pos = _skip_whitespace(buffer, skip_value(buffer, pos))
+        char = buffer[pos:pos + 1]
+        if char == b']':
+            return -1
+        if char != b',':
+            raise JsonScanError("Expecting ',' delimiter", pos)
+        pos = _skip_whitespace(buffer, pos + 1)
+        current += 1
+
+
+def iter_dump_chunks(buffer, indent: int = 2):
+    """
+    Re-serialize a document like json.dumps(indent=indent, ensure_ascii=False)
+
+    Output is produced chunk by chunk from the scanner events, so the
+    document is never held as Python objects.
+
+    Args:
+        buffer: bytes, bytearray or mmap with UTF-8 JSON
+        indent: Spaces per nesting level
+
+    Yields:
+        str: Consecutive pieces of the formatted document
+    """
+    depth = 0
+    first_child = []  # por nivel: True hasta escribir el primer hijo
+    pending = None    # apertura de contenedor aun no escrita
+
+    for kind, path, start, end, value in iter_events(buffer):
+        if kind == END:
+            depth -= 1
+            first_child.pop()
+            if pending is not None:
+                # Contenedor vacio
+                yield pending[0] + ("{}" if value is dict else "[]")
+                pending = None
+            else:
+                yield "\n" + " " * (indent * depth) + ("}" if value is dict else "]")
+            continue
+
+        if pending is not None:
+            yield pending[0] + pending[1]
+            pending = None
+
+        prefix = ""
+        if first_child:
+            prefix = ("\n" if first_child[-1] else ",\n") + " " * (indent * depth)
+            first_child[-1] = False
+            if isinstance(path[-1], str):
+                prefix += json.dumps(path[-1], ensure_ascii=False) + ": "
+
+        if kind == START:
+            pending = (prefix, "{" if value is dict else "[")
+            depth += 1
+            first_child.append(True)
+        else:
+            yield prefix + json.dumps(value, ensure_ascii=False)
+
+
+def load_and_dump(file_path: str, indent: int = 2) -> str:
+    """
+    Parse a JSON file and return it formatted like read_json_file_as_string
+
+    Top-level and unreal-free so it can run in a worker process.
+
+    Args:
+        file_path: Absolute path to the JSON file
+        indent: Spaces per nesting level
+
+    Returns:
+        str: The formatted document
+    """
+    return json_backend.dumps(json_backend.load_file(file_path), indent)
+
+
+def iter_index_rows(buffer, span_bytes: int):
+    """
+    Yield the root kind first, then one (path, kind, start, end) row per indexed value
+
+    Only the children of the root and of containers spanning at least
+    span_bytes are indexed, so every lookup reads at most a small subtree.
+    Smaller subtrees are skipped without being decoded. With duplicate keys
+    only the last occurrence is indexed, as in json.load.
+
+    Args:
+        buffer: bytes, bytearray or mmap with UTF-8 JSON
+        span_bytes: Containers at least this big get their children indexed
+    """
+    pos = _skip_whitespace(buffer, 0)
+    char = buffer[pos:pos + 1]
+    if char != b'{' and char != b'[':
+        yield INDEX_SCALAR
+        return
+    yield INDEX_OBJECT if char == b'{' else INDEX_ARRAY
+
+    stack = [((), pos)]
+    while stack:
+        path, pos = stack.pop()
+        is_object = buffer[pos:pos + 1] == b'{'
+        closing = b'}' if is_object else b']'
+        pos = _skip_whitespace(buffer, pos + 1)
+        if buffer[pos:pos + 1] == closing:
+            continue
+        current = 0
+        # Hijos de un objeto: se emiten al cerrarlo para que una clave repetida sustituya a la anterior
+        children = {} if is_object else None
+        while True:
+            if is_object:
+                if buffer[pos:pos + 1] != b'"':
+                    raise JsonScanError("Expecting property name enclosed in double quotes", pos)
+                key, pos = _scan_string(buffer, pos)
+                pos = _skip_whitespace(buffer, pos)
+                if buffer[pos:pos + 1] != b':':
+                    raise JsonScanError("Expecting ':' delimiter", pos)
+                pos = _skip_whitespace(buffer, pos + 1)
+            else:
+                key = current
+                current += 1
+
+            end = skip_value(buffer, pos)
+            if children is not None:
+                children[key] = (pos, end)
+            else:
+                yield from _index_child(buffer, stack, path + (key,), pos, end, span_bytes)
+
+            pos = _skip_whitespace(buffer, end)
+            char = buffer[pos:pos + 1]
+            if char == closing:
+                break
+            if char != b',':
+                raise JsonScanError("Expecting ',' delimiter", pos)
+            pos = _skip_whitespace(buffer, pos + 1)
+
+        if children is not None:
+            for key, (start, end) in children.items():
+                # Claves con '.' no se pueden alcanzar con una ruta separada por puntos
+                if '.' not in key:
+                    yield from _index_child(buffer, stack, path + (key,), start, end, span_bytes)
+
+
+def _index_child(buffer, stack, child_path, start: int, end: int, span_bytes: int):
+    """Yield the row of one child and queue its own children if it is big enough"""
+    char = buffer[start:start + 1]
+    kind = INDEX_OBJECT if char == b'{' else INDEX_ARRAY if char == b'[' else INDEX_SCALAR
+    yield '.'.join(map(str, child_path)), kind, start, end
+    if kind != INDEX_SCALAR and end - start >= span_bytes:
+        stack.append((child_path, start))
+
+
+def build_path_index(file_path: str, index_path: str, span_bytes: int) -> str:
+    """
+    Write the SQLite path index of a JSON file
+
+    Top-level and unreal-free so it can run in a worker process. The index
+    is written to a temporary file and moved over index_path when complete.
+
+    Args:
+        file_path: Absolute path to the JSON file
+        index_path: Where to write the index
+        span_bytes: See iter_index_rows
+
+    Returns:
+        str: index_path
+    """
+    # Importado aqui: solo hace falta para construir indices, no al arrancar el editor
+    import sqlite3
+
+    stat_result = os.stat(file_path)
+    temp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value)")
+        connection.execute(
+            "CREATE TABLE paths (path TEXT PRIMARY KEY, kind INTEGER, "
+            "start INTEGER, end INTEGER) WITHOUT ROWID"
+        )
+        with open_buffer(file_path) as buffer:
+            rows = iter_index_rows(buffer, span_bytes)
+            root_kind = next(rows)
+            connection.executemany("INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?)", rows)
+        connection.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("version", INDEX_VERSION),
+            ("mtime_ns", stat_result.st_mtime_ns),
+            ("size", stat_result.st_size),
+            ("root_kind", root_kind),
+            ("span_bytes", span_bytes),
+        ])
+        connection.commit()
+    except BaseException:
+        connection.close()
+        os.remove(temp_path)
+        raise
+    connection.close()
+    os.replace(temp_path, index_path)
+    return index_path
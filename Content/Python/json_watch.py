@@ -0,0 +1,424 @@
+"""
+
+    Watch JSON files and notify the key paths that changed
+
+    A background thread stats every watched file in one pass per poll
+    (woken early by watchdog file-system events when that package is
+    installed), waits until a file has stopped changing for the debounce
+    interval, re-parses only that file through json_blueprint's document
+    cache and notifies subscribers with the change set against the previous
+    version (json_blueprint.diff_json). Blueprint subscribers are called on the game thread;
+    WebSocket clients get the changes as a topic of WebSocketServer.
+
+"""
+
+import unreal
+import itertools
+import json
+import os
+import threading
+import time
+
+import game_thread
+import json_blueprint
+import metrics
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# Intervalos del vigilante
+JSON_WATCH_POLL_SECONDS = 0.5
+JSON_WATCH_EVENT_POLL_SECONDS = 5.0   # con watchdog el sondeo solo es un respaldo
+JSON_WATCH_DEBOUNCE_SECONDS = 0.25
+JSON_WATCH_EXTENSIONS = (".json",)
+# Tema de WebSocketServer con los cambios: "json.changed:<ruta absoluta>"
+JSON_WATCH_TOPIC_PREFIX = "json.changed:"
+
+
+class WatchSubscription:
+    """One subscriber of a file or directory"""
+    __slots__ = ("subscription_id", "path", "is_directory", "recursive", "callback", "on_game_thread", "primed")
+
+    def __init__(self, subscription_id: int, path: str, recursive: bool, callback, on_game_thread: bool):
+        self.subscription_id = subscription_id
+        self.path = path
+        self.is_directory = os.path.isdir(path)
+        self.recursive = recursive
+        self.callback = callback
+        self.on_game_thread = on_game_thread
+        # Los archivos vistos en el primer sondeo son la referencia y no se notifican
+        self.primed = False
+
+    def matches(self, file_path: str) -> bool:
+        if not self.is_directory:
+            return file_path == self.path
+        if self.recursive:
+            return file_path.startswith(os.path.join(self.path, ""))
+        return os.path.dirname(file_path) == self.path
+
+
+class _WatchedFile:
+    __slots__ = ("signature", "changed_at")
+
+    def __init__(self, signature):
+        self.signature = signature
+        self.changed_at = None  # instante del ultimo cambio aun sin notificar
+
+
+class _WakeHandler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        self.watcher._wake.set()
+
+
+class JsonWatcher:
+    """
+    Debounced, batched watcher of JSON files and directories
+
+    Subscriptions can be added and removed from any thread.
+    """
+
+    def __init__(self, poll_seconds: float = JSON_WATCH_POLL_SECONDS,
+                 debounce_seconds: float = JSON_WATCH_DEBOUNCE_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.debounce_seconds = debounce_seconds
+        self.detect_moves = False
+        # Version anterior (y hashes) de cada archivo para calcular los cambios
+        self._versions = json_blueprint.JsonVersionTracker()
+        self._subscriptions = {}
+        self._files = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._observer = None
+        self._observed_dirs = set()
+        self.polls = 0
+        self.stat_calls = 0
+        self.reparses = 0
+        self.parse_errors = 0
+        self.notifications = 0
+        self.last_poll_ms = 0.0
+
+    def subscribe(self, path: str, callback, recursive: bool = False, on_game_thread: bool = True) -> int:
+        """
+        Watch an absolute file or directory path
+
+        Args:
+            path: JSON file or directory of JSON files
+            callback: callable(file_path, change_set) with a json_blueprint.JsonChangeSet
+            recursive: Also watch subdirectories
+            on_game_thread: Run callback on the game thread (needed for unreal APIs)
+
+        Returns:
+            int: Subscription id for unsubscribe()
+        """
+        subscription = WatchSubscription(next(self._ids), os.path.abspath(path), recursive, callback, on_game_thread)
+        with self._lock:
+            self._subscriptions[subscription.subscription_id] = subscription
+        self._observe(subscription)
+        self.start()
+        self._wake.set()
+        return subscription.subscription_id
+
+    def unsubscribe(self, subscription_id: int) -> bool:
+        with self._lock:
+            return self._subscriptions.pop(subscription_id, None) is not None
+
+    def _observe(self, subscription: WatchSubscription) -> None:
+        if Observer is None:
+            return
+        directory = subscription.path if subscription.is_directory else os.path.dirname(subscription.path)
+        if directory in self._observed_dirs or not os.path.isdir(directory):
+            return
+        try:
+            if self._observer is None:
+                self._observer = Observer()
+                self._observer.daemon = True
+                self._observer.start()
+            self._observer.schedule(_WakeHandler(self), directory, recursive=subscription.recursive)
+            self._observed_dirs.add(directory)
+        except Exception as e:
+            # Sin eventos del sistema de archivos se sigue sondeando
+            game_thread.log_warning(f"JSON watcher falling back to polling for {directory}: {e}")
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="JsonWatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+            self._observed_dirs.clear()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            interval = JSON_WATCH_EVENT_POLL_SECONDS if self._observer is not None else self.poll_seconds
+            if self._pending():
+                interval = min(interval, self.debounce_seconds)
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._stopping:
+                break
+            try:
+                self.poll_once()
+            except Exception as e:
+                game_thread.log_error(f"Error polling watched JSON files: {e}")
+
+    def _pending(self) -> bool:
+        return any(watched.changed_at is not None for watched in self._files.values())
+
+    def _scan_targets(self, subscriptions) -> set:
+        """Files to stat in this poll: one scandir per watched directory"""
+        files = set()
+        for subscription in subscriptions:
+            if not subscription.is_directory:
+                files.add(subscription.path)
+                continue
+            directories = [subscription.path]
+            while directories:
+                try:
+                    with os.scandir(directories.pop()) as entries:
+                        for entry in entries:
+                            if entry.is_file() and entry.name.lower().endswith(JSON_WATCH_EXTENSIONS):
+                                files.add(entry.path)
+                            elif subscription.recursive and entry.is_dir():
+                                directories.append(entry.path)
+                except OSError:
+                    pass
+        return files
+
+    def poll_once(self) -> list:
+        """
+        Stat every watched file and notify the ones that settled after a change
+
+        Returns:
+            list[tuple]: (file_path, change_set) notified in this poll
+        """
+        started = time.perf_counter()
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+
+        targets = self._scan_targets(subscriptions)
+        baseline = self._scan_targets([subscription for subscription in subscriptions if not subscription.primed])
+        now = time.monotonic()
+        settled = []
+        for file_path in targets | set(self._files):
+            if file_path not in targets and not any(subscription.matches(file_path) for subscription in subscriptions):
+                # Ya nadie lo vigila
+                del self._files[file_path]
+                self._versions.forget(file_path)
+                continue
+            try:
+                stat_result = os.stat(file_path)
+                signature = (stat_result.st_mtime_ns, stat_result.st_size)
+            except OSError:
+                signature = None
+            self.stat_calls += 1
+
+            watched = self._files.get(file_path)
+            if watched is None:
+                if signature is None:
+                    continue
+                watched = self._files[file_path] = _WatchedFile(signature)
+                if file_path in baseline:
+                    # Primera lectura como referencia, sin notificar
+                    self._diff(file_path, watched)
+                else:
+                    # Archivo creado despues de suscribirse
+                    watched.changed_at = now
+                continue
+
+            if signature != watched.signature:
+                watched.signature = signature
+                watched.changed_at = now
+            elif watched.changed_at is not None and now - watched.changed_at >= self.debounce_seconds:
+                watched.changed_at = None
+                settled.append(file_path)
+
+        for subscription in subscriptions:
+            subscription.primed = True
+
+        notified = []
+        for file_path in settled:
+            watched = self._files[file_path]
+            if watched.signature is None:
+                del self._files[file_path]
+                self._versions.forget(file_path)
+                changes = json_blueprint.JsonChangeSet()
+                changes.removed.append("")
+            else:
+                changes = self._diff(file_path, watched)
+            if changes:
+                self._notify(file_path, changes, subscriptions)
+                notified.append((file_path, changes))
+
+        self.polls += 1
+        self.last_poll_ms = (time.perf_counter() - started) * 1000.0
+        return notified
+
+    def _diff(self, file_path: str, watched: _WatchedFile):
+        """Re-parse a file and diff it against its last version. None if it couldn't be parsed"""
+        try:
+            changes = self._versions.diff_file(file_path, self.detect_moves)
+            self.reparses += 1
+            return changes
+        except Exception as e:
+            # Puede estar a medio escribir: se reintenta en el proximo cambio
+            self.parse_errors += 1
+            game_thread.log_warning(f"Watched JSON file {file_path} could not be parsed: {e}")
+            return None
+
+    def _notify(self, file_path: str, changes, subscriptions: list) -> None:
+        for subscription in subscriptions:
+            if not subscription.matches(file_path):
+                continue
+            self.notifications += 1
+            if subscription.on_game_thread:
+                game_thread.dispatcher.submit(subscription.callback, file_path, changes)
+            else:
+                try:
+                    subscription.callback(file_path, changes)
+                except Exception as e:
+                    game_thread.log_error(f"Error in JSON watch callback: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            subscriptions = len(self._subscriptions)
+        return {
+            "backend": "watchdog" if self._observer is not None else "polling",
+            "subscriptions": subscriptions,
+            "watched_files": len(self._files),
+            "polls": self.polls,
+            "stat_calls": self.stat_calls,
+            "reparses": self.reparses,
+            "parse_errors": self.parse_errors,
+            "notifications": self.notifications,
+            "last_poll_ms": self.last_poll_ms,
+        }
+
+
+# Vigilante compartido por el BFL y el servidor WebSocket
+json_watcher = JsonWatcher()
+metrics.registry.register_gauge("json_watcher", json_watcher.get_stats)
+
+
+def register_rpc_methods(server) -> None:
+    """
+    Add json.watch / json.unwatch to a WebSocketServer
+
+    Subscribed clients receive {"method": "json.changed:<full path>", "params": {"file", "paths", "changes"}}
+    where "changes" is the change set with the new values, so clients can patch instead of re-reading.
+    Only paths inside the project can be watched, and a file stops being watched when the last client
+    subscribed to it unwatches or disconnects
+    """
+    # tema -> id de la suscripcion de json_watcher; se cancela cuando el tema se queda sin clientes
+    watched_topics = {}
+    project_dir = os.path.realpath(server.project_dir)
+
+    def resolve(file_path, recursive=False):
+        # Importado aqui: websocket_server importa este modulo
+        from websocket_server import RpcError, RPC_INVALID_PARAMS
+
+        full_path = os.path.realpath(file_path if os.path.isabs(file_path) else os.path.join(project_dir, file_path))
+        if full_path != project_dir and not full_path.startswith(os.path.join(project_dir, "")):
+            raise RpcError(RPC_INVALID_PARAMS, f"Only paths inside the project can be watched: {file_path}")
+        if recursive and full_path == project_dir:
+            raise RpcError(RPC_INVALID_PARAMS, "The whole project can't be watched recursively")
+        return full_path
+
+    def watch(client, file_path, recursive=False):
+        full_path = resolve(file_path, recursive)
+        topic = JSON_WATCH_TOPIC_PREFIX + full_path
+        if topic not in watched_topics:
+            def publish(changed_file, changes):
+                server.publish(topic, {"file": changed_file, "paths": changes.paths(),
+                                       "changes": changes.as_dict(include_values=True)})
+            watched_topics[topic] = json_watcher.subscribe(full_path, publish, recursive, on_game_thread=False)
+        server.subscribe(client, topic)
+        return topic
+
+    def unwatch(client, file_path):
+        return server.unsubscribe(client, JSON_WATCH_TOPIC_PREFIX + resolve(file_path))
+
+    def release(topic):
+        # Ultimo suscriptor fuera (json.unwatch o desconexion): se deja de vigilar el archivo
+        subscription_id = watched_topics.pop(topic, None)
+        if subscription_id is not None:
+            json_watcher.unsubscribe(subscription_id)
+
+    server.topic_released_handlers.append(release)
+    server.register_rpc_method("json.watch", watch, pass_client=True)
+    server.register_rpc_method("json.unwatch", unwatch, pass_client=True)
+
+
+@unreal.uclass()
+class JsonWatchBFL(unreal.BlueprintFunctionLibrary):
+    """
+    Blueprint Function Library for change notifications on JSON files
+    """
+
+    @unreal.ufunction(static=True, params=[str, bool, unreal.Object, str], ret=int, meta=dict(category="JSON Utilities|Watch"))
+    def watch_json_path(file_path: str, recursive: bool, target: unreal.Object, function_name: str) -> int:
+        """
+        Call target.function_name(file_path, changed_paths) whenever a watched JSON file changes
+
+        Args:
+            file_path: JSON file or directory (relative to project or absolute)
+            recursive: For directories, also watch subdirectories
+            target: Object (e.g. a widget) that receives the event
+            function_name: Function on target taking (string, array of strings)
+
+        Returns:
+            int: Subscription id, or -1 if failed
+        """
+        try:
+            full_path = json_blueprint._resolve_json_path(file_path)
+
+            if not os.path.exists(full_path):
+                unreal.log_error(f"JSON file not found: {full_path}")
+                return -1
+
+            def callback(changed_file, changes):
+                # La lista se convierte al TArray<FString> del parametro
+                target.call_method(function_name, (changed_file, changes.paths()))
+
+            return json_watcher.subscribe(full_path, callback, recursive)
+
+        except Exception as e:
+            unreal.log_error(f"Error watching {file_path}: {str(e)}")
+            return -1
+
+    @unreal.ufunction(static=True, params=[int], ret=bool, meta=dict(category="JSON Utilities|Watch"))
+    def unwatch_json_path(subscription_id: int) -> bool:
+        """
+        Args:
+            subscription_id: Id returned by watch_json_path
+
+        Returns:
+            bool: True if the subscription existed
+        """
+        return json_watcher.unsubscribe(subscription_id)
+
+    @unreal.ufunction(static=True, ret=str, meta=dict(category="JSON Utilities|Watch"))
+    def get_json_watch_stats() -> str:
+        """
+        Returns:
+            str: JSON with polls, stat calls, re-parses and notifications
+        """
+        return json.dumps(json_watcher.get_stats(), indent=2)
@@ -0,0 +1,227 @@
+"""
+
+    Declarative tool menus
+
+    Menus, submenus and their entries are described in a JSON manifest
+    (tool_menus.json, read through json_blueprint's document cache) and
+    registered in one pass with a single refresh_all_widgets() call:
+
+        {
+          "menus": [
+            {
+              "menu": "LevelEditor.MainMenu.Edit",
+              "section": "EditMain",
+              "entries": [
+                {"name": "OpenUtilityWidget", "label": "Open Utility Widget",
+                 "tool_tip": "Opens the utility widget", "widget": "/Game/read_json", "preload": true}
+              ],
+              "submenus": [
+                {"name": "MySubmenu", "label": "My Submenu", "entries": [...], "submenus": [...]}
+              ]
+            }
+          ]
+        }
+
+    Each entry runs one action: "widget" (Editor Utility Widget asset to open),
+    "python" (command string) or "module" + "function" (imported on first
+    click through startup_manifest). Widget assets are loaded once and cached;
+    entries marked "preload" are loaded from the game-thread queue after
+    registration so opening them later is instant.
+
+"""
+
+import unreal
+
+import game_thread
+import json_blueprint
+import startup_manifest
+
+# Manifiesto por defecto (relativo al proyecto)
+MENU_MANIFEST_FILE = "Content/Python/tool_menus.json"
+# Dueño de todas las entradas, para poder quitarlas y volver a registrarlas de golpe
+MENU_OWNER = "JsonToolMenus"
+
+
+class WidgetAssetCache:
+    """
+    Editor Utility Widget assets loaded once and reused
+
+    Assets are only loaded and spawned on the game thread; preload() queues
+    the loads on game_thread.dispatcher at low priority.
+    """
+
+    def __init__(self):
+        self._assets = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, widget_path: str):
+        """Return the loaded asset, loading it on first use. None if it can't be loaded"""
+        asset = self._assets.get(widget_path)
+        if asset is not None and unreal.SystemLibrary.is_valid(asset):
+            self.hits += 1
+            return asset
+
+        self.misses += 1
+        asset = unreal.EditorAssetLibrary.load_asset(widget_path)
+        if asset:
+            self._assets[widget_path] = asset
+        else:
+            self._assets.pop(widget_path, None)
+        return asset
+
+    def preload(self, widget_paths) -> None:
+        """Queue the loads for the game thread without blocking the current frame"""
+        for widget_path in widget_paths:
+            if widget_path not in self._assets:
+                game_thread.dispatcher.submit(
+                    self.get, widget_path, priority=game_thread.PRIORITY_LOW, coalesce_key=("widget", widget_path)
+                )
+
+    def open(self, widget_path: str) -> bool:
+        """
+        Open an Editor Utility Widget in a tab
+
+        Returns:
+            bool: True if the widget was spawned
+        """
+        try:
+            widget_asset = self.get(widget_path)
+
+            if widget_asset:
+                editor_utility_subsystem = unreal.get_editor_subsystem(unreal.EditorUtilitySubsystem)
+                editor_utility_subsystem.spawn_and_register_tab(widget_asset)
+                return True
+
+            print(f"Failed to load widget at path: {widget_path}")
+            return False
+
+        except Exception as e:
+            print(f"Error opening widget: {str(e)}")
+            return False
+
+    def clear(self) -> None:
+        self._assets.clear()
+
+    def stats(self) -> dict:
+        return {"cached": len(self._assets), "hits": self.hits, "misses": self.misses}
+
+
+# Cache compartida (tambien la usa open_utility_widget.py)
+widget_cache = WidgetAssetCache()
+
+# "<menu>.<entrada>" -> definicion de la entrada en el manifiesto
+_entry_actions = {}
+
+
+def run_entry_action(action: dict) -> None:
+    """Run the action of a manifest entry. Called on the game thread"""
+    if action.get("widget"):
+        widget_cache.open(action["widget"])
+    elif action.get("python"):
+        unreal.PythonScriptLibrary.execute_python_command(action["python"])
+    elif action.get("module"):
+        module = startup_manifest.require(action["module"], trigger="menu")
+        function_name = action.get("function")
+        if function_name:
+            getattr(module, function_name)()
+    else:
+        unreal.log_warning(f"Menu entry {action.get('name')} has no action")
+
+
+@unreal.uclass()
+class ManifestEntryScript(unreal.ToolMenuEntryScript):
+    """Menu entry whose action is looked up in the registered manifest"""
+
+    @unreal.ufunction(override=True)
+    def execute(self, context):
+        action = _entry_actions.get(f"{self.data.menu}.{self.data.name}")
+        if action is None:
+            unreal.log_warning(f"No action registered for menu entry {self.data.name}")
+            return
+        try:
+            run_entry_action(action)
+        except Exception as e:
+            unreal.log_error(f"Error running menu entry {self.data.name}: {str(e)}")
+
+
+def _add_entries(tool_menu, section: str, entries: list, widget_paths: list) -> int:
+    count = 0
+    for definition in entries:
+        script = ManifestEntryScript()
+        script.init_entry(
+            owner_name=MENU_OWNER,
+            menu=tool_menu.menu_name,
+            section=section,
+            name=definition["name"],
+            label=definition.get("label", definition["name"]),
+            tool_tip=definition.get("tool_tip", "")
+        )
+        # Sin refrescar: se refresca una sola vez al final de register_menus
+        tool_menu.add_menu_entry_object(script)
+        _entry_actions[f"{tool_menu.menu_name}.{definition['name']}"] = definition
+        if definition.get("widget") and definition.get("preload"):
+            widget_paths.append(definition["widget"])
+        count += 1
+    return count
+
+
+def _add_submenus(parent, section: str, submenus: list, widget_paths: list) -> int:
+    count = 0
+    for definition in submenus:
+        submenu = parent.add_sub_menu(
+            owner=MENU_OWNER,
+            section_name=definition.get("section", section or definition["name"]),
+            name=definition["name"],
+            label=definition.get("label", definition["name"]),
+            tool_tip=definition.get("tool_tip", "")
+        )
+        count += _add_entries(submenu, definition.get("entry_section", ""), definition.get("entries", []), widget_paths)
+        count += _add_submenus(submenu, "", definition.get("submenus", []), widget_paths)
+    return count
+
+
+def register_menus(manifest_path: str = MENU_MANIFEST_FILE) -> int:
+    """
+    Register every menu entry of the manifest, replacing the ones registered before
+
+    Args:
+        manifest_path: JSON manifest (relative to project or absolute)
+
+    Returns:
+        int: Number of entries registered, -1 if the manifest couldn't be read
+    """
+    full_path = json_blueprint._resolve_json_path(manifest_path)
+    try:
+        manifest = json_blueprint.document_cache.load(full_path)
+    except Exception as e:
+        unreal.log_error(f"Error reading menu manifest {full_path}: {str(e)}")
+        return -1
+
+    menus = unreal.ToolMenus.get()
+    menus.unregister_owner_by_name(MENU_OWNER)
+    _entry_actions.clear()
+
+    widget_paths = []
+    count = 0
+    for definition in manifest.get("menus", []):
+        tool_menu = menus.find_menu(definition["menu"])
+        if not tool_menu:
+            unreal.log_warning(f"Failed to find the '{definition['menu']}' menu")
+            continue
+        section = definition.get("section", "")
+        count += _add_entries(tool_menu, section, definition.get("entries", []), widget_paths)
+        count += _add_submenus(tool_menu, section, definition.get("submenus", []), widget_paths)
+
+    menus.refresh_all_widgets()
+    widget_cache.preload(widget_paths)
+    unreal.log(f"Registered {count} menu entries from {full_path}")
+    return count
+
+
+def unregister_menus() -> None:
+    """Remove every entry registered from the manifest"""
+    menus = unreal.ToolMenus.get()
+    menus.unregister_owner_by_name(MENU_OWNER)
+    _entry_actions.clear()
+    menus.refresh_all_widgets()
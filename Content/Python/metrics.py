@@ -0,0 +1,490 @@
+"""
+
+    Lightweight metrics for the JSON and WebSocket hot paths
+
+    Operations are timed into log-scale latency histograms (count, total,
+    min/max, p50/p90/p99, bytes) and modules register gauges (callables
+    returning a dict) for cache hit ratios, queue depths and per-client
+    message counts. Everything is off by default: instrumented functions
+    only pay one attribute check until metrics are enabled.
+
+    The snapshot is available through MetricsBFL, the "metrics" WebSocket
+    JSON-RPC method and dump() (JSON or CSV). A cProfile or tracemalloc
+    capture can be started for a fixed window; the report is written under
+    <project>/Saved/Profiling.
+
+"""
+
+import unreal
+import cProfile
+import csv
+import functools
+import io
+import json
+import math
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+import game_thread
+
+METRICS_ENABLED = False
+
+# Cubetas del histograma: 4 por cada potencia de 2 desde 1 us (~19% de error en los percentiles)
+HISTOGRAM_MIN_SECONDS = 1e-6
+HISTOGRAM_BUCKETS_PER_OCTAVE = 4
+HISTOGRAM_BUCKETS = 112  # hasta ~4 minutos
+
+# Capturas de perfil
+PROFILE_DEFAULT_DIR = "Saved/Profiling"  # relativo al proyecto
+PROFILE_MAX_SECONDS = 300.0
+PROFILE_TOP_ENTRIES = 40
+PROFILE_CPROFILE = "cprofile"
+PROFILE_TRACEMALLOC = "tracemalloc"
+
+
+class Histogram:
+    """Log-scale latency histogram with byte and error counters"""
+    __slots__ = ("counts", "count", "total", "minimum", "maximum", "bytes", "errors")
+
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.bytes = 0
+        self.errors = 0
+
+    @staticmethod
+    def _bucket(seconds: float) -> int:
+        if seconds <= HISTOGRAM_MIN_SECONDS:
+            return 0
+        bucket = int(math.log2(seconds / HISTOGRAM_MIN_SECONDS) * HISTOGRAM_BUCKETS_PER_OCTAVE) + 1
+        return bucket if bucket < HISTOGRAM_BUCKETS else HISTOGRAM_BUCKETS - 1
+
+    @staticmethod
+    def _upper_bound(bucket: int) -> float:
+        return HISTOGRAM_MIN_SECONDS * 2 ** (bucket / HISTOGRAM_BUCKETS_PER_OCTAVE)
+
+    def observe(self, seconds: float, nbytes: int = 0) -> None:
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.minimum:
+            self.minimum = seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        self.bytes += nbytes
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound (seconds) of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(self._upper_bound(bucket), self.maximum)
+        return self.maximum
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": self.total * 1000.0,
+            "mean_ms": self.total / self.count * 1000.0 if self.count else 0.0,
+            "min_ms": self.minimum * 1000.0 if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * 1000.0,
+            "p90_ms": self.percentile(0.90) * 1000.0,
+            "p99_ms": self.percentile(0.99) * 1000.0,
+            "max_ms": self.maximum * 1000.0,
+            "bytes": self.bytes,
+        }
+
+
+class MetricsRegistry:
+    """
+    Named histograms, counters and gauges
+
+    Recording methods can be called from any thread; they assume the caller
+    already checked enabled (instrument() does).
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def observe(self, name: str, seconds: float, nbytes: int = 0) -> None:
+        """Record one timed operation"""
+        self.histogram(name).observe(seconds, nbytes)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def register_gauge(self, name: str, function) -> None:
+        """Add a callable returning a dict (or a number), evaluated in every snapshot"""
+        self._gauges[name] = function
+
+    def unregister_gauge(self, name: str) -> None:
+        self._gauges.pop(name, None)
+
+    def reset(self) -> None:
+        """Drop histograms and counters (gauges stay registered)"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> dict:
+        """
+        Current values of everything
+
+        Gauges read other modules' state, so call this on the game thread.
+
+        Returns:
+            dict: enabled, window_seconds, operations (name -> histogram dict),
+                  counters and gauges
+        """
+        gauges = {}
+        for name, function in list(self._gauges.items()):
+            try:
+                gauges[name] = function()
+            except Exception as e:
+                gauges[name] = {"error": str(e)}
+        with self._lock:
+            histograms = list(self._histograms.items())
+            counters = dict(self._counters)
+        return {
+            "enabled": self.enabled,
+            "window_seconds": time.time() - self.started_at,
+            "operations": {name: histogram.as_dict() for name, histogram in sorted(histograms)},
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    def dump(self, file_path: str) -> str:
+        """
+        Write the snapshot to a .json or .csv file
+
+        Returns:
+            str: The path written
+        """
+        snapshot = self.snapshot()
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if file_path.lower().endswith(".csv"):
+            with open(file_path, "w", newline="", encoding="utf-8") as file:
+                file.write(_snapshot_to_csv(snapshot))
+        else:
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(snapshot, file, indent=2, default=str)
+        return file_path
+
+
+_CSV_COLUMNS = ("count", "errors", "total_ms", "mean_ms", "min_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms", "bytes")
+
+
+def _flatten(prefix: str, value, rows: list) -> None:
+    if isinstance(value, dict):
+        for key, child in value.items():
+            _flatten(f"{prefix}.{key}", child, rows)
+    elif isinstance(value, (list, tuple)):
+        for position, child in enumerate(value):
+            _flatten(f"{prefix}.{position}", child, rows)
+    else:
+        rows.append((prefix, value))
+
+
+def _snapshot_to_csv(snapshot: dict) -> str:
+    """One row per operation, counter and (flattened) gauge value"""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(("kind", "name") + _CSV_COLUMNS + ("value",))
+    for name, histogram in snapshot["operations"].items():
+        writer.writerow(("operation", name) + tuple(histogram[column] for column in _CSV_COLUMNS) + ("",))
+    blank = ("",) * len(_CSV_COLUMNS)
+    for name, value in snapshot["counters"].items():
+        writer.writerow(("counter", name) + blank + (value,))
+    rows = []
+    for name, value in snapshot["gauges"].items():
+        _flatten(name, value, rows)
+    for name, value in rows:
+        writer.writerow(("gauge", name) + blank + (value,))
+    return output.getvalue()
+
+
+# Registro compartido por todos los modulos
+registry = MetricsRegistry()
+
+
+class _Timer:
+    """Context manager returned by timed()"""
+    __slots__ = ("name", "started_at")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = None
+
+    def __enter__(self):
+        if registry.enabled:
+            self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.started_at is not None:
+            histogram = registry.histogram(self.name)
+            if exc_type is not None:
+                histogram.errors += 1
+            histogram.observe(time.perf_counter() - self.started_at)
+        return False
+
+
+def timed(name: str) -> _Timer:
+    """
+    Time a with-block into the histogram name
+
+    Use this inside functions exposed with @unreal.ufunction: the editor reads
+    their signature, so they can't be wrapped by instrument(). Exceptions that
+    leave the block count as errors.
+    """
+    return _Timer(name)
+
+
+def instrument(name: str):
+    """
+    Decorator that times every call into the histogram name
+
+    String results add their length to the byte count and exceptions count as
+    errors. While metrics are disabled the call goes straight through. The
+    wrapper takes (*args, **kwargs), so don't use it under @unreal.ufunction
+    (see timed()).
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return function(*args, **kwargs)
+            started_at = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                histogram = registry.histogram(name)
+                histogram.errors += 1
+                histogram.observe(time.perf_counter() - started_at)
+                raise
+            registry.observe(name, time.perf_counter() - started_at, len(result) if isinstance(result, str) else 0)
+            return result
+        return wrapper
+    return decorator
+
+
+def set_enabled(enabled: bool) -> None:
+    registry.enabled = enabled
+
+
+class ProfileCapture:
+    """
+    cProfile or tracemalloc capture over a fixed window
+
+    cProfile only sees the thread that starts it, so start() must run on the
+    game thread (where the Blueprint and game-thread RPC calls execute); the
+    capture is stopped from the game-thread queue when the window ends.
+    tracemalloc covers every thread.
+    """
+
+    def __init__(self):
+        self.mode = None
+        self.output_path = ""
+        self.last_report = ""
+        self._profiler = None
+        self._started_tracemalloc = False
+        self._timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str, seconds: float, output_dir: str = "") -> str:
+        """
+        Begin a capture that stops by itself after seconds
+
+        Args:
+            mode: PROFILE_CPROFILE or PROFILE_TRACEMALLOC
+            seconds: Window length (capped at PROFILE_MAX_SECONDS)
+            output_dir: Report directory (default <project>/Saved/Profiling)
+
+        Returns:
+            str: Path the report will be written to
+        """
+        mode = mode.lower()
+        if mode not in (PROFILE_CPROFILE, PROFILE_TRACEMALLOC):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        with self._lock:
+            if self.mode is not None:
+                raise RuntimeError(f"A {self.mode} capture is already running")
+            output_dir = output_dir or os.path.join(unreal.Paths.project_dir(), PROFILE_DEFAULT_DIR)
+            os.makedirs(output_dir, exist_ok=True)
+            self.output_path = os.path.join(output_dir, f"{mode}_{time.strftime('%Y%m%d_%H%M%S')}.txt")
+            if mode == PROFILE_CPROFILE:
+                self._profiler = cProfile.Profile()
+                self._profiler.enable()
+            else:
+                self._started_tracemalloc = not tracemalloc.is_tracing()
+                if self._started_tracemalloc:
+                    tracemalloc.start(10)
+            self.mode = mode
+
+        seconds = max(0.0, min(seconds, PROFILE_MAX_SECONDS))
+        self._timer = threading.Timer(
+            seconds, game_thread.dispatcher.submit, (self.stop,), {"priority": game_thread.PRIORITY_HIGH}
+        )
+        self._timer.daemon = True
+        self._timer.start()
+        return self.output_path
+
+    def stop(self) -> str:
+        """
+        Stop the capture now and write its report (call on the game thread)
+
+        Returns:
+            str: Report path, empty if no capture was running
+        """
+        with self._lock:
+            mode = self.mode
+            if mode is None:
+                return ""
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            output = io.StringIO()
+            if mode == PROFILE_CPROFILE:
+                self._profiler.disable()
+                self._profiler.dump_stats(os.path.splitext(self.output_path)[0] + ".prof")
+                pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(PROFILE_TOP_ENTRIES)
+                self._profiler = None
+            else:
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                if self._started_tracemalloc:
+                    tracemalloc.stop()
+                output.write(f"Traced memory: current {current} bytes, peak {peak} bytes\n\n")
+                for statistic in snapshot.statistics("lineno")[:PROFILE_TOP_ENTRIES]:
+                    output.write(f"{statistic}\n")
+            with open(self.output_path, "w", encoding="utf-8") as file:
+                file.write(output.getvalue())
+            self.mode = None
+            self.last_report = self.output_path
+
+        unreal.log(f"{mode} capture written to {self.last_report}")
+        return self.last_report
+
+
+# Captura compartida por el BFL y el servidor WebSocket
+profile_capture = ProfileCapture()
+
+registry.register_gauge("game_thread", game_thread.dispatcher.get_stats)
+
+
+def register_rpc_methods(server) -> None:
+    """Expose the metrics on a WebSocketServer (gauges are read on the game thread)"""
+    def start_profile(mode=PROFILE_CPROFILE, seconds=5.0):
+        return profile_capture.start(mode, seconds)
+
+    server.register_rpc_method("metrics", registry.snapshot, game_thread_only=True, coalesce=True)
+    server.register_rpc_method("metrics.enable", set_enabled)
+    server.register_rpc_method("metrics.reset", registry.reset)
+    server.register_rpc_method("metrics.profile", start_profile, game_thread_only=True)
+
+
+@unreal.uclass()
+class MetricsBFL(unreal.BlueprintFunctionLibrary):
+    """
+    Blueprint Function Library for the metrics registry and profile captures
+    """
+
+    @unreal.ufunction(static=True, params=[bool], meta=dict(category="Metrics"))
+    def set_metrics_enabled(enabled: bool) -> None:
+        """
+        Turn timing of the instrumented operations on or off
+
+        Args:
+            enabled: True to record histograms and counters
+        """
+        set_enabled(enabled)
+
+    @unreal.ufunction(static=True, ret=str, meta=dict(category="Metrics"))
+    def get_metrics() -> str:
+        """
+        Returns:
+            str: JSON with the operation histograms, counters and gauges
+        """
+        return json.dumps(registry.snapshot(), indent=2, default=str)
+
+    @unreal.ufunction(static=True, params=[str], ret=bool, meta=dict(category="Metrics"))
+    def dump_metrics(file_path: str) -> bool:
+        """
+        Write the metrics to a file
+
+        Args:
+            file_path: .json or .csv file (relative to the project)
+
+        Returns:
+            bool: True if the file was written
+        """
+        try:
+            if not os.path.isabs(file_path):
+                file_path = os.path.join(unreal.Paths.project_dir(), file_path)
+            registry.dump(file_path)
+            return True
+        except Exception as e:
+            unreal.log_error(f"Error writing metrics to {file_path}: {str(e)}")
+            return False
+
+    @unreal.ufunction(static=True, meta=dict(category="Metrics"))
+    def reset_metrics() -> None:
+        """Clear every histogram and counter"""
+        registry.reset()
+
+    @unreal.ufunction(static=True, params=[str, float], ret=str, meta=dict(category="Metrics"))
+    def start_profile_capture(mode: str, seconds: float) -> str:
+        """
+        Profile for a fixed window and write the report under Saved/Profiling
+
+        Args:
+            mode: "cprofile" (game thread calls) or "tracemalloc" (allocations)
+            seconds: Length of the window
+
+        Returns:
+            str: Path of the report, written when the window ends; empty on error
+        """
+        try:
+            return profile_capture.start(mode, seconds)
+        except Exception as e:
+            unreal.log_error(f"Error starting {mode} capture: {str(e)}")
+            return ""
+
+    @unreal.ufunction(static=True, ret=str, meta=dict(category="Metrics"))
+    def stop_profile_capture() -> str:
+        """
+        Returns:
+            str: Path of the report, empty if no capture was running
+        """
+        return profile_capture.stop()
@@ -6,6 +6,8 @@
 
 import unreal
 
+import menu_manifest
+
 @unreal.uclass()
 class MyEntryScript(unreal.ToolMenuEntryScript):
     @unreal.ufunction(override=True)
@@ -13,20 +15,9 @@ class MyEntryScript(unreal.ToolMenuEntryScript):
         # Reemplaza 'YourWidgetName' con el nombre real de tu Utility Widget
         widget_path = "/Game/read_json"  # Ajusta la ruta según tu estructura de carpetas
         
-        try:
-            # Cargar el asset del widget
-            widget_asset = unreal.EditorAssetLibrary.load_asset(widget_path)
-            
-            if widget_asset:
-                # Crear y mostrar el widget
-                editor_utility_subsystem = unreal.get_editor_subsystem(unreal.EditorUtilitySubsystem)
-                editor_utility_subsystem.spawn_and_register_tab(widget_asset)
-                print(f"Widget '{widget_path}' opened successfully!")
-            else:
-                print(f"Failed to load widget at path: {widget_path}")
-                
-        except Exception as e:
-            print(f"Error opening widget: {str(e)}")
+        # El asset se carga solo en el primer clic y se reutiliza despues
+        if menu_manifest.widget_cache.open(widget_path):
+            print(f"Widget '{widget_path}' opened successfully!")
 
 def main():
 
@@ -0,0 +1,261 @@
+"""
+
+    Startup manifest for the editor's Python modules
+
+    bootstrap.py registers every module here with the phase in which it has
+    to be imported:
+
+        startup    - imported while the editor starts (modules that declare
+                     Blueprint Function Libraries must be registered early)
+        idle       - imported one per tick once the editor has been idle
+                     for a while after startup
+        on_demand  - imported on first use: require(), a lazy() proxy or a
+                     menu entry calling require()
+
+    Every import (and the optional init function) is timed and the report is
+    written to the Output Log. Modules can be skipped or moved to another
+    phase without touching code, through the UE_PY_BOOTSTRAP_SKIP environment
+    variable (comma separated) or bootstrap_config.json next to this file:
+
+        {"skip": ["websocket_server"], "phases": {"json_async": "idle"}, "idle_delay_seconds": 5}
+
+"""
+
+import unreal
+import importlib
+import json
+import os
+import time
+
+PHASE_STARTUP = "startup"
+PHASE_IDLE = "idle"
+PHASE_ON_DEMAND = "on_demand"
+_PHASES = (PHASE_STARTUP, PHASE_IDLE, PHASE_ON_DEMAND)
+
+# Estados de cada modulo en el informe
+REGISTERED = "registered"
+LOADED = "loaded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+BOOTSTRAP_SKIP_ENV_VAR = "UE_PY_BOOTSTRAP_SKIP"
+BOOTSTRAP_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bootstrap_config.json")
+
+# El editor se considera inactivo tras IDLE_DELAY_SECONDS y IDLE_STABLE_TICKS frames rapidos seguidos
+IDLE_DELAY_SECONDS = 5.0
+IDLE_MAX_FRAME_SECONDS = 1.0 / 20.0
+IDLE_STABLE_TICKS = 30
+# Pasado este tiempo los modulos "idle" se cargan aunque el editor siga ocupado
+IDLE_MAX_WAIT_SECONDS = 60.0
+
+
+class ModuleSkippedError(ImportError):
+    """Raised by require() for a module disabled by configuration"""
+
+
+class ModuleEntry:
+    """One module of the manifest and its timings"""
+    __slots__ = ("name", "phase", "init", "description", "status", "module",
+                 "import_seconds", "init_seconds", "error", "trigger")
+
+    def __init__(self, name: str, phase: str, init: str = None, description: str = ""):
+        self.name = name
+        self.phase = phase
+        self.init = init
+        self.description = description
+        self.status = REGISTERED
+        self.module = None
+        self.import_seconds = 0.0
+        self.init_seconds = 0.0
+        self.error = ""
+        self.trigger = ""
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "phase": self.phase,
+            "status": self.status,
+            "trigger": self.trigger,
+            "import_ms": self.import_seconds * 1000.0,
+            "init_ms": self.init_seconds * 1000.0,
+            "error": self.error,
+        }
+
+
+class _LazyModule:
+    """Module proxy that imports the module through the manifest on first attribute access"""
+
+    def __init__(self, manifest, name: str):
+        object.__setattr__(self, "_manifest", manifest)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attribute):
+        return getattr(self._manifest.require(self._name, trigger="first use"), attribute)
+
+    def __repr__(self):
+        return f"<lazy module '{self._name}'>"
+
+
+class StartupManifest:
+    """
+    Ordered list of modules to import at startup, when idle or on demand
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._skip = set()
+        self._phase_overrides = {}
+        self.idle_delay_seconds = IDLE_DELAY_SECONDS
+        self._started_at = None
+        self._startup_seconds = 0.0
+        self._stable_ticks = 0
+        self._tick_handle = None
+
+    def load_config(self, config_path: str = BOOTSTRAP_CONFIG_FILE) -> None:
+        """Read the skip list and phase overrides from the environment and the config file"""
+        skip = os.environ.get(BOOTSTRAP_SKIP_ENV_VAR, "")
+        self._skip.update(name.strip() for name in skip.split(",") if name.strip())
+
+        if not os.path.exists(config_path):
+            return
+        try:
+            with open(config_path, "r", encoding="utf-8") as file:
+                config = json.load(file)
+            self._skip.update(config.get("skip", []))
+            self._phase_overrides.update(config.get("phases", {}))
+            self.idle_delay_seconds = float(config.get("idle_delay_seconds", self.idle_delay_seconds))
+        except Exception as e:
+            unreal.log_error(f"Error reading bootstrap config {config_path}: {str(e)}")
+
+    def register(self, name: str, phase: str = PHASE_STARTUP, init: str = None, description: str = "") -> ModuleEntry:
+        """
+        Add a module to the manifest
+
+        Args:
+            name: Module name as passed to import
+            phase: PHASE_STARTUP, PHASE_IDLE or PHASE_ON_DEMAND
+            init: Optional name of a module-level function to call after the import
+            description: Shown in the report
+
+        Returns:
+            ModuleEntry: The registered entry
+        """
+        phase = self._phase_overrides.get(name, phase)
+        if phase not in _PHASES:
+            raise ValueError(f"Unknown startup phase for {name}: {phase}")
+        entry = ModuleEntry(name, phase, init, description)
+        if name in self._skip:
+            entry.status = SKIPPED
+        self._entries[name] = entry
+        return entry
+
+    def require(self, name: str, trigger: str = "require"):
+        """
+        Import a registered (or any other) module now if it isn't loaded yet
+
+        Args:
+            name: Module name
+            trigger: Reason recorded in the report
+
+        Returns:
+            module: The imported module
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            entry = self.register(name, PHASE_ON_DEMAND)
+        if entry.status == LOADED:
+            return entry.module
+        if entry.status == SKIPPED:
+            raise ModuleSkippedError(f"Module {name} is disabled in the bootstrap configuration")
+        self._load(entry, trigger)
+        if entry.status != LOADED:
+            raise ImportError(f"Module {name} failed to load: {entry.error}")
+        return entry.module
+
+    def lazy(self, name: str) -> _LazyModule:
+        """Proxy that imports name on first attribute access"""
+        return _LazyModule(self, name)
+
+    def _load(self, entry: ModuleEntry, trigger: str) -> None:
+        entry.trigger = trigger
+        started = time.perf_counter()
+        try:
+            entry.module = importlib.import_module(entry.name)
+            entry.import_seconds = time.perf_counter() - started
+            if entry.init:
+                started = time.perf_counter()
+                getattr(entry.module, entry.init)()
+                entry.init_seconds = time.perf_counter() - started
+            entry.status = LOADED
+            unreal.log(f"{entry.name} initialized successfully ({(entry.import_seconds + entry.init_seconds) * 1000:.1f} ms, {trigger})")
+        except Exception as e:
+            entry.status = FAILED
+            entry.error = str(e)
+            print(f"Error iniciando {entry.name}: {e}")
+            unreal.log_error(f"Error starting {entry.name}: {e}")
+
+    def run(self) -> None:
+        """Import the startup modules and schedule the idle ones. Call once from bootstrap.py"""
+        self._started_at = time.perf_counter()
+        for entry in list(self._entries.values()):
+            if entry.phase == PHASE_STARTUP and entry.status == REGISTERED:
+                self._load(entry, PHASE_STARTUP)
+        self._startup_seconds = time.perf_counter() - self._started_at
+
+        if self._pending_idle() and hasattr(unreal, "register_slate_post_tick_callback"):
+            self._tick_handle = unreal.register_slate_post_tick_callback(self._on_tick)
+        self.log_report()
+
+    def _pending_idle(self) -> list:
+        return [entry for entry in self._entries.values()
+                if entry.phase == PHASE_IDLE and entry.status == REGISTERED]
+
+    def _on_tick(self, delta_time: float) -> None:
+        elapsed = time.perf_counter() - self._started_at
+        self._stable_ticks = self._stable_ticks + 1 if delta_time <= IDLE_MAX_FRAME_SECONDS else 0
+        idle = elapsed >= self.idle_delay_seconds and self._stable_ticks >= IDLE_STABLE_TICKS
+        if not idle and elapsed < IDLE_MAX_WAIT_SECONDS:
+            return
+
+        # Un modulo por tick para no alargar ningun frame
+        pending = self._pending_idle()
+        if pending:
+            self._load(pending[0], PHASE_IDLE)
+        if len(pending) <= 1:
+            unreal.unregister_slate_post_tick_callback(self._tick_handle)
+            self._tick_handle = None
+            self.log_report()
+
+    def report(self) -> list:
+        """
+        Timing report
+
+        Returns:
+            list[dict]: One entry per module with phase, status, trigger, import_ms, init_ms and error
+        """
+        return [entry.as_dict() for entry in self._entries.values()]
+
+    def log_report(self) -> None:
+        """Write the timing report to the Output Log"""
+        lines = [f"Python startup: {self._startup_seconds * 1000:.1f} ms in the startup phase"]
+        for item in self.report():
+            lines.append(
+                f"  {item['name']:<24} {item['phase']:<10} {item['status']:<10}"
+                f" import {item['import_ms']:>8.1f} ms  init {item['init_ms']:>8.1f} ms"
+                + (f"  ({item['error']})" if item["error"] else "")
+            )
+        unreal.log("\n".join(lines))
+
+
+# Manifiesto compartido; bootstrap.py lo rellena y lo ejecuta
+manifest = StartupManifest()
+
+
+def require(name: str, trigger: str = "require"):
+    """Import a module of the manifest now (see StartupManifest.require)"""
+    return manifest.require(name, trigger)
+
+
+def lazy(name: str) -> _LazyModule:
+    """Proxy that imports a module of the manifest on first use"""
+    return manifest.lazy(name)
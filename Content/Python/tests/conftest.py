@@ -0,0 +1,43 @@
+"""
+Shared setup for the headless tests: the unreal stub must be installed
+before any module of Content/Python is imported
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import unreal_stub
+
+unreal = unreal_stub.install(tempfile.mkdtemp(prefix="json_tests_"), echo=False)
+
+import pytest
+
+
+@pytest.fixture
+def project_dir():
+    """The stub's project directory (what unreal.Paths.project_dir() returns)"""
+    return unreal.Paths.project_dir()
+
+
+@pytest.fixture
+def write_json(project_dir):
+    """Write a document under the project directory and return its absolute path"""
+    import json
+
+    written = []
+
+    def write(relative_path, json_data):
+        full_path = os.path.join(project_dir, relative_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as file:
+            json.dump(json_data, file)
+        written.append(full_path)
+        return full_path
+
+    yield write
+    for full_path in written:
+        if os.path.exists(full_path):
+            os.remove(full_path)
@@ -0,0 +1,97 @@
+import json
+import marshal
+import math
+import os
+
+import pytest
+
+import json_backend
+import json_blueprint
+
+
+# Casos en los que los backends rapidos difieren de json si no se les vigila
+TEXTS = [
+    '{"a": 1, "b": [true, false, null], "c": "caf\\u00e9 \\ud83d\\ude00"}',
+    '[12345678901234567890123, -9223372036854775809, 18446744073709551615]',
+    '[1e16, 1.5e-05, 0.1, -0.0, 1.0, 100000000000000000000.0]',
+    '{"nan": NaN, "inf": Infinity, "ninf": -Infinity}',
+    '{"dup": 1, "dup": 2}',
+    '"\\u0000 control \\t"',
+    '[[[[[[]]]]], {}]',
+]
+
+
+def _same(left, right):
+    """== that also treats NaN as equal to NaN and tells 1 from 1.0 and True"""
+    if isinstance(left, float) and isinstance(right, float) and math.isnan(left):
+        return math.isnan(right)
+    if type(left) is not type(right):
+        return False
+    if isinstance(left, dict):
+        return list(left) == list(right) and all(_same(left[key], right[key]) for key in left)
+    if isinstance(left, list):
+        return len(left) == len(right) and all(map(_same, left, right))
+    return left == right
+
+
+@pytest.fixture(params=json_backend.available_backends())
+def backend(request):
+    return json_backend.create_backend(request.param)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_loads_matches_stdlib(backend, text):
+    expected = json.loads(text)
+    assert _same(backend.loads(text), expected)
+    assert _same(backend.loads(text.encode("utf-8")), expected)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_dumps_matches_stdlib(backend, text):
+    json_data = json.loads(text)
+    assert backend.dumps(json_data, indent=2) == json.dumps(json_data, indent=2, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("text", ['["\\ud800 lone surrogate"]', "[" * 300 + "]" * 300])
+def test_documents_fast_encoders_reject_round_trip(backend, text):
+    json_data = json.loads(text)
+    assert _same(backend.loads(text), json_data)
+    assert backend.dumps(json_data, indent=2) == json.dumps(json_data, indent=2, ensure_ascii=False)
+
+
+def test_lone_surrogate_value_is_returned_from_a_file(write_json):
+    full_path = write_json("backend/surrogate.json", {"name": "\ud800", "deep": json.loads("[" * 300 + "]" * 300)})
+    assert json_blueprint.JsonReaderBFL.get_json_value_by_path(full_path, "name") == "\ud800"
+    assert json_blueprint.JsonReaderBFL.read_json_file_as_string(full_path) == json.dumps(
+        {"name": "\ud800", "deep": json.loads("[" * 300 + "]" * 300)}, indent=2, ensure_ascii=False
+    )
+
+
+def test_invalid_utf8_is_rejected_like_stdlib(backend):
+    with pytest.raises(ValueError):
+        backend.loads(b'"\xff"')
+
+
+def test_set_backend(monkeypatch):
+    monkeypatch.setattr(json_backend, "backend", json_backend.backend)
+    assert not json_backend.set_backend("missing")
+    assert json_backend.set_backend("stdlib")
+    assert json_backend.backend.name == "stdlib"
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_load_files_keeps_going_after_a_bad_file(write_json, packed):
+    good = write_json("backend/good.json", {"a": [1, 2]})
+    bad = os.path.join(os.path.dirname(good), "bad.json")
+    with open(bad, "w") as file:
+        file.write("{")
+    try:
+        results = json_backend.load_files([good, bad], packed)
+    finally:
+        os.remove(bad)
+    if packed:
+        results = marshal.loads(results)
+    (good_path, signature, data, error), (bad_path, _, bad_data, bad_error) = results
+    assert (good_path, data, error) == (good, {"a": [1, 2]}, None)
+    assert signature[1] == os.path.getsize(good)
+    assert bad_path == bad and bad_data is None and bad_error.startswith("Invalid JSON")
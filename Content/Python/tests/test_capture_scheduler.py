@@ -0,0 +1,65 @@
+import pytest
+
+import capture_scheduler
+import unreal
+
+
+class _FakeSnapshotLibrary:
+    """Writes the capture file at once, like a viewport that is always ready"""
+
+    @staticmethod
+    def capture_current_frame_to_file(file_path, show_ui):
+        with open(file_path, "wb") as file:
+            file.write(b"image")
+        return True
+
+
+@pytest.fixture
+def scheduler(monkeypatch, tmp_path):
+    monkeypatch.setattr(unreal, "SnapshotCaptureBlueprintLibrary", _FakeSnapshotLibrary, raising=False)
+    scheduler = capture_scheduler.CaptureScheduler(max_queued=4)
+    scheduler.max_history = 2
+    yield scheduler
+    scheduler.shutdown()
+
+
+def _run(scheduler, ticks=20):
+    for _ in range(ticks):
+        scheduler._on_tick(1.0 / 60.0)
+
+
+def test_finished_history_is_bounded(scheduler, tmp_path):
+    finished = []
+    scheduler.listeners.append(finished.append)
+    handles = [scheduler.submit(str(tmp_path / f"shot{index}.png")) for index in range(3)]
+    _run(scheduler)
+    # Los listeners ven todas las capturas aunque luego se olviden
+    assert [result["handle"] for result in finished] == handles
+    assert [scheduler.status(handle) for handle in handles] == [
+        capture_scheduler.UNKNOWN, capture_scheduler.DONE, capture_scheduler.DONE
+    ]
+    assert scheduler.get_stats()["tracked"] == 2
+
+
+def test_forget_finished(scheduler, tmp_path):
+    handle = scheduler.submit(str(tmp_path / "shot.png"))
+    _run(scheduler)
+    scheduler.forget_finished()
+    assert scheduler.status(handle) == capture_scheduler.UNKNOWN
+    assert scheduler.get_stats()["tracked"] == 0
+
+
+def test_cancelled_captures_count_towards_history(scheduler, tmp_path):
+    handles = scheduler.submit_sequence(str(tmp_path), "shot", 3)
+    assert scheduler.cancel_all() == 3
+    assert [scheduler.status(handle) for handle in handles] == [
+        capture_scheduler.UNKNOWN, capture_scheduler.CANCELLED, capture_scheduler.CANCELLED
+    ]
+
+
+def test_rejected_and_dropped_are_counted_apart(scheduler, tmp_path):
+    assert scheduler.submit(str(tmp_path / "shot.png"), convert_to="bogus") == -1
+    handles = scheduler.submit_sequence(str(tmp_path), "shot", 6)
+    assert handles.count(-1) == 2
+    stats = scheduler.get_stats()
+    assert (stats["rejected"], stats["dropped"]) == (1, 2)
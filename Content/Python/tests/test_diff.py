@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+import json_blueprint
+
+
+def _diff(old_data, new_data, **options):
+    changes = json_blueprint.diff_json(old_data, new_data, **options)
+    return sorted(changes.added), sorted(changes.removed), sorted(changes.modified)
+
+
+@pytest.mark.parametrize("old_data, new_data, modified", [
+    ({"a": -1}, {"a": -2}, ["a"]),
+    ({"a": {"b": -1}}, {"a": {"b": -2}}, ["a.b"]),
+    ({"a": [1, -1]}, {"a": [1, -2]}, ["a.1"]),
+    ({"a": 1}, {"a": 1.0}, ["a"]),
+    ({"a": 1}, {"a": True}, ["a"]),
+    ({"a": [[-1]]}, {"a": [[-2]]}, ["a.0.0"]),
+])
+def test_scalar_edits_are_detected(old_data, new_data, modified):
+    assert _diff(old_data, new_data) == ([], [], modified)
+
+
+def test_equal_documents_have_no_changes():
+    document = {"a": [1, {"b": "x"}], "c": None}
+    assert _diff(document, {"a": [1, {"b": "x"}], "c": None}) == ([], [], [])
+
+
+def test_added_and_removed_keys():
+    assert _diff({"a": 1, "b": 2}, {"a": 1, "c": 3}) == (["c"], ["b"], [])
+
+
+def test_equal_subtrees_share_a_digest():
+    old_hashes = json_blueprint.hash_json({"x": [1, 2, {"y": -1}]})
+    new_hashes = json_blueprint.hash_json({"x": [1, 2, {"y": -1}]})
+    assert sorted(old_hashes.values()) == sorted(new_hashes.values())
+    other = json_blueprint.hash_json({"x": [1, 2, {"y": -2}]})
+    assert not set(other.values()) & set(old_hashes.values())
+
+
+def test_array_moves():
+    changes = json_blueprint.diff_json({"a": [{"id": 1}, {"id": 2}]}, {"a": [{"id": 2}, {"id": 1}]},
+                                       detect_moves=True)
+    assert sorted(changes.moved) == [("a.0", "a.1"), ("a.1", "a.0")]
+
+
+def test_version_tracker_reports_negative_number_edit(write_json):
+    tracker = json_blueprint.JsonVersionTracker()
+    full_path = write_json("diff/tracked.json", {"hp": -1})
+    assert tracker.diff_file(full_path).added == [""]
+
+    stat_result = os.stat(full_path)
+    write_json("diff/tracked.json", {"hp": -2})
+    # Mismo tamaño: se fuerza otro mtime para que la cache vea el cambio
+    os.utime(full_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+    changes = tracker.diff_file(full_path)
+    assert changes.modified == ["hp"]
@@ -0,0 +1,76 @@
+import json
+import os
+
+import json_blueprint
+
+
+def _rewrite(full_path, json_data):
+    """Rewrite a file making sure its signature changes even on coarse mtime clocks"""
+    stat_result = os.stat(full_path)
+    with open(full_path, "w", encoding="utf-8") as file:
+        json.dump(json_data, file)
+    os.utime(full_path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+
+
+def test_second_load_is_a_hit(write_json):
+    cache = json_blueprint.JsonDocumentCache()
+    full_path = write_json("cache/a.json", {"a": 1})
+    first = cache.load(full_path)
+    assert cache.load(full_path) is first
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["bytes"] == os.path.getsize(full_path)
+
+
+def test_changed_file_is_reloaded(write_json):
+    cache = json_blueprint.JsonDocumentCache()
+    full_path = write_json("cache/a.json", {"a": 1})
+    assert cache.load(full_path) == {"a": 1}
+    _rewrite(full_path, {"a": 2})
+    assert cache.load(full_path) == {"a": 2}
+    assert cache.stats()["misses"] == 2
+
+
+def test_least_recently_used_entry_is_evicted(write_json):
+    paths = [write_json(f"cache/{name}.json", {"name": name}) for name in "abc"]
+    cache = json_blueprint.JsonDocumentCache(max_bytes=2 * os.path.getsize(paths[0]))
+    cache.load(paths[0])
+    cache.load(paths[1])
+    cache.load(paths[0])
+    cache.load(paths[2])
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+    # b era el menos usado
+    cache.load(paths[1])
+    assert cache.stats()["misses"] == 4
+
+
+def test_document_bigger_than_budget_is_not_cached(write_json):
+    cache = json_blueprint.JsonDocumentCache(max_bytes=4)
+    full_path = write_json("cache/big.json", {"key": "value"})
+    assert cache.load(full_path) == {"key": "value"}
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_and_clear(write_json):
+    cache = json_blueprint.JsonDocumentCache()
+    first = write_json("cache/a.json", [1])
+    second = write_json("cache/b.json", [2])
+    cache.load(first)
+    cache.load(second)
+    assert cache.invalidate(first)
+    assert not cache.invalidate(first)
+    assert cache.stats()["entries"] == 1
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_put_stores_a_document_parsed_elsewhere(write_json):
+    cache = json_blueprint.JsonDocumentCache()
+    full_path = write_json("cache/a.json", {"a": 1})
+    stat_result = os.stat(full_path)
+    document = {"a": 1}
+    cache.put(full_path, (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino), document)
+    assert cache.load(full_path) is document
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,37 @@
+import asyncio
+
+import game_thread
+
+
+def test_cancelling_one_coalesced_caller_keeps_the_others():
+    dispatcher = game_thread.GameThreadDispatcher()
+
+    async def run():
+        first = asyncio.ensure_future(dispatcher.run(lambda: "x", coalesce_key="snapshot"))
+        second = asyncio.ensure_future(dispatcher.run(lambda: "y", coalesce_key="snapshot"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        # Este hilo hace de hilo del juego
+        dispatcher.drain()
+        return first, await asyncio.wait_for(second, timeout=5)
+
+    first, result = asyncio.run(run())
+    assert first.cancelled()
+    assert result == "y"
+    assert dispatcher.coalesced == 1
+
+
+def test_cancelling_a_lone_caller_cancels_its_command():
+    dispatcher = game_thread.GameThreadDispatcher()
+    calls = []
+
+    async def run():
+        task = asyncio.ensure_future(dispatcher.run(calls.append, "x"))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.sleep(0)
+        dispatcher.drain()
+
+    asyncio.run(run())
+    assert calls == []
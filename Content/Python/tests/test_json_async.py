@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+import json_async
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = json_async.JsonLoadScheduler(max_finished=2)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def _finish(scheduler, *handles):
+    """Deliver results as the Slate tick would until none of handles is pending"""
+    deadline = time.monotonic() + 10
+    while any(scheduler.poll(handle) == json_async.PENDING for handle in handles):
+        assert time.monotonic() < deadline
+        scheduler.dispatch_completed()
+        time.sleep(0.001)
+
+
+def test_result_is_kept_until_taken(scheduler, write_json):
+    handle = scheduler.submit(write_json("async/a.json", {"a": 1}))
+    _finish(scheduler, handle)
+    assert scheduler.poll(handle) == json_async.DONE
+    assert scheduler.take_result(handle) == (json_async.DONE, '{\n  "a": 1\n}')
+    assert scheduler.poll(handle) == json_async.UNKNOWN
+    assert not scheduler._requests and not scheduler._finished
+
+
+def test_cancelled_request_is_forgotten_at_once(scheduler, write_json):
+    handle = scheduler.submit(write_json("async/a.json", {"a": 1}))
+    assert scheduler.cancel(handle)
+    assert scheduler.poll(handle) == json_async.UNKNOWN
+    assert not scheduler._requests
+    assert not scheduler.cancel(handle)
+    scheduler.dispatch_completed()
+    assert not scheduler._finished
+
+
+def test_uncollected_results_are_capped(scheduler, write_json):
+    handles = [scheduler.submit(write_json(f"async/{name}.json", [name])) for name in "abc"]
+    _finish(scheduler, *handles)
+    assert scheduler.expired == 1
+    assert scheduler.poll(handles[0]) == json_async.UNKNOWN
+    assert [scheduler.poll(handle) for handle in handles[1:]] == [json_async.DONE, json_async.DONE]
+
+
+def test_callback_requests_are_not_kept(scheduler, write_json):
+    delivered = []
+    handle = scheduler.submit(write_json("async/a.json", {"a": 1}), lambda *args: delivered.append(args))
+    _finish(scheduler, handle)
+    assert delivered == [(handle, json_async.DONE, '{\n  "a": 1\n}')]
+    assert not scheduler._requests and not scheduler._finished
+
+
+def test_process_pools_spawn_their_workers():
+    pool = json_async._new_process_pool(1)
+    try:
+        assert pool._mp_context.get_start_method() == "spawn"
+        assert pool.submit(sum, [1, 2]).result(timeout=30) == 3
+    finally:
+        pool.shutdown()
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import json_watch
+import websocket_server
+
+
+class _FakeWebSocket:
+    remote_address = ("test", 1)
+    subprotocol = None
+
+
+@pytest.fixture
+def server():
+    return websocket_server.WebSocketServer(log_messages=False)
+
+
+def _client():
+    return websocket_server._ClientState(_FakeWebSocket(), 4)
+
+
+def _watched_subscriptions():
+    return json_watch.json_watcher.get_stats()["subscriptions"]
+
+
+def test_watch_ends_with_the_last_subscriber(server, write_json):
+    write_json("watch/a.json", {"a": 1})
+    watch = server.rpc_methods["json.watch"]
+    unwatch = server.rpc_methods["json.unwatch"]
+    before = _watched_subscriptions()
+    first, second = _client(), _client()
+
+    topic = watch(first, "watch/a.json")
+    assert watch(second, "watch/a.json") == topic
+    assert _watched_subscriptions() == before + 1
+
+    assert unwatch(first, "watch/a.json")
+    assert _watched_subscriptions() == before + 1
+    # Desconexion: handle_client quita todas las suscripciones del cliente
+    server.unsubscribe(second, topic)
+    assert _watched_subscriptions() == before
+
+    # Se puede volver a vigilar despues
+    watch(first, "watch/a.json")
+    assert _watched_subscriptions() == before + 1
+    unwatch(first, "watch/a.json")
+    assert _watched_subscriptions() == before
+
+
+@pytest.mark.parametrize("file_path, recursive", [
+    ("../outside.json", False),
+    ("/", True),
+    (".", True),
+])
+def test_watch_rejects_paths_outside_or_the_whole_project(server, file_path, recursive):
+    with pytest.raises(websocket_server.RpcError) as error:
+        server.rpc_methods["json.watch"](_client(), file_path, recursive)
+    assert error.value.code == websocket_server.RPC_INVALID_PARAMS
+
+
+def test_watch_of_absolute_path_inside_the_project(server, write_json, project_dir):
+    full_path = write_json("watch/b.json", {"b": 1})
+    client = _client()
+    topic = server.rpc_methods["json.watch"](client, full_path)
+    assert topic == json_watch.JSON_WATCH_TOPIC_PREFIX + os.path.realpath(full_path)
+    assert server.rpc_methods["json.unwatch"](client, full_path)
@@ -0,0 +1,86 @@
+import pytest
+
+import json_blueprint
+
+
+DOCUMENT = {
+    "player": {"name": "Ana", "stats": {"hp": 10, "mp": None}},
+    "items": [{"id": 1, "tags": ["a", "b"]}, {"id": 2, "tags": []}],
+    "10": "numeric key",
+}
+
+
+@pytest.mark.parametrize("key_path, expected", [
+    ("player.name", "Ana"),
+    ("player.stats.hp", 10),
+    ("player.stats.mp", None),
+    ("items.1.id", 2),
+    ("items.0.tags.1", "b"),
+    ("10", "numeric key"),
+])
+def test_resolve(key_path, expected):
+    assert json_blueprint.compile_key_path(key_path).resolve(DOCUMENT) == (expected, None)
+
+
+@pytest.mark.parametrize("key_path, error", [
+    ("player.age", "Key 'age' not found in JSON data"),
+    ("items.2", "Index 2 out of range for array"),
+    ("items.x", "Key 'x' not found in JSON data"),
+    ("player.name.first", "Key 'first' not found in JSON data"),
+])
+def test_resolve_errors(key_path, error):
+    assert json_blueprint.compile_key_path(key_path).resolve(DOCUMENT) == (None, error)
+
+
+def test_compiled_paths_are_memoized():
+    assert json_blueprint.compile_key_path("items.0.id") is json_blueprint.compile_key_path("items.0.id")
+    assert json_blueprint.compile_key_path("items.0.id").segments == (("items", None), ("0", 0), ("id", None))
+
+
+def test_resolve_many_paths_sharing_prefixes():
+    values, errors = json_blueprint._resolve_key_paths(
+        DOCUMENT, ["player.name", "player.stats.hp", "player.missing", "items.1.tags", "player.name"]
+    )
+    assert values == ["Ana", "10", "", "[]", "Ana"]
+    assert errors == ["Key 'missing' not found in JSON data"]
+
+
+def test_lookup_from_file_matches_streaming(write_json, monkeypatch):
+    monkeypatch.setattr(json_blueprint, "JSON_COLUMNAR_ENABLED", False)
+    full_path = write_json("paths/document.json", DOCUMENT)
+    for key_path in ("player.stats", "items.0.tags.0", "items.5", "player.age"):
+        assert json_blueprint.lookup_json_value(full_path, key_path) == \
+            json_blueprint._stream_value_by_path(full_path, key_path)
+
+
+def test_lookup_many_values_from_file(write_json):
+    full_path = write_json("paths/document.json", DOCUMENT)
+    assert json_blueprint.lookup_json_values(full_path, ["player.name", "items.9"]) == (
+        ["Ana", ""], ["Index 9 out of range for array"]
+    )
+
+
+@pytest.mark.parametrize("key", ["²", "١", "1²", "-1", "+1", " 1"])
+def test_non_ascii_or_signed_digits_are_keys(key):
+    assert json_blueprint.compile_key_path(f"items.{key}").segments[1] == (key, None)
+    assert json_blueprint.compile_key_path(f"items.{key}").resolve(DOCUMENT) == (
+        None, f"Key '{key}' not found in JSON data"
+    )
+    assert json_blueprint.compile_key_path(key).resolve({key: 1}) == (1, None)
+
+
+def test_non_ascii_digits_in_file_lookups(write_json):
+    full_path = write_json("paths/document.json", DOCUMENT)
+    assert json_blueprint.lookup_json_value(full_path, "items.²") == (None, "Key '²' not found in JSON data")
+    assert json_blueprint._stream_value_by_path(full_path, "items.²") == (None, "Key '²' not found in JSON data")
+
+
+def test_duplicate_keys_resolve_to_the_last_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(json_blueprint, "JSON_COLUMNAR_ENABLED", False)
+    full_path = str(tmp_path / "duplicates.json")
+    with open(full_path, "w", encoding="utf-8") as file:
+        file.write('{"a": {"x": 1}, "b": [1], "a": {"x": 2, "y": 3}, "b": {"c": 4}}')
+    for key_path in ("a", "a.x", "a.y", "b.c", "b.0"):
+        assert json_blueprint._stream_value_by_path(full_path, key_path) == \
+            json_blueprint.lookup_json_value(full_path, key_path)
+    assert json_blueprint._stream_value_by_path(full_path, "a.x") == ("2", None)
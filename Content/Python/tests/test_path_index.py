@@ -0,0 +1,115 @@
+import os
+import sqlite3
+
+import pytest
+
+import json_blueprint
+import json_scanner
+
+
+DOCUMENT = {
+    "meta": {"name": "x", "v": [1, 2, 3], "a.b": 1},
+    "records": [{"id": i, "pos": {"x": i, "y": -i}, "ok": i % 2 == 0} for i in range(200)],
+    "empty": [],
+}
+
+
+@pytest.fixture
+def indexed_json(write_json, monkeypatch):
+    """Write DOCUMENT with a tiny span threshold so nested containers get indexed"""
+    monkeypatch.setattr(json_blueprint, "JSON_INDEX_SPAN_BYTES", 256)
+    monkeypatch.setattr(json_blueprint, "JSON_INDEX_PROCESS", False)
+    monkeypatch.setattr(json_blueprint, "JSON_COLUMNAR_ENABLED", False)
+    full_path = write_json("index/document.json", DOCUMENT)
+    yield full_path
+    json_blueprint._path_indexes.pop(os.path.realpath(full_path), None)
+    if os.path.exists(full_path + json_blueprint.JSON_INDEX_SUFFIX):
+        os.remove(full_path + json_blueprint.JSON_INDEX_SUFFIX)
+
+
+def _resolve(full_path, key_path):
+    current_data, error = json_blueprint.compile_key_path(key_path).resolve(
+        json_blueprint.document_cache.load(full_path)
+    )
+    return (None, error) if error is not None else (json_blueprint._format_json_value(current_data), None)
+
+
+@pytest.mark.parametrize("key_path", [
+    "meta", "meta.name", "meta.v.2", "records.150.pos.y", "records.7.ok", "records.01.id",
+    "empty", "records.200", "records.x", "missing", "meta.v.5", "records.3.pos.z", "meta.a",
+    "records.²", "²", "records.1.²", "meta.", "records.", "records.150.", "records..id", "", ".",
+    "records.0150.pos.x", "records.0200", "meta.v.01", "empty.0",
+])
+def test_lookup_matches_full_resolve(indexed_json, key_path):
+    index = json_blueprint.get_path_index(indexed_json, force=True)
+    assert index is not None
+    assert index.lookup(key_path) == _resolve(indexed_json, key_path)
+
+
+def test_missing_children_of_indexed_containers_are_not_read(indexed_json, monkeypatch):
+    index = json_blueprint.get_path_index(indexed_json, force=True)
+
+    def fail(*args):
+        raise AssertionError("the source file was read")
+
+    monkeypatch.setattr(json_blueprint.json_backend, "loads", fail)
+    monkeypatch.setattr(json_blueprint.document_cache, "load", fail)
+    assert index.lookup("records.500") == (None, "Index 500 out of range for array")
+    assert index.lookup("records.x.y") == (None, "Key 'x' not found in JSON data")
+    assert index.lookup("missing") == (None, "Key 'missing' not found in JSON data")
+    assert index.lookup("records.") == (None, "Key '' not found in JSON data")
+
+
+def test_only_children_of_large_containers_are_indexed(indexed_json):
+    json_blueprint.get_path_index(indexed_json, force=True)
+    with sqlite3.connect(indexed_json + json_blueprint.JSON_INDEX_SUFFIX) as connection:
+        paths = {path for path, in connection.execute("SELECT path FROM paths")}
+    assert {"meta", "records", "records.150", "empty"} <= paths
+    # Registros pequeños: su contenido se lee de su propio span
+    assert "records.150.pos" not in paths
+    assert "meta.a.b" not in paths
+
+
+def test_automatic_index_is_built_in_the_background(indexed_json, monkeypatch):
+    monkeypatch.setattr(json_blueprint, "JSON_INDEX_MIN_BYTES", 0)
+    # Mientras se construye se responde desde la cache de documentos
+    assert json_blueprint.get_path_index(indexed_json) is None
+    assert json_blueprint.lookup_json_value(indexed_json, "records.3.pos.x") == ("3", None)
+
+    json_blueprint._index_builds[os.path.realpath(indexed_json)].result(timeout=30)
+    index = json_blueprint.get_path_index(indexed_json)
+    assert index is not None
+    assert index.lookup("records.3.pos.x") == ("3", None)
+
+
+def test_scalar_root(write_json):
+    full_path = write_json("index/scalar.json", 5)
+    json_scanner.build_path_index(full_path, full_path + ".idx", 256)
+    try:
+        index = json_blueprint.JsonPathIndex(full_path)
+        index.index_path = full_path + ".idx"
+        assert index.refresh()
+        assert index.lookup("a") == (None, "Key 'a' not found in JSON data")
+        index.close()
+    finally:
+        os.remove(full_path + ".idx")
+
+
+def test_duplicate_keys_index_the_last_one(project_dir, monkeypatch):
+    monkeypatch.setattr(json_blueprint, "JSON_COLUMNAR_ENABLED", False)
+    full_path = os.path.join(project_dir, "index", "duplicates.json")
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    first = ", ".join(f'"k{i}": {i}' for i in range(100))
+    with open(full_path, "w", encoding="utf-8") as file:
+        file.write('{"a": {%s}, "a": {"x": 2}, "b": 1}' % first)
+    json_scanner.build_path_index(full_path, full_path + ".idx", 64)
+    try:
+        index = json_blueprint.JsonPathIndex(full_path)
+        index.index_path = full_path + ".idx"
+        assert index.refresh()
+        for key_path in ("a", "a.x", "a.k5", "b"):
+            assert index.lookup(key_path) == _resolve(full_path, key_path)
+        index.close()
+    finally:
+        os.remove(full_path + ".idx")
+        os.remove(full_path)
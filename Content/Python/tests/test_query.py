@@ -0,0 +1,62 @@
+import pytest
+
+import json_blueprint
+import json_columnar
+
+
+RECORDS = [
+    {"id": i, "name": f"unit{i}", "hp": i * 10, "speed": i * 0.5, "team": "red" if i % 2 else "blue"}
+    for i in range(12)
+]
+DOCUMENT = {"units": RECORDS, "meta": {"version": 3, "tags": ["a", "b", "c"]}}
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("meta.version", [3]),
+    ("meta.tags[1]", ["b"]),
+    ("meta.tags[-1]", ["c"]),
+    ("meta.tags[0:2]", ["a", "b"]),
+    ("meta.*", [3, ["a", "b", "c"]]),
+    ("units[?hp>=100].id", [10, 11]),
+    ("units[?team=='red'].id", [1, 3, 5, 7, 9, 11]),
+    ("units[?team=blue].name", ["unit0", "unit2", "unit4", "unit6", "unit8", "unit10"]),
+    ("units[*].missing", []),
+    ("count(units[?speed<1])", 2),
+    ("sum(units.*.hp)", 660),
+    ("max(units[*].speed)", 5.5),
+    ("avg(units[?team==red].hp)", 60),
+    ("min(meta.tags)", None),
+    ("meta.tags.²", []),
+    ("units.1.id", [1]),
+])
+def test_evaluate(query, expected):
+    assert json_blueprint.compile_query(query).evaluate(DOCUMENT) == expected
+
+
+@pytest.mark.parametrize("query", ["units[", "units[1:2:3:4]", "units[?]", "units[x]", "units[0]x"])
+def test_invalid_queries(query):
+    with pytest.raises(json_blueprint.JsonQueryError):
+        json_blueprint.CompiledQuery(query)
+
+
+@pytest.mark.skipif(not json_columnar.is_available(), reason="needs NumPy")
+@pytest.mark.parametrize("query", [
+    "units[?hp>=100].id", "units[?team=='red'].name", "count(units[?speed<1])",
+    "sum(units[*].hp)", "avg(units[*].speed)", "units[3]", "units[2:5].team",
+])
+def test_columnar_documents_give_the_same_results(query):
+    document, arrays = json_columnar.columnarize(DOCUMENT, min_records=4)
+    assert arrays
+    compiled = json_blueprint.compile_query(query)
+    result = compiled.evaluate(document)
+    if compiled.aggregate is None:
+        result = json_columnar.materialize(result)
+    assert result == compiled.evaluate(DOCUMENT)
+
+
+def test_query_json_value_formats_results(write_json):
+    full_path = write_json("query/units.json", DOCUMENT)
+    assert json_blueprint.query_json_value(full_path, "count(units[?team==red])") == ("6", None)
+    assert json_blueprint.query_json_value(full_path, "meta.tags[0]") == ('[\n  "a"\n]', None)
+    value, error = json_blueprint.query_json_value(full_path, "units[")
+    assert value is None and error.startswith("Invalid query 'units[':")
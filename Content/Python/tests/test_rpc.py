@@ -0,0 +1,190 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+import websockets
+
+import game_thread
+import metrics
+import websocket_server
+
+
+class _FakeWebSocket:
+    """Just enough of a websockets connection for the RPC handlers"""
+    remote_address = ("test", 1)
+    subprotocol = None
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+@pytest.fixture
+def unused_port():
+    with socket.socket() as listener:
+        listener.bind(("localhost", 0))
+        return listener.getsockname()[1]
+
+
+@pytest.fixture
+def server():
+    server = websocket_server.WebSocketServer(log_messages=False)
+    server.register_rpc_method("add", lambda a, b: a + b)
+    return server
+
+
+def _call(server, request):
+    return asyncio.run(server._call_rpc(request))
+
+
+def _handle(server, message):
+    """Run _handle_rpc for one raw message and return the decoded replies"""
+    async def run():
+        client = websocket_server._ClientState(_FakeWebSocket(), 4)
+        await client.rpc_slots.acquire()
+        await server._handle_rpc(client, message)
+        return [json.loads(sent) for sent in client.websocket.sent]
+    return asyncio.run(run())
+
+
+def test_positional_and_named_params(server):
+    assert _call(server, {"jsonrpc": "2.0", "id": 1, "method": "add", "params": [1, 2]})["result"] == 3
+    assert _call(server, {"jsonrpc": "2.0", "id": 2, "method": "add", "params": {"a": 1, "b": 2}})["result"] == 3
+
+
+@pytest.mark.parametrize("params", ["ab", 12, None, True])
+def test_params_must_be_array_or_object(server, params):
+    response = _call(server, {"jsonrpc": "2.0", "id": 1, "method": "add", "params": params})
+    assert response["id"] == 1
+    assert response["error"]["code"] == websocket_server.RPC_INVALID_PARAMS
+
+
+def test_notifications_get_no_reply(server):
+    assert _call(server, {"jsonrpc": "2.0", "method": "add", "params": [1, 2]}) is None
+
+
+@pytest.mark.parametrize("request_, code", [
+    ({"jsonrpc": "2.0", "id": 1, "method": "missing"}, websocket_server.RPC_METHOD_NOT_FOUND),
+    ({"jsonrpc": "2.0", "id": 1, "method": "add", "params": [1]}, websocket_server.RPC_INVALID_PARAMS),
+    ({"jsonrpc": "2.0", "id": 1, "method": "fail"}, websocket_server.RPC_INTERNAL_ERROR),
+    ({"jsonrpc": "2.0", "id": 1}, websocket_server.RPC_INVALID_REQUEST),
+    (["not", "an", "object"], websocket_server.RPC_INVALID_REQUEST),
+])
+def test_error_codes(server, request_, code):
+    server.register_rpc_method("fail", lambda: 1 / 0)
+    assert _call(server, request_)["error"]["code"] == code
+
+
+def test_unknown_methods_share_one_histogram(server, monkeypatch):
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    metrics.registry.reset()
+    for name in ("missing", "also.missing", "add"):
+        _call(server, {"jsonrpc": "2.0", "id": 1, "method": name, "params": [1, 2]})
+    histograms = metrics.registry.snapshot()["operations"]
+    assert {name for name in histograms if name.startswith("rpc.")} == {websocket_server.RPC_UNKNOWN_METRIC, "rpc.add"}
+    assert histograms[websocket_server.RPC_UNKNOWN_METRIC]["count"] == 2
+    metrics.registry.reset()
+
+
+def test_json_methods_read_project_files(server, write_json):
+    write_json("rpc/data.json", {"a": {"b": [1, 2]}})
+    request = {"jsonrpc": "2.0", "id": 1, "method": "json.get_value", "params": ["rpc/data.json", "a.b.1"]}
+    assert _call(server, request)["result"] == "2"
+    request["params"] = ["rpc/data.json", "a.c"]
+    assert _call(server, request)["error"]["code"] == websocket_server.RPC_PATH_NOT_FOUND
+    request["params"] = ["rpc/missing.json", "a"]
+    assert _call(server, request)["error"]["code"] == websocket_server.RPC_FILE_NOT_FOUND
+    request = {"jsonrpc": "2.0", "id": 2, "method": "json.query", "params": ["rpc/data.json", "sum(a.b[*])"]}
+    assert _call(server, request)["result"] == 3
+
+
+def test_game_thread_methods_are_coalesced(server):
+    calls = []
+
+    def snapshot(name):
+        calls.append(name)
+        return name
+
+    server.register_rpc_method("snapshot", snapshot, game_thread_only=True, coalesce=True)
+
+    async def run():
+        requests = [{"jsonrpc": "2.0", "id": i, "method": "snapshot", "params": ["x"]} for i in range(3)]
+        tasks = [asyncio.ensure_future(server._call_rpc(request)) for request in requests]
+        while not all(task.done() for task in tasks):
+            await asyncio.sleep(0.001)
+            # Este hilo hace de hilo del juego
+            game_thread.dispatcher.drain()
+        return [task.result() for task in tasks]
+
+    responses = asyncio.run(run())
+    assert [response["result"] for response in responses] == ["x", "x", "x"]
+    assert calls == ["x"]
+
+
+def test_empty_batch_is_an_invalid_request(server):
+    replies = _handle(server, "[]")
+    assert len(replies) == 1
+    assert replies[0]["id"] is None
+    assert replies[0]["error"]["code"] == websocket_server.RPC_INVALID_REQUEST
+
+
+def test_batch_replies_skip_notifications(server):
+    replies = _handle(server, json.dumps([
+        {"jsonrpc": "2.0", "id": 1, "method": "add", "params": [1, 2]},
+        {"jsonrpc": "2.0", "method": "add", "params": [3, 4]},
+        {"jsonrpc": "2.0", "id": 2, "method": "missing"},
+    ]))
+    assert len(replies) == 1
+    assert [item["id"] for item in replies[0]] == [1, 2]
+    assert replies[0][0]["result"] == 3
+    assert replies[0][1]["error"]["code"] == websocket_server.RPC_METHOD_NOT_FOUND
+
+
+def test_shutdown_acknowledges_queued_messages_before_closing(unused_port):
+    from websockets.sync.client import connect
+
+    server = websocket_server.WebSocketServer(port=unused_port, batch_interval=0.3, log_messages=False)
+    server.start_in_thread(wait=True)
+    try:
+        with connect(f"ws://localhost:{unused_port}") as client:
+            client.send("hello")
+            # El mensaje sigue en la cola del lote cuando se pide detener el servidor
+            stopper = threading.Thread(target=server.stop)
+            stopper.start()
+            assert client.recv(timeout=5) == "Mensaje recibido: hello"
+            stopper.join()
+            with pytest.raises(websockets.ConnectionClosed) as closed:
+                client.recv(timeout=5)
+            assert closed.value.rcvd.code == 1001
+    finally:
+        server.stop()
+
+
+class _StalledWebSocket(_FakeWebSocket):
+    """A client whose network buffer never drains"""
+
+    async def send(self, message):
+        await asyncio.Event().wait()
+
+
+@pytest.mark.parametrize("ack_mode, expected", [
+    (websocket_server.ACK_ECHO, ["Mensaje recibido: a", "Mensaje recibido: b"]),
+    (websocket_server.ACK_SEQ, ["ack:2"]),
+])
+def test_a_stalled_client_does_not_hold_back_acks(server, monkeypatch, ack_mode, expected):
+    monkeypatch.setattr(websocket_server, "ACK_SEND_TIMEOUT", 0.05)
+    server.ack_mode = ack_mode
+
+    async def run():
+        stalled = websocket_server._ClientState(_StalledWebSocket(), 4)
+        fast = websocket_server._ClientState(_FakeWebSocket(), 4)
+        batch = [(stalled, 1, "a", 0.0), (fast, 1, "a", 0.0), (fast, 2, "b", 0.0)]
+        await asyncio.wait_for(server._flush_batch(batch), 5)
+        return fast.websocket.sent
+
+    assert asyncio.run(run()) == expected
+    assert server.get_stats()["ack_timeouts"] == 1
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import json_scanner
+
+
+DOCUMENT = {
+    "name": "café \"quoted\" \\ \n",
+    "numbers": [0, -1, 2.5, 1e20, -3.25e-7, True, False, None],
+    "nested": {"empty_object": {}, "empty_array": [], "deep": [[{"x": [1]}]]},
+    "emoji": "\U0001f600",
+}
+BUFFER = json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8")
+
+
+def _flatten(value, path=()):
+    """Reference (path, value) pairs for scalars and empty containers"""
+    if isinstance(value, dict) and value:
+        for key, item in value.items():
+            yield from _flatten(item, path + (key,))
+    elif isinstance(value, list) and value:
+        for position, item in enumerate(value):
+            yield from _flatten(item, path + (position,))
+    else:
+        yield path, value
+
+
+def test_iter_values_matches_the_parsed_document():
+    assert list(json_scanner.iter_values(BUFFER)) == list(_flatten(DOCUMENT))
+
+
+def test_event_spans_cover_each_value():
+    for kind, path, start, end, value in json_scanner.iter_events(BUFFER):
+        if kind == json_scanner.END:
+            expected = DOCUMENT
+            for key in path:
+                expected = expected[key]
+            assert json.loads(BUFFER[start:end]) == expected
+
+
+@pytest.mark.parametrize("segments, expected", [
+    ((("nested", None), ("deep", None), ("0", 0), ("0", 0), ("x", None)), [1]),
+    ((("numbers", None), ("3", 3)), 1e20),
+    ((("name", None),), DOCUMENT["name"]),
+])
+def test_find_path(segments, expected):
+    start, end, error = json_scanner.find_path(BUFFER, segments)
+    assert error is None
+    assert json.loads(BUFFER[start:end]) == expected
+
+
+def test_find_path_errors():
+    assert json_scanner.find_path(BUFFER, (("missing", None),))[2] == "Key 'missing' not found in JSON data"
+    assert json_scanner.find_path(BUFFER, (("numbers", None), ("8", 8)))[2] == "Index 8 out of range for array"
+
+
+def test_find_path_takes_the_last_duplicate_key():
+    buffer = b'{"a": 1, "b": {"a": 5}, "a": [2, 3]}'
+    start, end, error = json_scanner.find_path(buffer, (("a", None),))
+    assert json.loads(buffer[start:end]) == json.loads(buffer)["a"]
+
+
+def test_skip_value():
+    start = BUFFER.index(b'"nested"') + len(b'"nested": ')
+    end = json_scanner.skip_value(BUFFER, start)
+    assert json.loads(BUFFER[start:end]) == DOCUMENT["nested"]
+
+
+def test_dump_chunks_match_json_dumps():
+    expected = json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+    assert "".join(json_scanner.iter_dump_chunks(BUFFER, indent=2)) == expected
+
+
+@pytest.mark.parametrize("text", [b'{"a" 1}', b'[1 2]', b'{"a": tru}', b'["open'])
+def test_invalid_json_raises(text):
+    with pytest.raises(json_scanner.JsonScanError):
+        list(json_scanner.iter_events(text))
@@ -0,0 +1,65 @@
+import importlib
+import os
+import subprocess
+import sys
+
+import pytest
+
+import metrics
+import unreal
+
+
+# Modulos con Blueprint Function Libraries: al importarlos el stub valida cada ufunction
+@pytest.mark.parametrize("module_name", [
+    "json_blueprint", "json_async", "json_watch", "capture_scheduler", "metrics",
+])
+def test_blueprint_libraries_register(module_name):
+    importlib.import_module(module_name)
+
+
+def test_startup_modules_do_not_import_numpy_or_sqlite():
+    # Interprete nuevo: en este proceso otros tests ya importaron esos modulos
+    code = (
+        "import sys, tempfile, unreal_stub\n"
+        "unreal_stub.install(tempfile.mkdtemp(), echo=False)\n"
+        "import metrics, json_blueprint, json_async, json_watch, capture_scheduler\n"
+        "print(sorted(name for name in ('numpy', 'json_columnar', 'sqlite3') if name in sys.modules))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, timeout=60,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_ufunction_rejects_wrapped_functions():
+    with pytest.raises(TypeError):
+        @unreal.ufunction(static=True, params=[str], ret=str)
+        @metrics.instrument("test.wrapped")
+        def wrapped(file_path: str) -> str:
+            return file_path
+
+
+def test_ufunction_checks_the_parameter_count():
+    with pytest.raises(TypeError):
+        @unreal.ufunction(static=True, params=[str, str], ret=str)
+        def one_argument(file_path: str) -> str:
+            return file_path
+
+    @unreal.ufunction(params=[int])
+    def method(self, value: int) -> None:
+        pass
+
+
+def test_timed_records_only_while_enabled(monkeypatch):
+    monkeypatch.setattr(metrics.registry, "enabled", False)
+    with metrics.timed("test.timed_disabled"):
+        pass
+    assert "test.timed_disabled" not in metrics.registry.snapshot()["operations"]
+
+    monkeypatch.setattr(metrics.registry, "enabled", True)
+    with pytest.raises(ValueError):
+        with metrics.timed("test.timed"):
+            raise ValueError("boom")
+    operation = metrics.registry.snapshot()["operations"]["test.timed"]
+    assert (operation["count"], operation["errors"]) == (1, 1)
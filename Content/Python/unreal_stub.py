@@ -0,0 +1,140 @@
+"""
+
+    Minimal stand-in for the unreal module
+
+    Lets the project's Python modules (json_blueprint, websocket_server...)
+    be imported and exercised outside the editor, e.g. by the headless
+    benchmarks. install() does nothing if the real module is available.
+
+"""
+
+import inspect
+import os
+import sys
+import types
+
+
+class _LogCounter:
+    """Counts log calls and optionally echoes them to stdout"""
+
+    def __init__(self):
+        self.echo = False
+        self.counts = {"log": 0, "warning": 0, "error": 0}
+        self.bytes = 0
+
+    def make(self, level: str):
+        def log(message):
+            message = str(message)
+            self.counts[level] += 1
+            self.bytes += len(message)
+            if self.echo or level == "error" and self.echo is None:
+                print(f"[{level}] {message}")
+        return log
+
+
+def _passthrough_decorator(*args, **kwargs):
+    return lambda target: target
+
+
+def _ufunction(*args, **kwargs):
+    def decorator(function):
+        if not kwargs.get("override"):
+            # Como el editor: los argumentos se cuentan con getfullargspec (no sigue __wrapped__)
+            spec = inspect.getfullargspec(function)
+            arguments = spec.args if kwargs.get("static") else spec.args[1:]
+            params = kwargs.get("params", [])
+            if spec.varargs or spec.varkw or len(arguments) != len(params):
+                raise TypeError(
+                    f"ufunction {function.__qualname__} takes {arguments} but params declares {len(params)} types"
+                )
+        return staticmethod(function) if kwargs.get("static") else function
+    return decorator
+
+
+def _build_module(project_dir: str) -> types.ModuleType:
+    module = types.ModuleType("unreal")
+    module.__doc__ = "Headless stub of the unreal module (see unreal_stub.py)"
+    module.IS_STUB = True
+
+    counter = _LogCounter()
+    module.log_counter = counter
+    module.log = counter.make("log")
+    module.log_warning = counter.make("warning")
+    module.log_error = counter.make("error")
+
+    module.uclass = _passthrough_decorator
+    module.ustruct = _passthrough_decorator
+    module.uenum = _passthrough_decorator
+    module.ufunction = _ufunction
+    module.uproperty = lambda *args, **kwargs: None
+    module.Array = lambda element_type: list
+    module.Map = lambda key_type, value_type: dict
+
+    class Object:
+        def call_method(self, name, args=(), kwargs=None):
+            return getattr(self, name)(*args, **(kwargs or {}))
+
+    class BlueprintFunctionLibrary(Object):
+        pass
+
+    class Paths:
+        @staticmethod
+        def project_dir():
+            return module.project_dir
+
+    module.Object = Object
+    module.BlueprintFunctionLibrary = BlueprintFunctionLibrary
+    module.Paths = Paths
+    module.project_dir = os.path.join(os.path.abspath(project_dir), "")
+
+    # Callbacks de tick: el codigo de prueba los dispara con tick()
+    tick_callbacks = {}
+
+    def register_slate_post_tick_callback(callback):
+        handle = object()
+        tick_callbacks[handle] = callback
+        return handle
+
+    def unregister_slate_post_tick_callback(handle):
+        tick_callbacks.pop(handle, None)
+
+    def tick(delta_time: float = 1.0 / 60.0):
+        for callback in list(tick_callbacks.values()):
+            callback(delta_time)
+
+    module.register_slate_post_tick_callback = register_slate_post_tick_callback
+    module.unregister_slate_post_tick_callback = unregister_slate_post_tick_callback
+    module.register_slate_pre_tick_callback = register_slate_post_tick_callback
+    module.unregister_slate_pre_tick_callback = unregister_slate_post_tick_callback
+    module.tick = tick
+    return module
+
+
+def install(project_dir: str = None, echo: bool = None):
+    """
+    Register the stub as the 'unreal' module unless the real one is importable
+
+    Args:
+        project_dir: Directory returned by unreal.Paths.project_dir() (default: cwd)
+        echo: True to print every log call, None to print errors only, False for silence
+
+    Returns:
+        module: The unreal module in use (real or stub)
+    """
+    existing = sys.modules.get("unreal")
+    if existing is None:
+        try:
+            import unreal as existing
+        except ImportError:
+            existing = None
+
+    if existing is not None and not getattr(existing, "IS_STUB", False):
+        return existing
+
+    if existing is None:
+        existing = _build_module(project_dir or os.getcwd())
+        sys.modules["unreal"] = existing
+    elif project_dir:
+        existing.project_dir = os.path.join(os.path.abspath(project_dir), "")
+    existing.log_counter.echo = echo
+    return existing
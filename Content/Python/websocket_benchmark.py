@@ -0,0 +1,305 @@
+"""
+
+    Headless benchmark for websocket_server message encodings
+
+    Compares, per payload size, the bytes on the wire and the encode/decode
+    time of each encoding (JSON text, MessagePack when installed) with
+    permessage-deflate off and at several compression levels. Frames go
+    through the same deflate extension the server negotiates, so the sizes
+    are exactly what a client would receive.
+
+    --fanout starts a server with the unreal stub and measures publish ->
+    receive latency at 1/10/100 subscribers, with and without a subscriber
+    that stopped reading. Writes a JSON report.
+
+    Usage:
+        python websocket_benchmark.py --output websocket_report.json
+        python websocket_benchmark.py --quick --level 1 --level 6
+        python websocket_benchmark.py --fanout --subscribers 1 --subscribers 100
+
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import sys
+import tempfile
+import time
+
+import websockets
+from websockets.frames import Frame, Opcode
+
+import unreal_stub
+import websocket_codec
+from json_benchmark import make_document
+
+# Cargas: respuestas JSON-RPC de tamano creciente
+PAYLOADS = (
+    {"name": "ping", "depth": 0, "fanout": 0, "records": 0},
+    {"name": "small", "depth": 2, "fanout": 4, "records": 20},
+    {"name": "medium", "depth": 3, "fanout": 6, "records": 2000},
+    {"name": "large", "depth": 4, "fanout": 8, "records": 50000},
+)
+QUICK_PAYLOADS = ("ping", "small", "medium")
+
+# None = sin permessage-deflate
+DEFLATE_LEVELS = (None, 1, 6, 9)
+
+# Fan-out: suscriptores por escenario, mensajes publicados y separacion entre ellos
+FANOUT_SUBSCRIBERS = (1, 10, 100)
+FANOUT_MESSAGES = 200
+FANOUT_INTERVAL = 0.002
+FANOUT_PAYLOAD_BYTES = 1024  # relleno de cada mensaje publicado
+FANOUT_TOPIC = "benchmark.fanout"
+
+MIN_SECONDS = 0.3
+MAX_ITERATIONS = 2000
+
+REPORT_VERSION = 1
+
+
+def make_message(payload: dict) -> dict:
+    """JSON-RPC response carrying the generated document (or "pong")"""
+    if not payload["depth"] and not payload["records"]:
+        return {"jsonrpc": "2.0", "id": 1, "result": "pong"}
+    return {"jsonrpc": "2.0", "id": 1, "result": make_document(payload["depth"], payload["fanout"], payload["records"])}
+
+
+def _time_operation(operation, min_seconds: float) -> float:
+    """Mean seconds per call of operation"""
+    operation()  # calentamiento
+    iterations = 0
+    started = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_seconds and iterations < MAX_ITERATIONS:
+        operation()
+        iterations += 1
+        elapsed = time.perf_counter() - started
+    return elapsed / iterations
+
+
+def measure(message: dict, encoding: str, level, threshold: int, min_seconds: float) -> dict:
+    """
+    Encode, compress, decompress and decode one message repeatedly
+
+    Args:
+        message: JSON-RPC message to send
+        encoding: websocket_codec.ENCODING_JSON or ENCODING_MSGPACK
+        level: Deflate level, None for no compression
+        threshold: Messages shorter than this are sent uncompressed
+        min_seconds: Minimum measuring time per step
+
+    Returns:
+        dict: Sizes in bytes and seconds per message for each step
+    """
+    data = websocket_codec.encode_message(encoding, message)
+    opcode = Opcode.TEXT if isinstance(data, str) else Opcode.BINARY
+    payload = data.encode("utf-8") if isinstance(data, str) else data
+
+    entry = {
+        "raw_bytes": len(payload),
+        "encode_seconds": _time_operation(lambda: websocket_codec.encode_message(encoding, message), min_seconds),
+        "decode_seconds": _time_operation(lambda: websocket_codec.decode_message(data), min_seconds),
+    }
+
+    if level is None:
+        entry.update(wire_bytes=len(payload), compress_seconds=0.0, decompress_seconds=0.0)
+    else:
+        # Una pareja de extensiones por medida, como los dos extremos de una conexion
+        server = websocket_codec.make_deflate_extension(level=level, threshold=threshold)
+        client = websocket_codec.make_deflate_extension(level=level, threshold=threshold)
+        frames = []
+        entry["compress_seconds"] = _time_operation(lambda: frames.append(server.encode(Frame(opcode, payload))),
+                                                    min_seconds)
+        # Tamano del primer frame: los siguientes repiten el mismo mensaje y el
+        # contexto compartido (context takeover) los reduciria de forma irreal
+        entry["wire_bytes"] = len(frames[0].data)
+
+        # Se descomprimen los mismos frames en orden, como haria el cliente
+        started = time.perf_counter()
+        for frame in frames:
+            client.decode(frame)
+        entry["decompress_seconds"] = (time.perf_counter() - started) / len(frames)
+    entry["ratio"] = entry["wire_bytes"] / entry["raw_bytes"] if entry["raw_bytes"] else 1.0
+    entry["total_seconds"] = sum(entry[key] for key in
+                                 ("encode_seconds", "decode_seconds", "compress_seconds", "decompress_seconds"))
+    return entry
+
+
+def run_benchmarks(payload_names=None, levels=DEFLATE_LEVELS, threshold: int = websocket_codec.DEFLATE_THRESHOLD,
+                   min_seconds: float = MIN_SECONDS) -> dict:
+    """
+    Run every payload/encoding/level combination and return the report
+
+    Args:
+        payload_names: Names from PAYLOADS to run, None for all
+        levels: Deflate levels to try (None = uncompressed)
+        threshold: Compression threshold in bytes
+        min_seconds: Minimum measuring time per step
+
+    Returns:
+        dict: Report with one entry per "payload/encoding/deflate-level"
+    """
+    results = {}
+    for payload in PAYLOADS:
+        if payload_names and payload["name"] not in payload_names:
+            continue
+        message = make_message(payload)
+        for encoding in reversed(websocket_codec.available_encodings()):
+            for level in levels:
+                entry = measure(message, encoding, level, threshold, min_seconds)
+                key = f"{payload['name']}/{encoding}/{'none' if level is None else f'deflate{level}'}"
+                results[key] = entry
+                print(f"{key:<28} {entry['raw_bytes']:>11} B -> {entry['wire_bytes']:>11} B"
+                      f" ({entry['ratio']:>6.1%}) {entry['total_seconds'] * 1000:>10.3f} ms/msg")
+
+    return {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "encodings": websocket_codec.available_encodings(),
+        "threshold": threshold,
+        "results": results,
+    }
+
+
+def _percentiles(samples: list) -> dict:
+    samples = sorted(samples)
+
+    def percentile(fraction):
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000.0
+
+    return {"p50_ms": percentile(0.50), "p95_ms": percentile(0.95), "p99_ms": percentile(0.99),
+            "max_ms": samples[-1] * 1000.0 if samples else 0.0}
+
+
+async def _subscribe(url: str, **connect_options):
+    connection = await websockets.connect(url, compression=None, max_size=None, **connect_options)
+    await connection.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "subscribe", "params": [FANOUT_TOPIC]}))
+    await connection.recv()
+    return connection
+
+
+async def _fanout_scenario(server, subscribers: int, messages: int, interval: float, payload_bytes: int,
+                           slow: bool) -> dict:
+    url = f"ws://{server.host}:{server.port}"
+    connections = [await _subscribe(url) for _ in range(subscribers)]
+    # El cliente atascado no llama a recv: con max_queue=1 deja de leer del socket enseguida
+    stalled = await _subscribe(url, max_queue=1) if slow else None
+    padding = "x" * payload_bytes
+    delivery = []  # segundos de publish a recepcion, por mensaje y suscriptor
+    last = {}      # numero de mensaje -> ultima recepcion
+
+    async def receive(connection):
+        for _ in range(messages):
+            params = json.loads(await connection.recv())["params"]
+            received = time.perf_counter()
+            delivery.append(received - params["t"])
+            last[params["n"]] = max(last.get(params["n"], 0.0), received - params["t"])
+
+    dropped_before = server.published_dropped
+    receivers = asyncio.gather(*(receive(connection) for connection in connections))
+    started = time.perf_counter()
+    for number in range(messages):
+        server.publish(FANOUT_TOPIC, {"n": number, "t": time.perf_counter(), "padding": padding})
+        await asyncio.sleep(interval)
+    await asyncio.wait_for(receivers, timeout=60.0)
+    elapsed = time.perf_counter() - started
+
+    for connection in connections + ([stalled] if stalled is not None else []):
+        await connection.close()
+    entry = {"subscribers": subscribers, "messages": messages, "stalled_subscriber": slow,
+             "deliveries_per_sec": len(delivery) / elapsed if elapsed else 0.0,
+             "published_dropped": server.published_dropped - dropped_before}
+    entry.update({f"delivery_{key}": value for key, value in _percentiles(delivery).items()})
+    entry.update({f"fanout_{key}": value for key, value in _percentiles(list(last.values())).items()})
+    return entry
+
+
+def run_fanout_benchmarks(subscriber_counts=FANOUT_SUBSCRIBERS, messages: int = FANOUT_MESSAGES,
+                          interval: float = FANOUT_INTERVAL, payload_bytes: int = FANOUT_PAYLOAD_BYTES,
+                          work_dir: str = None) -> dict:
+    """
+    Measure publish -> receive latency through a real server
+
+    Each subscriber count runs twice: all clients reading, and with one more
+    subscriber that never reads (once the socket buffers fill, publish_policy
+    drops messages for it only). "delivery_*" percentiles are per message and subscriber,
+    "fanout_*" percentiles the time until the last subscriber got a message.
+
+    Args:
+        subscriber_counts: Number of reading subscribers per scenario
+        messages: Messages published per scenario
+        interval: Seconds between two publishes
+        payload_bytes: Padding added to every published message
+        work_dir: Project directory for the unreal stub (temporary if None)
+
+    Returns:
+        dict: Report with one entry per "fanout/<subscribers>[/stalled]"
+    """
+    unreal_stub.install(work_dir or tempfile.mkdtemp(prefix="websocket_benchmark_"), echo=False)
+    import websocket_server
+
+    with socket.socket() as probe:
+        probe.bind(("localhost", 0))
+        port = probe.getsockname()[1]
+    server = websocket_server.WebSocketServer("localhost", port, log_messages=False)
+    server.start_in_thread(wait=True)
+    results = {}
+    try:
+        for subscribers in subscriber_counts:
+            for slow in (False, True):
+                entry = asyncio.run(_fanout_scenario(server, subscribers, messages, interval, payload_bytes, slow))
+                key = f"fanout/{subscribers}" + ("/stalled" if slow else "")
+                results[key] = entry
+                print(f"{key:<20} p50 {entry['delivery_p50_ms']:>8.3f} ms  p99 {entry['delivery_p99_ms']:>8.3f} ms"
+                      f"  last p99 {entry['fanout_p99_ms']:>8.3f} ms  dropped {entry['published_dropped']}")
+    finally:
+        server.stop()
+    return {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "publish_policy": server.publish_policy,
+        "publish_buffer": server.publish_buffer,
+        "payload_bytes": payload_bytes,
+        "results": results,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark websocket_server encodings and compression")
+    parser.add_argument("--output", default="websocket_benchmark_report.json", help="Where to write the JSON report")
+    parser.add_argument("--payload", action="append", help="Payload to run (repeatable)")
+    parser.add_argument("--quick", action="store_true", help=f"Only run {', '.join(QUICK_PAYLOADS)}")
+    parser.add_argument("--level", type=int, action="append", help="Deflate level to try (repeatable)")
+    parser.add_argument("--threshold", type=int, default=websocket_codec.DEFLATE_THRESHOLD,
+                        help="Compression threshold in bytes")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS, help="Measuring time per step")
+    parser.add_argument("--fanout", action="store_true", help="Measure publish fan-out latency instead")
+    parser.add_argument("--subscribers", type=int, action="append", help="Subscriber count for --fanout (repeatable)")
+    parser.add_argument("--messages", type=int, default=FANOUT_MESSAGES, help="Messages per --fanout scenario")
+    parser.add_argument("--payload-bytes", type=int, default=FANOUT_PAYLOAD_BYTES,
+                        help="Padding of each --fanout message")
+    args = parser.parse_args(argv)
+
+    if args.fanout:
+        report = run_fanout_benchmarks(args.subscribers or FANOUT_SUBSCRIBERS, args.messages,
+                                       payload_bytes=args.payload_bytes)
+    else:
+        payloads = args.payload or (QUICK_PAYLOADS if args.quick else None)
+        levels = (None,) + tuple(args.level) if args.level else DEFLATE_LEVELS
+        report = run_benchmarks(payloads, levels, args.threshold, args.min_seconds)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
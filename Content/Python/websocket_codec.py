@@ -0,0 +1,157 @@
+"""
+
+    Message encodings and compression for websocket_server
+
+    Each connection picks its encoding through the WebSocket subprotocol:
+    "json" (text frames, the default when the client asks for none) or
+    "msgpack" (binary MessagePack frames, offered only when the optional
+    msgpack package is installed). permessage-deflate is configurable
+    (level, memory level, window bits) and skips messages below a size
+    threshold, which cost more to compress than they save.
+
+    Does not import unreal, so the benchmarks can use it headless.
+
+"""
+
+import json
+
+from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import CTRL_OPCODES, Opcode
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+# permessage-deflate por defecto (mismos valores de ventana/memoria que websockets)
+DEFLATE_LEVEL = 6
+DEFLATE_MEM_LEVEL = 5
+DEFLATE_WINDOW_BITS = 12
+DEFLATE_THRESHOLD = 1024  # bytes; los mensajes mas cortos se envian sin comprimir
+
+
+def available_encodings() -> list:
+    """Encodings this process can speak, in server preference order"""
+    return [ENCODING_MSGPACK, ENCODING_JSON] if msgpack is not None else [ENCODING_JSON]
+
+
+def select_subprotocol(first, second):
+    """
+    select_subprotocol hook for websockets.serve
+
+    Picks the first encoding the client asked for, or none (plain JSON) when
+    it asked for none. Accepts both hook signatures: (connection,
+    client_subprotocols) in websockets >= 13 and (client_subprotocols,
+    server_subprotocols) in the legacy server.
+    """
+    client_subprotocols = first if isinstance(first, (list, tuple)) else second
+    for encoding in available_encodings():
+        if encoding in client_subprotocols:
+            return encoding
+    return None
+
+
+def encode_message(encoding: str, message):
+    """
+    Serialize a JSON-RPC message for a connection
+
+    Returns:
+        str for "json", bytes for "msgpack". Values MessagePack can't hold
+        (integers over 64 bits) fall back to JSON text.
+    """
+    if encoding == ENCODING_MSGPACK:
+        try:
+            return msgpack.packb(message, use_bin_type=True)
+        except (OverflowError, TypeError, ValueError):
+            pass
+    return json.dumps(message, ensure_ascii=False)
+
+
+def decode_message(data):
+    """Parse a text (JSON) or binary (MessagePack) frame. Raises ValueError if invalid"""
+    if isinstance(data, str):
+        return json.loads(data)
+    if msgpack is None:
+        raise ValueError("Binary frames need the msgpack package")
+    try:
+        return msgpack.unpackb(data, raw=False)
+    except Exception as e:
+        raise ValueError(str(e))
+
+
+# Respuestas enviadas por fragmentos: prefijo + trozos escapados + RESPONSE_SUFFIX
+RESPONSE_SUFFIX = '"}'
+
+
+def response_prefix(request_id) -> str:
+    """
+    Start of a JSON-RPC response whose string result is sent in pieces
+
+    response_prefix(id) + escape_fragment(piece)... + RESPONSE_SUFFIX is the
+    same JSON text as {"jsonrpc": "2.0", "id": id, "result": "<pieces>"}, so a
+    large result can go out as one fragmented text message without ever
+    holding the whole string.
+    """
+    return f'{{"jsonrpc": "2.0", "id": {json.dumps(request_id)}, "result": "'
+
+
+def escape_fragment(piece: str) -> str:
+    """Escape a piece of a string result for the body of a JSON string"""
+    return json.dumps(piece, ensure_ascii=False)[1:-1]
+
+
+class ThresholdPerMessageDeflate(PerMessageDeflate):
+    """permessage-deflate that sends messages shorter than threshold uncompressed"""
+
+    threshold = DEFLATE_THRESHOLD
+    _skip_message = False
+
+    def encode(self, frame):
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+        if frame.opcode is not Opcode.CONT:
+            # Solo se deciden mensajes de un frame; los fragmentados siempre se comprimen.
+            # Un mensaje sin RSV1 no toca el contexto del compresor (RFC 7692)
+            self._skip_message = frame.fin and len(frame.data) < self.threshold
+        if self._skip_message:
+            return frame
+        return super().encode(frame)
+
+
+class ThresholdDeflateFactory(ServerPerMessageDeflateFactory):
+    """Server-side factory that negotiates permessage-deflate with a size threshold"""
+
+    def __init__(self, level: int = DEFLATE_LEVEL, threshold: int = DEFLATE_THRESHOLD,
+                 mem_level: int = DEFLATE_MEM_LEVEL, window_bits: int = DEFLATE_WINDOW_BITS):
+        super().__init__(
+            server_max_window_bits=window_bits,
+            client_max_window_bits=window_bits,
+            compress_settings={"level": level, "memLevel": mem_level},
+        )
+        self.threshold = threshold
+
+    def process_request_params(self, params, accepted_extensions):
+        response_params, extension = super().process_request_params(params, accepted_extensions)
+        extension.__class__ = ThresholdPerMessageDeflate
+        extension.threshold = self.threshold
+        return response_params, extension
+
+
+def make_deflate_extension(level: int = DEFLATE_LEVEL, threshold: int = 0,
+                           mem_level: int = DEFLATE_MEM_LEVEL, window_bits: int = DEFLATE_WINDOW_BITS):
+    """
+    Standalone compressor with the server's settings (benchmarks use it to
+    measure exactly what a message costs on the wire)
+    """
+    extension = ThresholdPerMessageDeflate(
+        remote_no_context_takeover=False,
+        local_no_context_takeover=False,
+        remote_max_window_bits=window_bits,
+        local_max_window_bits=window_bits,
+        compress_settings={"level": level, "memLevel": mem_level},
+    )
+    extension.threshold = threshold
+    return extension
@@ -0,0 +1,515 @@
+"""
+
+    Headless load generator for websocket_server
+
+    Starts the server in a child process against the unreal stub
+    (unreal_stub.py), with a simulated 60 Hz editor tick driving the game
+    thread dispatcher, and opens N concurrent asyncio clients on localhost
+    that send a configurable mix of messages at a fixed rate. Reports, per
+    scenario, throughput, p50/p95/p99 round-trip latency, server CPU and
+    memory, how late the simulated editor frames ran, and dropped/errored
+    connections as JSON. Runs fully offline.
+
+    Message kinds of the mix:
+        ping        JSON-RPC "ping"
+        get_value   JSON-RPC "json.get_value" on the sample file
+        query       JSON-RPC "json.query" on the sample file
+        game_thread JSON-RPC "capture.stats" (runs on the game thread)
+        ingest      Plain text message of --size bytes, acknowledged per batch ("ack:<n>")
+
+    Usage:
+        python websocket_loadtest.py --output load.json
+        python websocket_loadtest.py --clients 100 --rate 20 --size 512 --mix ping=1,ingest=3
+        python websocket_loadtest.py --baseline load.json --threshold 0.25
+
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import platform
+import queue
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import websockets
+
+import unreal_stub
+
+try:
+    import resource
+except ImportError:
+    # Windows: sin ru_maxrss
+    resource = None
+
+# Escenarios: clientes simultaneos, mensajes/segundo por cliente, bytes de los mensajes ingest y mezcla
+SCENARIOS = (
+    {"name": "rpc_single", "clients": 1, "rate": 100, "size": 0, "mix": {"ping": 1}},
+    {"name": "rpc_mix", "clients": 10, "rate": 50, "size": 256,
+     "mix": {"ping": 1, "get_value": 2, "query": 1, "game_thread": 1, "ingest": 2}},
+    {"name": "ingest", "clients": 50, "rate": 50, "size": 1024, "mix": {"ingest": 1}},
+    {"name": "many_clients", "clients": 200, "rate": 5, "size": 128, "mix": {"ping": 1, "ingest": 1}},
+)
+QUICK_SCENARIOS = ("rpc_single", "rpc_mix")
+
+DURATION_SECONDS = 5.0
+QUICK_DURATION_SECONDS = 2.0
+GRACE_SECONDS = 5.0      # espera maxima a las respuestas pendientes al acabar de enviar
+CONNECT_TIMEOUT = 10.0
+FRAME_SECONDS = 1.0 / 60.0  # tick simulado del editor en el proceso del servidor
+
+SAMPLE_FILE = "sample_data.json"
+MESSAGE_KINDS = {
+    "ping": ("ping", []),
+    "get_value": ("json.get_value", [SAMPLE_FILE, "player_data.level"]),
+    "query": ("json.query", [SAMPLE_FILE, "player_data.inventory.*.item"]),
+    "game_thread": ("capture.stats", []),
+}
+INGEST = "ingest"
+
+REPORT_VERSION = 1
+
+
+def _percentiles(samples, prefix: str) -> dict:
+    samples = sorted(samples)
+
+    def percentile(fraction):
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))] * 1000.0
+
+    return {f"{prefix}_p50_ms": percentile(0.50), f"{prefix}_p95_ms": percentile(0.95),
+            f"{prefix}_p99_ms": percentile(0.99), f"{prefix}_max_ms": samples[-1] * 1000.0 if samples else 0.0}
+
+
+def _cpu_seconds() -> float:
+    times = os.times()
+    return times.user + times.system
+
+
+def _rss_bytes():
+    """Current resident set size (Linux), or None"""
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB, macOS en bytes
+    peak = peak if sys.platform == "darwin" else peak * 1024
+    return max(peak, _rss_bytes() or 0)
+
+
+# -- Proceso del servidor ------------------------------------------------
+
+
+def serve(port: int) -> int:
+    """
+    Child process: run the server on port and tick the stub like the editor would
+
+    Reads commands from stdin ("stats" prints a JSON snapshot, "quit" stops)
+    and answers on stdout; everything the server prints goes to stderr.
+    """
+    protocol = sys.stdout
+    sys.stdout = sys.stderr
+
+    unreal = unreal_stub.install(tempfile.mkdtemp(prefix="websocket_loadtest_"), echo=False)
+    import json_blueprint
+    import websocket_server
+
+    json_blueprint.create_sample_json_file(SAMPLE_FILE)
+    server = websocket_server.WebSocketServer("localhost", port, ack_mode=websocket_server.ACK_SEQ,
+                                              log_messages=False)
+    server.start_in_thread(wait=True)
+    if server.start_error is not None or not server.running:
+        protocol.write(json.dumps({"error": str(server.start_error)}) + "\n")
+        protocol.flush()
+        return 1
+    protocol.write(json.dumps({"ready": True}) + "\n")
+    protocol.flush()
+
+    commands = queue.Queue()
+
+    def read_commands():
+        for line in sys.stdin:
+            commands.put(line.strip())
+        commands.put("quit")
+
+    threading.Thread(target=read_commands, name="LoadTestCommands", daemon=True).start()
+
+    # Retraso de cada frame respecto a su hora: mide cuanto le quita el servidor al hilo del juego
+    frame_delays = []
+    tick_seconds = []
+    next_frame = time.perf_counter()
+    while True:
+        try:
+            command = commands.get_nowait()
+        except queue.Empty:
+            command = None
+        if command == "quit":
+            break
+        if command == "stats":
+            snapshot = {"cpu_seconds": _cpu_seconds(), "rss_bytes": _rss_bytes(), "peak_rss_bytes": _peak_rss_bytes(),
+                        "frames": len(frame_delays), "stats": server.get_stats()}
+            snapshot.update(_percentiles(frame_delays, "frame_delay"))
+            snapshot.update(_percentiles(tick_seconds, "tick"))
+            frame_delays.clear()
+            tick_seconds.clear()
+            protocol.write(json.dumps(snapshot) + "\n")
+            protocol.flush()
+
+        started = time.perf_counter()
+        frame_delays.append(max(0.0, started - next_frame))
+        unreal.tick(FRAME_SECONDS)
+        tick_seconds.append(time.perf_counter() - started)
+        next_frame += FRAME_SECONDS
+        delay = next_frame - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        elif delay < -FRAME_SECONDS:
+            # Frame perdido: como el editor, no se intenta recuperar
+            next_frame = time.perf_counter()
+
+    server.stop()
+    return 0
+
+
+class ServerProcess:
+    """The server child process, driven through its stdin/stdout"""
+
+    def __init__(self, port: int, log_path: str = None):
+        self.port = port
+        self._log = open(log_path, "w") if log_path else subprocess.DEVNULL
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", str(port)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=self._log,
+            cwd=os.path.dirname(os.path.abspath(__file__)), text=True,
+        )
+        reply = self._read()
+        if not reply.get("ready"):
+            self.close()
+            raise RuntimeError(f"Server did not start: {reply.get('error')}")
+
+    def _read(self) -> dict:
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Server process exited with code {self.process.poll()}")
+        return json.loads(line)
+
+    def snapshot(self) -> dict:
+        self.process.stdin.write("stats\n")
+        self.process.stdin.flush()
+        return self._read()
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.write("quit\n")
+                self.process.stdin.flush()
+                self.process.wait(10.0)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+        if self._log is not subprocess.DEVNULL:
+            self._log.close()
+
+
+# -- Clientes ------------------------------------------------------------
+
+
+class _Tally:
+    """Counters shared by every client of a scenario (all on one event loop)"""
+
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.connect_errors = 0
+        self.disconnects = 0
+        self.latencies = []
+        self.latencies_by_kind = collections.defaultdict(list)
+        self.by_kind = collections.Counter()
+
+    def add_latency(self, kind: str, seconds: float) -> None:
+        self.latencies.append(seconds)
+        self.latencies_by_kind[kind].append(seconds)
+
+
+async def _run_client(url: str, scenario: dict, deadline: float, tally: _Tally, rng: random.Random) -> None:
+    try:
+        connection = await asyncio.wait_for(websockets.connect(url, max_size=None), CONNECT_TIMEOUT)
+    except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException):
+        tally.connect_errors += 1
+        return
+
+    kinds = list(scenario["mix"])
+    weights = [scenario["mix"][kind] for kind in kinds]
+    payload = "x" * scenario["size"]
+    pending = {}                    # id JSON-RPC -> (tipo, instante de envio)
+    ingested = collections.deque()  # (secuencia, instante de envio) hasta su "ack:<n>"
+    closing = False
+
+    async def receive():
+        try:
+            async for message in connection:
+                now = time.perf_counter()
+                if isinstance(message, str) and message.startswith("ack:"):
+                    sequence = int(message[4:])
+                    while ingested and ingested[0][0] <= sequence:
+                        tally.add_latency(INGEST, now - ingested.popleft()[1])
+                        tally.received += 1
+                    continue
+                response = json.loads(message)
+                request = pending.pop(response.get("id"), None)
+                if request is None:
+                    continue
+                if "error" in response:
+                    tally.errors += 1
+                else:
+                    tally.received += 1
+                    tally.add_latency(request[0], now - request[1])
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        if not closing:
+            tally.disconnects += 1
+
+    receiver = asyncio.ensure_future(receive())
+    interval = 1.0 / scenario["rate"]
+    # Los clientes no arrancan a la vez: se reparten dentro del primer intervalo
+    next_send = time.perf_counter() + rng.random() * interval
+    sequence = 0
+    request_id = 0
+    try:
+        while next_send < deadline and not receiver.done():
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            kind = rng.choices(kinds, weights)[0]
+            if kind == INGEST:
+                sequence += 1
+                ingested.append((sequence, time.perf_counter()))
+                await connection.send(payload)
+            else:
+                method, params = MESSAGE_KINDS[kind]
+                request_id += 1
+                pending[request_id] = (kind, time.perf_counter())
+                await connection.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method,
+                                                  "params": params}))
+            tally.sent += 1
+            tally.by_kind[kind] += 1
+            next_send += interval
+
+        grace_deadline = time.perf_counter() + GRACE_SECONDS
+        while (pending or ingested) and not receiver.done() and time.perf_counter() < grace_deadline:
+            await asyncio.sleep(0.01)
+        closing = True
+        await connection.close()
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        closing = True
+        receiver.cancel()
+        tally.timeouts += len(pending) + len(ingested)
+
+
+async def _run_clients(url: str, scenario: dict, duration: float, seed: int) -> tuple:
+    tally = _Tally()
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(
+        _run_client(url, scenario, deadline, tally, random.Random(seed + index))
+        for index in range(scenario["clients"])
+    ))
+    return tally, time.perf_counter() - started
+
+
+def run_scenario(server: ServerProcess, scenario: dict, duration: float, seed: int = 0) -> dict:
+    """
+    Run one scenario against the server process
+
+    Args:
+        server: Running ServerProcess
+        scenario: clients, rate (messages/sec per client), size (bytes of ingest messages) and mix (kind -> weight)
+        duration: Seconds of sending
+        seed: Seed of the message mix
+
+    Returns:
+        dict: Client-side results plus the server's CPU, memory and frame delays for the scenario
+    """
+    before = server.snapshot()
+    client_cpu = _cpu_seconds()
+    tally, elapsed = asyncio.run(_run_clients(f"ws://localhost:{server.port}", scenario, duration, seed))
+    client_cpu = _cpu_seconds() - client_cpu
+    after = server.snapshot()
+
+    entry = {
+        "clients": scenario["clients"],
+        "rate": scenario["rate"],
+        "size": scenario["size"],
+        "mix": scenario["mix"],
+        "duration": elapsed,
+        "sent": tally.sent,
+        "sent_by_kind": dict(tally.by_kind),
+        "received": tally.received,
+        "throughput": tally.received / elapsed if elapsed else 0.0,
+        "offered_rate": scenario["clients"] * scenario["rate"],
+        "errors": tally.errors,
+        "timeouts": tally.timeouts,
+        "connect_errors": tally.connect_errors,
+        "disconnects": tally.disconnects,
+        "client_cpu_percent": 100.0 * client_cpu / elapsed if elapsed else 0.0,
+    }
+    entry.update(_percentiles(tally.latencies, "latency"))
+    # Los ingest incluyen la espera del lote (batch_interval) antes del "ack:<n>"
+    entry["latency_by_kind"] = {kind: _percentiles(samples, "latency")
+                                for kind, samples in sorted(tally.latencies_by_kind.items())}
+    server_stats = {key: after["stats"][key] - before["stats"].get(key, 0)
+                    for key in ("received", "processed", "batches", "backpressure_waits", "rpc_requests", "rpc_errors")}
+    entry["server"] = {
+        "cpu_percent": 100.0 * (after["cpu_seconds"] - before["cpu_seconds"]) / elapsed if elapsed else 0.0,
+        "rss_bytes": after["rss_bytes"],
+        "peak_rss_bytes": after["peak_rss_bytes"],
+        "frames": after["frames"],
+        "stats": server_stats,
+    }
+    entry["server"].update({key: value for key, value in after.items()
+                            if key.startswith("frame_delay_") or key.startswith("tick_")})
+    return entry
+
+
+def run_load_tests(scenarios, duration: float = DURATION_SECONDS, seed: int = 0, server_log: str = None) -> dict:
+    """
+    Start the server process, run every scenario and return the report
+
+    Args:
+        scenarios: Scenario dicts (see SCENARIOS)
+        duration: Seconds of sending per scenario
+        seed: Seed of the message mix
+        server_log: File for the server's output (discarded if None)
+
+    Returns:
+        dict: Report with one entry per scenario name
+    """
+    with socket.socket() as probe:
+        probe.bind(("localhost", 0))
+        port = probe.getsockname()[1]
+
+    server = ServerProcess(port, server_log)
+    results = {}
+    try:
+        for scenario in scenarios:
+            entry = run_scenario(server, scenario, duration, seed)
+            results[scenario["name"]] = entry
+            print(f"{scenario['name']:<14} {entry['throughput']:>9.1f} msg/s  p50 {entry['latency_p50_ms']:>8.2f} ms"
+                  f"  p99 {entry['latency_p99_ms']:>8.2f} ms  server {entry['server']['cpu_percent']:>5.1f}% CPU"
+                  f"  frame p99 {entry['server']['frame_delay_p99_ms']:>6.2f} ms"
+                  f"  err {entry['errors'] + entry['timeouts'] + entry['connect_errors'] + entry['disconnects']}")
+    finally:
+        server.close()
+
+    return {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "websockets": websockets.__version__,
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare_reports(report: dict, baseline: dict, threshold: float) -> list:
+    """
+    List the scenarios whose throughput dropped or p99 latency grew more than threshold
+
+    Returns:
+        list[str]: One message per regression
+    """
+    regressions = []
+    for name, previous in baseline.get("results", {}).items():
+        current = report["results"].get(name)
+        if current is None:
+            continue
+        if previous.get("throughput") and current["throughput"] < previous["throughput"] * (1.0 - threshold):
+            regressions.append(f"{name}: {current['throughput']:.1f} msg/s vs baseline {previous['throughput']:.1f}")
+        if previous.get("latency_p99_ms") and current["latency_p99_ms"] > previous["latency_p99_ms"] * (1.0 + threshold):
+            regressions.append(f"{name}: p99 {current['latency_p99_ms']:.2f} ms"
+                               f" vs baseline {previous['latency_p99_ms']:.2f} ms")
+        failures = current["errors"] + current["timeouts"] + current["connect_errors"] + current["disconnects"]
+        previous_failures = (previous.get("errors", 0) + previous.get("timeouts", 0)
+                             + previous.get("connect_errors", 0) + previous.get("disconnects", 0))
+        if failures > previous_failures:
+            regressions.append(f"{name}: {failures} failed messages/connections vs baseline {previous_failures}")
+    return regressions
+
+
+def parse_mix(text: str) -> dict:
+    """"ping=1,ingest=3" -> {"ping": 1.0, "ingest": 3.0}"""
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind != INGEST and kind not in MESSAGE_KINDS:
+            raise argparse.ArgumentTypeError(f"Unknown message kind: {kind}")
+        mix[kind] = float(weight) if weight else 1.0
+    return mix
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test websocket_server headless")
+    parser.add_argument("--output", default="websocket_loadtest_report.json", help="Where to write the JSON report")
+    parser.add_argument("--baseline", help="Report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative change before failing")
+    parser.add_argument("--scenario", action="append", help="Scenario to run (repeatable)")
+    parser.add_argument("--quick", action="store_true", help=f"Only run {', '.join(QUICK_SCENARIOS)}")
+    parser.add_argument("--duration", type=float, help="Seconds of sending per scenario")
+    parser.add_argument("--clients", type=int, help="Run a custom scenario with this many clients")
+    parser.add_argument("--rate", type=float, default=10.0, help="Messages/sec per client of the custom scenario")
+    parser.add_argument("--size", type=int, default=256, help="Bytes of ingest messages of the custom scenario")
+    parser.add_argument("--mix", type=parse_mix, default={"ping": 1.0}, help="Custom mix, e.g. ping=1,ingest=3")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the message mix")
+    parser.add_argument("--server-log", help="File for the server process output")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve is not None:
+        return serve(args.serve)
+
+    if args.clients:
+        scenarios = [{"name": "custom", "clients": args.clients, "rate": args.rate, "size": args.size,
+                      "mix": args.mix}]
+    else:
+        names = args.scenario or (QUICK_SCENARIOS if args.quick else None)
+        scenarios = [scenario for scenario in SCENARIOS if not names or scenario["name"] in names]
+    duration = args.duration or (QUICK_DURATION_SECONDS if args.quick else DURATION_SECONDS)
+    report = run_load_tests(scenarios, duration, args.seed, args.server_log)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare_reports(report, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,100 +1,923 @@
 import asyncio
+import collections
+import concurrent.futures
+import functools
+import itertools
+import json
+import os
+import time
 import websockets
 import threading
 import unreal
 
+import capture_scheduler
+import game_thread
+import json_blueprint
+import json_watch
+import metrics
+import websocket_codec
+
+# Modos de confirmacion al cliente
+ACK_ECHO = "echo"   # reenviar "Mensaje recibido: ..." por cada mensaje (comportamiento original)
+ACK_SEQ = "seq"     # un "ack:<n>" por cliente y lote con el numero del ultimo mensaje procesado
+ACK_NONE = "none"   # sin respuesta
+# Segundos que se espera a cada cliente al enviarle las confirmaciones de un lote
+ACK_SEND_TIMEOUT = 1.0
+
+# Ventana para calcular mensajes/segundo sostenidos
+STATS_WINDOW_SECONDS = 10.0
+LATENCY_SAMPLES = 10000
+
+# Codigos de error JSON-RPC 2.0
+RPC_PARSE_ERROR = -32700
+RPC_INVALID_REQUEST = -32600
+RPC_METHOD_NOT_FOUND = -32601
+RPC_INVALID_PARAMS = -32602
+RPC_INTERNAL_ERROR = -32603
+RPC_FILE_NOT_FOUND = -32001
+RPC_PATH_NOT_FOUND = -32002
+
+# Histograma de metricas para las llamadas a metodos no registrados
+RPC_UNKNOWN_METRIC = "rpc.unknown"
+
+# Resultados grandes (json.read_file de archivos a partir de este tamaño) se envian por fragmentos
+RPC_STREAM_MIN_BYTES = 4 * 1024 * 1024
+RPC_STREAM_CHUNK_BYTES = 256 * 1024
+
+# Politicas de publish cuando el buffer de salida de un cliente lento esta lleno
+PUBLISH_DROP_OLDEST = "drop_oldest"  # se descarta el mensaje pendiente mas antiguo
+PUBLISH_DROP_NEWEST = "drop_newest"  # se descarta el mensaje nuevo
+PUBLISH_COALESCE = "coalesce"        # un mensaje pendiente por tema: el nuevo sustituye al anterior
+PUBLISH_BUFFER_MESSAGES = 256        # mensajes publicados pendientes por cliente
+PUBLISH_WRITE_LIMIT = 64 * 1024      # bytes en el buffer del socket a partir de los cuales el cliente va lento
+
+
+class RpcError(Exception):
+    """Error devuelto al cliente en el campo "error" de la respuesta JSON-RPC"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class StreamingResult:
+    """
+    Resultado de texto que se genera y envia por trozos, sin construirlo entero
+
+    iter_pieces devuelve un iterador de str; se consume en el pool de hilos
+    y la respuesta sale como un unico mensaje de texto fragmentado.
+    """
+    __slots__ = ("iter_pieces",)
+
+    def __init__(self, iter_pieces):
+        self.iter_pieces = iter_pieces
+
+
+class _ClientState:
+    """Estado por conexion: numero de secuencia, peticiones JSON-RPC en curso, temas suscritos y trafico"""
+    __slots__ = ("websocket", "address", "encoding", "sequence", "rpc_tasks", "rpc_slots", "topics",
+                 "outbox", "writer", "streaming", "published_dropped", "published_coalesced",
+                 "messages_in", "messages_out", "bytes_in", "bytes_out")
+
+    def __init__(self, websocket, max_inflight):
+        self.websocket = websocket
+        self.address = websocket.remote_address
+        # Codificacion negociada con el subprotocolo ("json" si el cliente no pidio ninguno)
+        self.encoding = getattr(websocket, "subprotocol", None) or websocket_codec.ENCODING_JSON
+        self.sequence = 0
+        self.rpc_tasks = set()
+        self.rpc_slots = asyncio.Semaphore(max_inflight)
+        self.topics = set()
+        # Mensajes publicados que esperan a un cliente lento (clave -> payload) y la tarea que los envia
+        self.outbox = collections.OrderedDict()
+        self.writer = None
+        self.streaming = False
+        self.published_dropped = 0
+        self.published_coalesced = 0
+        self.messages_in = 0
+        self.messages_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def get_stats(self):
+        return {
+            "messages_in": self.messages_in,
+            "messages_out": self.messages_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "encoding": self.encoding,
+            "rpc_inflight": len(self.rpc_tasks),
+            "topics": len(self.topics),
+            "outbox": len(self.outbox),
+            "published_dropped": self.published_dropped,
+            "published_coalesced": self.published_coalesced,
+        }
+
+    def is_busy(self, write_limit):
+        """True si hay que encolar en vez de escribir ya: mensajes pendientes, envio fragmentado o socket lleno"""
+        if self.outbox or self.streaming:
+            return True
+        transport = getattr(self.websocket, "transport", None)
+        return transport is not None and transport.get_write_buffer_size() > write_limit
+
+
 class WebSocketServer:
-    def __init__(self, host='localhost', port=8765):
+    def __init__(self, host='localhost', port=8765, batch_interval=0.05, batch_max_messages=500,
+                 high_water_mark=10000, ack_mode=ACK_ECHO, log_messages=True,
+                 rpc_workers=4, rpc_max_inflight=64, compression_level=websocket_codec.DEFLATE_LEVEL,
+                 compression_threshold=websocket_codec.DEFLATE_THRESHOLD, stream_chunk_bytes=RPC_STREAM_CHUNK_BYTES,
+                 publish_policy=PUBLISH_DROP_OLDEST, publish_buffer=PUBLISH_BUFFER_MESSAGES,
+                 publish_write_limit=PUBLISH_WRITE_LIMIT):
+        """
+        Args:
+            host: Interfaz en la que escuchar
+            port: Puerto
+            batch_interval: Segundos maximos que un mensaje espera antes de volcarse
+            batch_max_messages: Mensajes maximos por lote
+            high_water_mark: Mensajes en cola a partir de los cuales se deja de leer de los clientes
+            ack_mode: ACK_ECHO, ACK_SEQ o ACK_NONE
+            log_messages: Volcar los mensajes al Output Log (un unreal.log por lote)
+            rpc_workers: Hilos para las consultas JSON-RPC
+            rpc_max_inflight: Peticiones JSON-RPC simultaneas por conexion
+            compression_level: Nivel de permessage-deflate (1-9), None para no comprimir
+            compression_threshold: Bytes minimos de un mensaje para comprimirlo
+            stream_chunk_bytes: Tamaño de los trozos de las respuestas fragmentadas
+            publish_policy: PUBLISH_DROP_OLDEST, PUBLISH_DROP_NEWEST o PUBLISH_COALESCE para los clientes lentos
+            publish_buffer: Mensajes publicados pendientes por cliente antes de aplicar la politica
+            publish_write_limit: Bytes sin enviar en el socket a partir de los cuales un cliente se considera lento
+        """
         self.host = host
         self.port = port
         self.server = None
         self.running = False
-        
+        self.batch_interval = batch_interval
+        self.batch_max_messages = batch_max_messages
+        self.high_water_mark = high_water_mark
+        self.ack_mode = ack_mode
+        self.log_messages = log_messages
+        # Receptores adicionales de cada lote: callable(list[(client, seq, message)])
+        self.batch_handlers = []
+        # Llamados en el bucle con el nombre de cada tema que se queda sin suscriptores: callable(topic)
+        self.topic_released_handlers = []
+        # JSON-RPC: metodos disponibles, ejecutados en un pool de hilos (sin tocar unreal)
+        self.rpc_workers = rpc_workers
+        self.rpc_max_inflight = rpc_max_inflight
+        # Codificacion y compresion: se negocian por conexion (subprotocolo y permessage-deflate)
+        self.compression_level = compression_level
+        self.compression_threshold = compression_threshold
+        self.stream_chunk_bytes = stream_chunk_bytes
+        self.streamed_responses = 0
+        self.rpc_methods = {
+            "ping": lambda: "pong",
+            "json.get_value": self._rpc_get_value,
+            "json.get_values": self._rpc_get_values,
+            "json.read_file": self._rpc_read_file,
+            "json.query": self._rpc_query,
+        }
+        # Metodos que tocan APIs del editor: se ejecutan en el hilo del juego -> (prioridad, coalescer)
+        self._game_thread_methods = {}
+        # Metodos que reciben el cliente como primer argumento y se ejecutan en el bucle (solo bookkeeping)
+        self._client_methods = set()
+        # Temas: nombre -> clientes suscritos (solo se toca desde el bucle del servidor)
+        self._topics = {}
+        self.publish_policy = publish_policy
+        self.publish_buffer = publish_buffer
+        self.publish_write_limit = publish_write_limit
+        self.published = 0
+        self.published_dropped = 0
+        self.published_coalesced = 0
+        self._publish_keys = itertools.count()
+        # Se lee aqui (hilo del juego) porque los workers no pueden llamar a unreal
+        self.project_dir = unreal.Paths.project_dir()
+        self.register_rpc_method("subscribe", self.subscribe, pass_client=True)
+        self.register_rpc_method("unsubscribe", self.unsubscribe, pass_client=True)
+        json_watch.register_rpc_methods(self)
+        capture_scheduler.register_rpc_methods(self)
+        metrics.register_rpc_methods(self)
+        # Clientes conectados (para las metricas por cliente)
+        self._clients = set()
+        self.rpc_requests = 0
+        self.rpc_errors = 0
+        # Clientes que no aceptaron las confirmaciones de un lote a tiempo
+        self.ack_timeouts = 0
+        self._executor = None
+        # Segundos maximos para procesar los mensajes pendientes al detener
+        self.drain_timeout = 2.0
+        self._queue = None
+        self._consumer_task = None
+        # Ciclo de vida: el servidor es dueño de su hilo y de su bucle de eventos
+        self.loop = None
+        self.start_error = None
+        self.last_teardown_seconds = 0.0
+        self._thread = None
+        self._lifecycle_lock = threading.RLock()
+        self._started = threading.Event()
+        self._stop_event = None
+        self._stop_requested = False
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.received = 0
+        self.processed = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+        self._latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self._flush_history = collections.deque()  # (timestamp, mensajes)
+
     async def handle_client(self, websocket):
         """Maneja las conexiones de clientes WebSocket"""
         print(f"Cliente conectado desde {websocket.remote_address}")
+        client = _ClientState(websocket, self.rpc_max_inflight)
+        self._clients.add(client)
         
         try:
             async for message in websocket:
-                # Imprimir en la consola de Unreal Engine
-                #print(f"Mensaje recibido: {message}")
-                unreal.log(f"WebSocket mensaje: {message}")
+                client.messages_in += 1
+                client.bytes_in += len(message)
+                if self._is_rpc(message) or (
+                        isinstance(message, bytes) and client.encoding == websocket_codec.ENCODING_MSGPACK):
+                    # Peticiones JSON-RPC: se atienden en paralelo, fuera de la cola de ingesta
+                    await client.rpc_slots.acquire()
+                    task = asyncio.ensure_future(self._handle_rpc(client, message))
+                    client.rpc_tasks.add(task)
+                    task.add_done_callback(client.rpc_tasks.discard)
+                    continue
                 
-                # Opcional: enviar confirmación al cliente
-                await websocket.send(f"Mensaje recibido: {message}")
+                client.sequence += 1
+                self.received += 1
+                if self._queue.full():
+                    # Backpressure: dejamos de leer de este cliente hasta que el consumidor avance
+                    self.backpressure_waits += 1
+                await self._queue.put((client, client.sequence, message, time.perf_counter()))
                 
         except websockets.exceptions.ConnectionClosed:
             print("Cliente desconectado")
         except Exception as e:
             print(f"Error manejando cliente: {e}")
+        finally:
+            self._clients.discard(client)
+            for task in list(client.rpc_tasks):
+                task.cancel()
+            for topic in list(client.topics):
+                self.unsubscribe(client, topic)
+            client.outbox.clear()
+            if client.writer is not None:
+                client.writer.cancel()
+
+    @staticmethod
+    def _is_rpc(message):
+        """Un mensaje de texto con un objeto (o lote) JSON-RPC 2.0"""
+        return isinstance(message, str) and message[:1] in ('{', '[') and '"jsonrpc"' in message
+
+    async def _handle_rpc(self, client, message):
+        """Responde a una peticion (o lote de peticiones) JSON-RPC en la codificacion del cliente"""
+        try:
+            try:
+                payload = websocket_codec.decode_message(message)
+            except ValueError as e:
+                response = self._rpc_error(None, RPC_PARSE_ERROR, f"Parse error: {e}")
+            else:
+                if payload == []:
+                    # Un lote vacio es una unica peticion invalida
+                    response = self._rpc_error(None, RPC_INVALID_REQUEST, "Invalid request: empty batch")
+                elif isinstance(payload, list):
+                    responses = await asyncio.gather(*(self._call_rpc(request, client) for request in payload))
+                    response = [item for item in responses if item is not None] or None
+                    for item in response or ():
+                        if isinstance(item.get("result"), StreamingResult):
+                            # En un lote no se puede fragmentar una sola respuesta: se construye entera
+                            item["result"] = await asyncio.get_running_loop().run_in_executor(
+                                self._executor, self._join_pieces, item["result"]
+                            )
+                else:
+                    response = await self._call_rpc(payload, client)
+                    if response is not None and isinstance(response.get("result"), StreamingResult):
+                        await self._send_streaming(client, response["id"], response["result"])
+                        return
+            
+            if response is not None:
+                await self._send(client, websocket_codec.encode_message(client.encoding, response))
+        finally:
+            client.rpc_slots.release()
+
+    @staticmethod
+    def _join_pieces(result):
+        return "".join(result.iter_pieces())
+
+    async def _send_streaming(self, client, request_id, result):
+        """
+        Envia un resultado de texto grande como un mensaje fragmentado
+
+        Los trozos se generan en el pool de hilos de uno en uno, asi que en memoria
+        solo hay un trozo cada vez. Siempre va como texto JSON, tambien a los
+        clientes msgpack (la cabecera msgpack necesitaria la longitud total).
+        """
+        loop = asyncio.get_running_loop()
+        pieces = result.iter_pieces()
+
+        async def fragments():
+            text = websocket_codec.response_prefix(request_id)
+            client.bytes_out += len(text)
+            yield text
+            while True:
+                piece = await loop.run_in_executor(self._executor, next, pieces, None)
+                if piece is None:
+                    break
+                text = websocket_codec.escape_fragment(piece)
+                client.bytes_out += len(text)
+                yield text
+            client.bytes_out += len(websocket_codec.RESPONSE_SUFFIX)
+            yield websocket_codec.RESPONSE_SUFFIX
+
+        client.messages_out += 1
+        self.streamed_responses += 1
+        # Mientras dura el envio, lo publicado para este cliente espera en su buffer
+        client.streaming = True
+        try:
+            await client.websocket.send(fragments())
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            # El mensaje ya empezo: no se puede responder con un error, se cierra la conexion
+            print(f"Error enviando respuesta fragmentada: {e}")
+        finally:
+            client.streaming = False
+            pieces.close()
+
+    async def _call_rpc(self, request, client=None):
+        """Ejecuta una peticion en el pool de hilos. Devuelve la respuesta o None si es una notificacion"""
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self._rpc_error(None, RPC_INVALID_REQUEST, "Invalid request")
+        
+        request_id = request.get("id")
+        self.rpc_requests += 1
+        started_at = time.perf_counter() if metrics.registry.enabled else None
+        method = self.rpc_methods.get(request["method"])
+        params = request.get("params", [])
+        if method is None:
+            response = self._rpc_error(request_id, RPC_METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+        elif not isinstance(params, (list, dict)):
+            # JSON-RPC 2.0: params es un array (por posicion) o un objeto (por nombre)
+            response = self._rpc_error(request_id, RPC_INVALID_PARAMS, "Invalid params: expected an array or an object")
+        else:
+            if request["method"] in self._client_methods:
+                method = functools.partial(method, client)
+            if isinstance(params, dict):
+                call = functools.partial(method, **params)
+            else:
+                call = functools.partial(method, *params)
+            try:
+                options = self._game_thread_methods.get(request["method"])
+                if request["method"] in self._client_methods:
+                    result = call()
+                elif options is None:
+                    result = await asyncio.get_running_loop().run_in_executor(self._executor, call)
+                else:
+                    priority, coalesce = options
+                    coalesce_key = None
+                    if coalesce:
+                        # Peticiones identicas pendientes comparten una sola ejecucion
+                        coalesce_key = (request["method"], json.dumps(params, sort_keys=True))
+                    result = await game_thread.dispatcher.run(call, priority=priority, coalesce_key=coalesce_key)
+                response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+            except RpcError as e:
+                response = self._rpc_error(request_id, e.code, e.message)
+            except TypeError as e:
+                response = self._rpc_error(request_id, RPC_INVALID_PARAMS, f"Invalid params: {e}")
+            except Exception as e:
+                response = self._rpc_error(request_id, RPC_INTERNAL_ERROR, str(e))
+        
+        if started_at is not None:
+            # Los nombres desconocidos comparten un histograma: si no, cada error tipografico crearia uno
+            histogram = metrics.registry.histogram(
+                RPC_UNKNOWN_METRIC if method is None else f"rpc.{request['method']}"
+            )
+            histogram.observe(time.perf_counter() - started_at)
+            if "error" in response:
+                histogram.errors += 1
+        return response if "id" in request else None
+
+    def register_rpc_method(self, name, function, game_thread_only=False,
+                            priority=game_thread.PRIORITY_NORMAL, coalesce=False, pass_client=False):
+        """
+        Añade (o reemplaza) un metodo JSON-RPC
+
+        Args:
+            name: Nombre del metodo
+            function: Callable que recibe los params de la peticion
+            game_thread_only: Ejecutarlo en el hilo del juego (necesario si usa APIs de unreal)
+            priority: Prioridad en la cola del hilo del juego
+            coalesce: Unir peticiones identicas que aun esten en cola
+            pass_client: Pasar el cliente como primer argumento y ejecutarlo directamente
+                         en el bucle del servidor (para operaciones rapidas como suscripciones)
+        """
+        self.rpc_methods[name] = function
+        if game_thread_only:
+            self._game_thread_methods[name] = (priority, coalesce)
+        else:
+            self._game_thread_methods.pop(name, None)
+        if pass_client:
+            self._client_methods.add(name)
+        else:
+            self._client_methods.discard(name)
+
+    def subscribe(self, client, topic):
+        """Suscribe un cliente a un tema. Se ejecuta en el bucle del servidor"""
+        self._topics.setdefault(topic, set()).add(client)
+        client.topics.add(topic)
+        return True
+
+    def unsubscribe(self, client, topic):
+        """Quita la suscripcion de un cliente. Se ejecuta en el bucle del servidor"""
+        clients = self._topics.get(topic)
+        client.topics.discard(topic)
+        if not clients or client not in clients:
+            return False
+        clients.discard(client)
+        if not clients:
+            del self._topics[topic]
+            for handler in self.topic_released_handlers:
+                try:
+                    handler(topic)
+                except Exception as e:
+                    print(f"Error en handler de tema liberado: {e}")
+        return True
+
+    def publish(self, topic, params):
+        """
+        Envia una notificacion JSON-RPC {"method": topic, "params": params} a los suscriptores del tema.
+        Se puede llamar desde cualquier hilo
+
+        Returns:
+            bool: False si el servidor no esta corriendo
+        """
+        loop = self.loop
+        if loop is None or not self.running:
+            return False
+        message = {"jsonrpc": "2.0", "method": topic, "params": params}
+        text = json.dumps(message, ensure_ascii=False)
+        try:
+            loop.call_soon_threadsafe(self._publish, topic, message, text)
+        except RuntimeError:
+            return False  # el bucle ya se cerro
+        return True
+
+    def _publish(self, topic, message, text):
+        """
+        Reparte un mensaje publicado: se codifica una vez por codificacion, no por cliente
+
+        Los clientes al dia reciben una escritura directa sin esperar (websockets.broadcast);
+        los lentos lo encolan en su buffer acotado, que vacia su propia tarea, asi que
+        un cliente atascado nunca retrasa a los demas.
+        """
+        started = time.perf_counter()
+        encoded = {websocket_codec.ENCODING_JSON: text}
+        ready = {}
+        for client in list(self._topics.get(topic, ())):
+            payload = encoded.get(client.encoding)
+            if payload is None:
+                payload = encoded[client.encoding] = websocket_codec.encode_message(client.encoding, message)
+            if client.is_busy(self.publish_write_limit):
+                self._buffer_published(client, topic, payload)
+            else:
+                ready.setdefault(client.encoding, []).append(client)
+                client.messages_out += 1
+                client.bytes_out += len(payload)
+        for encoding, clients in ready.items():
+            websockets.broadcast([client.websocket for client in clients], encoded[encoding])
+        self.published += 1
+        if metrics.registry.enabled:
+            metrics.registry.observe("websocket.publish", time.perf_counter() - started, len(text))
+
+    def _buffer_published(self, client, topic, payload):
+        """Encola un mensaje publicado para un cliente lento aplicando publish_policy"""
+        outbox = client.outbox
+        key = topic if self.publish_policy == PUBLISH_COALESCE else next(self._publish_keys)
+        if key in outbox:
+            # Mismo tema pendiente: el valor nuevo ocupa el sitio del anterior
+            outbox[key] = payload
+            client.published_coalesced += 1
+            self.published_coalesced += 1
+            return
+        if len(outbox) >= self.publish_buffer:
+            client.published_dropped += 1
+            self.published_dropped += 1
+            if self.publish_policy == PUBLISH_DROP_NEWEST:
+                return
+            outbox.popitem(last=False)
+        outbox[key] = payload
+        if client.writer is None:
+            client.writer = asyncio.ensure_future(self._write_published(client))
+
+    async def _write_published(self, client):
+        """Vacia el buffer de un cliente lento respetando el control de flujo del socket"""
+        try:
+            while client.outbox:
+                _, payload = client.outbox.popitem(last=False)
+                await self._send(client, payload)
+        finally:
+            client.writer = None
+
+    def _rpc_error(self, request_id, code, message):
+        self.rpc_errors += 1
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    def _rpc_path(self, file_path):
+        """Ruta absoluta de un archivo del proyecto (sin llamar a unreal desde el worker)"""
+        full_path = file_path if os.path.isabs(file_path) else os.path.join(self.project_dir, file_path)
+        if not os.path.exists(full_path):
+            raise RpcError(RPC_FILE_NOT_FOUND, f"JSON file not found: {full_path}")
+        return full_path
+
+    def _rpc_get_value(self, file_path, key_path):
+        value, error = json_blueprint.lookup_json_value(self._rpc_path(file_path), key_path)
+        if error is not None:
+            raise RpcError(RPC_PATH_NOT_FOUND, error)
+        return value
+
+    def _rpc_get_values(self, file_path, key_paths):
+        values, errors = json_blueprint.lookup_json_values(self._rpc_path(file_path), list(key_paths))
+        return {"values": values, "errors": errors}
+
+    def _rpc_query(self, file_path, query):
+        try:
+            compiled = json_blueprint.compile_query(query)
+        except json_blueprint.JsonQueryError as e:
+            raise RpcError(RPC_INVALID_PARAMS, f"Invalid query '{query}': {e}")
+        full_path = self._rpc_path(file_path)
+        document = json_blueprint.get_columnar_document(full_path)
+        if document is None:
+            document = json_blueprint.document_cache.load(full_path)
+        return compiled.evaluate(document)
+
+    def _rpc_read_file(self, file_path):
+        full_path = self._rpc_path(file_path)
+        if os.path.getsize(full_path) >= RPC_STREAM_MIN_BYTES:
+            # Archivos grandes: se formatean y envian por trozos sin construir la cadena entera
+            return StreamingResult(
+                functools.partial(json_blueprint.iter_formatted_json_file, full_path, self.stream_chunk_bytes)
+            )
+        return json_blueprint.format_json_file(full_path)
+
+    async def _consume_messages(self):
+        """Agrupa los mensajes de la cola en lotes y los vuelca periodicamente"""
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.perf_counter() + self.batch_interval
+            while len(batch) < self.batch_max_messages:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush_batch(self, batch):
+        """Vuelca un lote: un solo unreal.log, los handlers y las confirmaciones"""
+        started_at = time.perf_counter()
+        if self.log_messages:
+            # Imprimir en la consola de Unreal Engine (desde el hilo del juego)
+            game_thread.dispatcher.submit(
+                unreal.log, "\n".join(f"WebSocket mensaje: {message}" for _, _, message, _ in batch),
+                priority=game_thread.PRIORITY_LOW
+            )
+
+        for handler in self.batch_handlers:
+            try:
+                handler([(client, sequence, message) for client, sequence, message, _ in batch])
+            except Exception as e:
+                print(f"Error en handler de lote: {e}")
+
+        acks = {}
+        if self.ack_mode == ACK_ECHO:
+            for client, _, message, _ in batch:
+                acks.setdefault(client, []).append(f"Mensaje recibido: {message}")
+        elif self.ack_mode == ACK_SEQ:
+            for client, sequence, _, _ in batch:
+                acks[client] = [f"ack:{sequence}"]
+        if acks:
+            # En paralelo y con plazo: un cliente lento no retrasa a los demas ni al siguiente lote
+            await asyncio.gather(*(self._send_acks(client, texts) for client, texts in acks.items()))
+
+        now = time.perf_counter()
+        self._latencies.extend(now - received_at for _, _, _, received_at in batch)
+        self._flush_history.append((now, len(batch)))
+        while self._flush_history and now - self._flush_history[0][0] > STATS_WINDOW_SECONDS:
+            self._flush_history.popleft()
+        self.processed += len(batch)
+        self.batches += 1
+        if metrics.registry.enabled:
+            metrics.registry.observe(
+                "websocket.flush_batch", now - started_at, sum(len(message) for _, _, message, _ in batch)
+            )
+
+    async def _send_acks(self, client, texts):
+        """Envia en orden las confirmaciones de un cliente, abandonandolas tras ACK_SEND_TIMEOUT"""
+        async def send_all():
+            for text in texts:
+                await self._send(client, text)
+
+        try:
+            await asyncio.wait_for(send_all(), ACK_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.ack_timeouts += 1
+
+    @staticmethod
+    async def _send(client, text):
+        client.messages_out += 1
+        client.bytes_out += len(text)
+        try:
+            await client.websocket.send(text)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    def get_stats(self):
+        """
+        Estadisticas de ingesta
+
+        Returns:
+            dict: received, processed, batches, queue_depth, backpressure_waits, ack_timeouts,
+                  msgs_per_sec (ventana de STATS_WINDOW_SECONDS) y latencias p50/p99 en ms
+        """
+        latencies = sorted(self._latencies)
+        history = list(self._flush_history)
+        msgs_per_sec = 0.0
+        if len(history) > 1:
+            span = history[-1][0] - history[0][0]
+            if span > 0:
+                msgs_per_sec = sum(count for _, count in history[1:]) / span
+
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000.0
+
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "batches": self.batches,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "backpressure_waits": self.backpressure_waits,
+            "msgs_per_sec": msgs_per_sec,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99),
+            "rpc_requests": self.rpc_requests,
+            "rpc_errors": self.rpc_errors,
+            "ack_timeouts": self.ack_timeouts,
+            "topics": len(self._topics),
+            "published": self.published,
+            "published_dropped": self.published_dropped,
+            "published_coalesced": self.published_coalesced,
+            "streamed_responses": self.streamed_responses,
+            "game_thread_depth": game_thread.dispatcher.depth(),
+            "clients": len(self._clients),
+        }
+
+    def get_client_stats(self):
+        """
+        Trafico por cliente
+
+        Returns:
+            dict: "host:puerto" -> messages_in/out, bytes_in/out, encoding, rpc_inflight, topics,
+                  outbox y published_dropped/coalesced
+        """
+        return {
+            ":".join(str(part) for part in (client.address or ())[:2]): client.get_stats()
+            for client in list(self._clients)
+        }
+
+    def get_metrics(self):
+        """Estadisticas del servidor y de cada cliente (gauge "websocket" de metrics)"""
+        return dict(self.get_stats(), per_client=self.get_client_stats())
     
     async def start_server(self):
-        """Inicia el servidor WebSocket"""
+        """Inicia el servidor WebSocket y lo mantiene hasta que se pida detenerlo"""
+        self._stop_event = asyncio.Event()
         try:
+            self._queue = asyncio.Queue(maxsize=self.high_water_mark)
+            self._consumer_task = asyncio.ensure_future(self._consume_messages())
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                self.rpc_workers, thread_name_prefix="WebSocketRpc"
+            )
+            extensions = None
+            if self.compression_level is not None:
+                extensions = [websocket_codec.ThresholdDeflateFactory(
+                    self.compression_level, self.compression_threshold
+                )]
             self.server = await websockets.serve(
                 self.handle_client, 
                 self.host, 
-                self.port
+                self.port,
+                select_subprotocol=websocket_codec.select_subprotocol,
+                compression=None,
+                extensions=extensions
             )
             self.running = True
             print(f"Servidor WebSocket iniciado en ws://{self.host}:{self.port}")
-            unreal.log(f"Servidor WebSocket iniciado en ws://{self.host}:{self.port}")
-            
-            # Mantener el servidor corriendo
-            await self.server.wait_closed()
-            
+            game_thread.log(f"Servidor WebSocket iniciado en ws://{self.host}:{self.port}")
         except Exception as e:
+            self.running = False
+            self.start_error = e
             print(f"Error iniciando servidor: {e}")
-            unreal.log_error(f"Error iniciando servidor WebSocket: {e}")
+            game_thread.log_error(f"Error iniciando servidor WebSocket: {e}")
+            if self._consumer_task is not None:
+                self._consumer_task.cancel()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            return
+        finally:
+            self._started.set()
+        
+        # Mantener el servidor corriendo hasta stop()
+        if not self._stop_requested:
+            await self._stop_event.wait()
+        await self._shutdown()
     
-    def start_in_thread(self):
-        """Inicia el servidor en un hilo separado"""
-        def run_server():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+    async def _shutdown(self):
+        """Deja de aceptar conexiones, vacia la cola de mensajes ya recibidos y despues cierra los clientes"""
+        # Primero solo se cierra el puerto: los clientes siguen conectados para recibir sus confirmaciones
+        self.server.close(close_connections=False)
+        try:
+            # Los mensajes ya recibidos se registran/confirman antes de salir
+            await asyncio.wait_for(self._queue.join(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(f"Servidor WebSocket: {self._queue.qsize()} mensajes sin procesar al detener")
+        await asyncio.gather(
+            *(client.websocket.close(1001) for client in list(self._clients)), return_exceptions=True
+        )
+        await self.server.wait_closed()
+        self._consumer_task.cancel()
+        try:
+            await self._consumer_task
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown(wait=False)
+        self.server = None
+    
+    def _run_loop(self):
+        """Cuerpo del hilo del servidor: el bucle de eventos es propiedad del servidor"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.loop = loop
+        try:
             loop.run_until_complete(self.start_server())
+        finally:
+            self.running = False
+            self.loop = None
+            loop.close()
+    
+    def start_in_thread(self, wait=False, timeout=5.0):
+        """
+        Inicia el servidor en un hilo separado. Es idempotente: si ya esta en marcha devuelve el mismo hilo
+
+        Args:
+            wait: Esperar a que el puerto este abierto (o falle) antes de volver
+            timeout: Segundos maximos de espera si wait es True
+
+        Returns:
+            threading.Thread: Hilo del servidor
+        """
+        with self._lifecycle_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._started = threading.Event()
+                self._stop_requested = False
+                self.start_error = None
+                self._consumer_task = None
+                # running se marca antes de arrancar el hilo para que dos llamadas no creen dos servidores
+                self.running = True
+                self._thread = threading.Thread(
+                    target=self._run_loop, name=f"WebSocketServer:{self.port}", daemon=True
+                )
+                self._thread.start()
+            thread = self._thread
         
-        if not self.running:
-            thread = threading.Thread(target=run_server, daemon=True)
-            thread.start()
-            return thread
+        if wait:
+            self._started.wait(timeout)
+        return thread
+    
+    def stop(self, timeout=5.0):
+        """
+        Detiene el servidor desde cualquier hilo y espera a que termine
+
+        Args:
+            timeout: Segundos maximos de espera al hilo del servidor
+
+        Returns:
+            float: Segundos que tardo el apagado
+        """
+        started_at = time.perf_counter()
+        with self._lifecycle_lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive():
+                return 0.0
+            self._stop_requested = True
+            # Si el arranque aun no termino, start_server vera _stop_requested
+            if threading.current_thread() is not thread:
+                self._started.wait(timeout)
+            loop = self.loop
+            if loop is not None and self._stop_event is not None:
+                try:
+                    loop.call_soon_threadsafe(self._stop_event.set)
+                except RuntimeError:
+                    pass  # el bucle ya se cerro
+        
+        if threading.current_thread() is thread:
+            # Llamado desde el propio bucle: el apagado continua en segundo plano
+            return 0.0
+        thread.join(timeout)
+        
+        self.last_teardown_seconds = time.perf_counter() - started_at
+        if thread.is_alive():
+            print(f"El servidor WebSocket no se detuvo en {timeout} s")
+            game_thread.log_warning(f"El servidor WebSocket no se detuvo en {timeout} s")
+        else:
+            print(f"Servidor WebSocket detenido en {self.last_teardown_seconds * 1000:.1f} ms")
+            game_thread.log(f"Servidor WebSocket detenido en {self.last_teardown_seconds * 1000:.1f} ms")
+        return self.last_teardown_seconds
+    
+    def restart(self, host=None, port=None, timeout=5.0):
+        """
+        Detiene y vuelve a iniciar el servidor, opcionalmente en otra interfaz/puerto
+
+        Returns:
+            bool: True si el servidor quedo escuchando
+        """
+        self.stop(timeout)
+        if host is not None:
+            self.host = host
+        if port is not None:
+            self.port = port
+        self.start_in_thread(wait=True, timeout=timeout)
+        return self.running and self.start_error is None
     
     async def stop_server(self):
-        """Detiene el servidor"""
+        """Detiene el servidor desde su propio bucle de eventos"""
         if self.server:
-            self.server.close()
-            await self.server.wait_closed()
-            self.running = False
+            self._stop_requested = True
+            self._stop_event.set()
             print("Servidor WebSocket detenido")
 
 # Variable global para mantener referencia al servidor
 websocket_server_instance = None
+_instance_lock = threading.Lock()
 
-def start_websocket_server(host='localhost', port=8765):
-    """Función para iniciar el servidor WebSocket"""
-    global websocket_server_instance
-    
-    if websocket_server_instance is None or not websocket_server_instance.running:
-        websocket_server_instance = WebSocketServer(host, port)
-        thread = websocket_server_instance.start_in_thread()
-        return websocket_server_instance
-    else:
-        print("El servidor WebSocket ya está corriendo")
-        return websocket_server_instance
-
-def stop_websocket_server():
-    """Función para detener el servidor WebSocket"""
+def start_websocket_server(host='localhost', port=8765, **options):
+    """
+    Función para iniciar el servidor WebSocket. Llamadas concurrentes devuelven la misma instancia
+
+    Args:
+        host: Interfaz en la que escuchar
+        port: Puerto
+        **options: batch_interval, batch_max_messages, high_water_mark, ack_mode, log_messages,
+                   rpc_workers, rpc_max_inflight, compression_level, compression_threshold,
+                   stream_chunk_bytes, publish_policy, publish_buffer, publish_write_limit
+    """
     global websocket_server_instance
     
-    if websocket_server_instance and websocket_server_instance.running:
-        # Nota: Para detener completamente necesitarías manejar el event loop
-        print("Para detener el servidor, reinicia Unreal Engine")
-        unreal.log("Para detener el servidor WebSocket, reinicia Unreal Engine")
+    with _instance_lock:
+        if websocket_server_instance is None or not websocket_server_instance.running:
+            websocket_server_instance = WebSocketServer(host, port, **options)
+            websocket_server_instance.start_in_thread()
+            metrics.registry.register_gauge("websocket", websocket_server_instance.get_metrics)
+            return websocket_server_instance
+    print("El servidor WebSocket ya está corriendo")
+    return websocket_server_instance
 
-# Auto-iniciar el servidor cuando se importa el módulo
-if __name__ == "__main__":
-    start_websocket_server()
+def stop_websocket_server(timeout=5.0):
+    """
+    Función para detener el servidor WebSocket
+
+    Returns:
+        float: Segundos que tardo el apagado, 0 si no estaba corriendo
+    """
+    with _instance_lock:
+        server = websocket_server_instance
+    if server is None:
+        return 0.0
+    return server.stop(timeout)
 
-# Iniciar automáticamente
-print("Iniciando servidor WebSocket automáticamente...")
-start_websocket_server()
\ No newline at end of file
+def restart_websocket_server(host=None, port=None, timeout=5.0):
+    """
+    Reinicia el servidor WebSocket (p. ej. en otro puerto) sin reiniciar el editor
+
+    Returns:
+        WebSocketServer: La instancia reiniciada
+    """
+    with _instance_lock:
+        server = websocket_server_instance
+    if server is None:
+        return start_websocket_server(host or 'localhost', port or 8765)
+    server.restart(host, port, timeout)
+    return server
+
+# El servidor ya no arranca al importar el módulo: bootstrap.py lo registra en el
+# manifiesto de arranque con start_websocket_server como función de inicio
+if __name__ == "__main__":
+    start_websocket_server()
\ No newline at end of file